@@ -20,6 +20,25 @@ CHARTS_DIR = DATA_DIR / "charts"
 PORTFOLIO_FILE = DATA_DIR / "portfolio.json"
 MEMORY_FILE = DATA_DIR / "memory.json"
 
+# Persistence: rolling backups per data file, JSON indent (0 = compact)
+STORAGE_BACKUPS = int(os.getenv("CLINE_FINANCE_BACKUPS", "3"))
+STORAGE_JSON_INDENT = int(os.getenv("CLINE_FINANCE_JSON_INDENT", "0")) or None
+# Portfolio trade ledger: events appended before portfolio.json is rewritten as a snapshot
+LEDGER_COMPACT_EVERY = max(1, int(os.getenv("CLINE_FINANCE_LEDGER_COMPACT_EVERY", "50")))
+# Seconds to wait for another process holding a data file lock
+FILE_LOCK_TIMEOUT_SECONDS = float(os.getenv("CLINE_FINANCE_LOCK_TIMEOUT", "10"))
+# Per-owner storage backend: "json" (portfolio.json + ledger, memory.json) or "sqlite" (finance.db)
+STORAGE_BACKEND = os.getenv("CLINE_FINANCE_STORAGE", "json").lower()
+SQLITE_DB_NAME = "finance.db"
+# Full-text search index over insights and decisions (per owner, next to the memory file)
+SEARCH_INDEX_NAME = "search_index.json"
+# Index changes appended to its log before the index file is rewritten
+SEARCH_INDEX_COMPACT_EVERY = max(1, int(os.getenv("CLINE_FINANCE_SEARCH_COMPACT_EVERY", "200")))
+# Replaced or removed memory records a section segment accumulates before it is rewritten
+MEMORY_COMPACT_EVERY = max(1, int(os.getenv("CLINE_FINANCE_MEMORY_COMPACT_EVERY", "200")))
+# Lot representation when loading: "objects" (one Lot per purchase) or "array" (columnar NumPy arrays)
+LOT_STORE = os.getenv("CLINE_FINANCE_LOT_STORE", "objects").lower()
+
 # API Keys (loaded from environment variables)
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
 FRED_API_KEY = os.getenv("FRED_API_KEY", "")
@@ -27,6 +46,63 @@ FRED_API_KEY = os.getenv("FRED_API_KEY", "")
 # Default currency for portfolio valuation
 DEFAULT_CURRENCY = "EUR"
 
+# Currency every FX rate is fetched against; cross rates are triangulated through it
+FX_PIVOT_CURRENCY = os.getenv("CLINE_FINANCE_FX_PIVOT", "USD").upper()
+# Cost basis conversion to base currency: "trade_date" (FX rate on each lot's date) or "current"
+COST_BASIS_FX = os.getenv("CLINE_FINANCE_COST_BASIS_FX", "trade_date")
+
+# Market data provider: yfinance (live), record (live + save fixtures), replay (offline fixtures)
+MARKET_DATA_PROVIDER = os.getenv("CLINE_FINANCE_PROVIDER", "yfinance")
+PROVIDER_FIXTURES_DIR = Path(os.getenv("CLINE_FINANCE_FIXTURES_DIR", DATA_DIR / "fixtures"))
+REPLAY_LATENCY_MS = float(os.getenv("CLINE_FINANCE_REPLAY_LATENCY_MS", "0"))
+REPLAY_JITTER_MS = float(os.getenv("CLINE_FINANCE_REPLAY_JITTER_MS", "0"))
+
+# Quote modes: "full" (ticker.info with fundamentals) or "price" (fast_info price fields only)
+QUOTE_MODES = ("full", "price")
+
+# Maximum symbols per bulk quote download (yf.download)
+QUOTE_BATCH_SIZE = int(os.getenv("CLINE_FINANCE_QUOTE_BATCH_SIZE", "50"))
+
+# Shared fetch executor (concurrent per-symbol network calls)
+FETCH_MAX_WORKERS = int(os.getenv("CLINE_FINANCE_FETCH_WORKERS", "8"))
+FETCH_TIMEOUT_SECONDS = float(os.getenv("CLINE_FINANCE_FETCH_TIMEOUT", "30"))
+
+# Market data cache (bounded LRU with a TTL per data kind, in seconds)
+MARKET_CACHE_MAX_ENTRIES = int(os.getenv("CLINE_FINANCE_CACHE_MAX_ENTRIES", "2048"))
+MARKET_CACHE_TTLS = {
+    "quote": 60,          # Full quotes, index and ETF moves
+    "price": 60,          # Bulk price-only quotes
+    "history": 900,       # Historical price series
+    "info": float(os.getenv("CLINE_FINANCE_INFO_TTL", "60")),  # Price fields of ticker.info
+    "info_static": float(os.getenv("CLINE_FINANCE_INFO_STATIC_TTL", str(24 * 3600))),  # Slow fields
+    "analyst": 6 * 3600,  # Analyst ratings and price targets
+    "calendar": 12 * 3600,  # Earnings calendar
+    "news": 600,          # Per-symbol news
+    "fx": 300,            # FX rates
+}
+# ticker.info fields that rarely change (cached under "info_static", everything else under "info")
+STATIC_INFO_FIELDS = frozenset({
+    "longName", "shortName", "sector", "industry", "exchange", "fullExchangeName",
+    "currency", "financialCurrency", "quoteType", "country", "isin",
+    "targetMeanPrice", "targetHighPrice", "targetLowPrice", "targetMedianPrice",
+    "recommendationKey", "recommendationMean", "numberOfAnalystOpinions",
+})
+# Serve stale entries immediately and refresh them in the background
+MARKET_CACHE_STALE_WHILE_REVALIDATE = os.getenv("CLINE_FINANCE_CACHE_SWR", "1") == "1"
+# Stale entries older than TTL * factor are never served
+MARKET_CACHE_MAX_STALE_FACTOR = 10
+
+# Seconds a portfolio valuation is reused by later tools (portfolio_valuation fresh=True refetches)
+VALUATION_CACHE_TTL_SECONDS = float(os.getenv("CLINE_FINANCE_VALUATION_TTL", "60"))
+# Seconds a portfolio snapshot waits for newer ones before a background write (0 = write inline)
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv("CLINE_FINANCE_SNAPSHOT_DEBOUNCE", "5"))
+
+# Local OHLCV history store (one columnar .npz file per symbol and interval)
+HISTORY_DIR = DATA_DIR / "history"
+HISTORY_STORE_INTERVALS = ("1d", "1wk", "1mo")  # Intraday bars are always fetched live
+# Minimum seconds between top-up fetches for the same symbol and interval
+HISTORY_TOPUP_INTERVAL_SECONDS = int(os.getenv("CLINE_FINANCE_HISTORY_TOPUP_INTERVAL", "900"))
+
 # Market indices for overview
 DEFAULT_INDICES = [
     "^GSPC",   # S&P 500
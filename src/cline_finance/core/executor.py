@@ -0,0 +1,153 @@
+"""
+Fetch Executor - Shared bounded thread pool for concurrent network fetches.
+
+All per-symbol market data loops fan out through this module so that their
+latency is close to the slowest single fetch rather than the sum of all fetches.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from cline_finance.constants import FETCH_MAX_WORKERS, FETCH_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_max_workers: int = FETCH_MAX_WORKERS
+_executor_lock = threading.Lock()
+
+# Marks pool threads so nested fan-outs run inline instead of deadlocking the pool
+_worker_state = threading.local()
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one fanned-out call."""
+    
+    item: Any
+    value: Any = None
+    error: Optional[Exception] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_in_worker(fn: Callable, *args) -> Any:
+    """Run a task with the worker marker set."""
+    _worker_state.active = True
+    try:
+        return fn(*args)
+    finally:
+        _worker_state.active = False
+
+
+def _in_worker() -> bool:
+    return getattr(_worker_state, "active", False)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the shared fetch thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, _max_workers),
+                thread_name_prefix="cline-fetch",
+            )
+        return _executor
+
+
+def configure_executor(max_workers: int) -> None:
+    """
+    Set the worker count of the shared pool.
+    
+    The current pool (if any) finishes its queued work in the background and
+    a new pool with the requested size is created on next use.
+    
+    Args:
+        max_workers: Maximum number of concurrent fetches
+    """
+    global _max_workers
+    _max_workers = max(1, max_workers)
+    reset_executor()
+
+
+def reset_executor() -> None:
+    """Shut down the shared pool (for testing and reconfiguration)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+
+
+def submit(fn: Callable, *args) -> Future:
+    """
+    Submit a single call to the shared pool.
+    
+    When called from inside a pool thread the call runs inline and an
+    already-completed future is returned.
+    """
+    if _in_worker():
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    return get_executor().submit(_run_in_worker, fn, *args)
+
+
+def fan_out(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    timeout: Optional[float] = FETCH_TIMEOUT_SECONDS,
+) -> list[FetchResult]:
+    """
+    Call ``fn(item)`` for every item concurrently on the shared pool.
+    
+    Args:
+        fn: Function taking a single item
+        items: Items to process (e.g. ticker symbols)
+        timeout: Deadline in seconds for the whole fan-out. Calls that have not
+                 finished by then are reported with a TimeoutError.
+    
+    Returns:
+        One FetchResult per item, in input order. Exceptions raised by ``fn``
+        are captured in ``FetchResult.error`` instead of propagating.
+    """
+    items = list(items)
+    if not items:
+        return []
+    
+    if _in_worker() or len(items) == 1:
+        results = []
+        for item in items:
+            try:
+                results.append(FetchResult(item=item, value=fn(item)))
+            except Exception as e:
+                results.append(FetchResult(item=item, error=e))
+        return results
+    
+    executor = get_executor()
+    futures = [executor.submit(_run_in_worker, fn, item) for item in items]
+    done, not_done = wait(futures, timeout=timeout)
+    
+    if not_done:
+        logger.warning(f"{len(not_done)}/{len(items)} fetches exceeded the {timeout}s deadline")
+    
+    results = []
+    for item, future in zip(items, futures):
+        if future in not_done:
+            future.cancel()
+            results.append(FetchResult(item=item, error=TimeoutError(f"Timed out after {timeout}s")))
+            continue
+        try:
+            results.append(FetchResult(item=item, value=future.result()))
+        except Exception as e:
+            results.append(FetchResult(item=item, error=e))
+    
+    return results
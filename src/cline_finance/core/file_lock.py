@@ -0,0 +1,146 @@
+"""
+File Lock - Cross-process advisory locks and change stamps for data files.
+
+Several MCP servers (e.g. one per Cline window) may share the same DATA_DIR.
+Read-modify-write cycles on a data file hold an exclusive ``flock`` on a
+sidecar ``<name>.lock`` file, so concurrent writers are serialized instead of
+overwriting each other. Locks are re-entrant within a process.
+
+File stamps (mtime, inode, size) let managers keep their cached copy until
+the file actually changes on disk, at the cost of one ``stat`` per access.
+"""
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from cline_finance.constants import FILE_LOCK_TIMEOUT_SECONDS
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only serialize threads of this process
+    fcntl = None
+
+_POLL_SECONDS = 0.05
+
+FileStamp = tuple[int, int, int]
+
+
+class FileLockTimeout(TimeoutError):
+    """Raised when a data file lock cannot be acquired in time."""
+
+
+class _PathLock:
+    """Process-wide state of one lock file."""
+    
+    def __init__(self):
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fd: Optional[int] = None
+
+
+_path_locks: dict[str, _PathLock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def lock_path_for(path: Path) -> Path:
+    """Get the sidecar lock file of a data file."""
+    path = Path(path)
+    return path.with_name(f"{path.name}.lock")
+
+
+def file_stamp(path: Path) -> Optional[FileStamp]:
+    """
+    Get a change stamp for a file.
+    
+    Returns:
+        (mtime_ns, inode, size), or None if the file does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+def _acquire_os_lock(path: Path, deadline: float) -> Optional[int]:
+    """Open the lock file and take an exclusive flock on it."""
+    if fcntl is None:
+        return None
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                raise FileLockTimeout(f"Timed out waiting for lock on {path}")
+            time.sleep(_POLL_SECONDS)
+
+
+def _release_os_lock(fd: Optional[int]) -> None:
+    """Release and close a lock file taken by _acquire_os_lock."""
+    if fd is None:
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = FILE_LOCK_TIMEOUT_SECONDS) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a data file across threads and processes.
+    
+    Args:
+        path: Data file to lock (the lock is taken on ``<path>.lock``)
+        timeout: Seconds to wait for the lock
+    
+    Raises:
+        FileLockTimeout: If the lock is not acquired within timeout.
+    
+    Example:
+        >>> with file_lock(DATA_DIR / "john" / "memory.json"):
+        ...     data = read_json(path); data["x"] = 1; write_json(path, data)
+    """
+    target = lock_path_for(path)
+    key = str(target.resolve())
+    with _path_locks_guard:
+        state = _path_locks.setdefault(key, _PathLock())
+    
+    deadline = time.monotonic() + timeout
+    if not state.rlock.acquire(timeout=timeout):
+        raise FileLockTimeout(f"Timed out waiting for lock on {target}")
+    try:
+        if state.depth == 0:
+            state.fd = _acquire_os_lock(target, deadline)
+        state.depth += 1
+        try:
+            yield
+        finally:
+            state.depth -= 1
+            if state.depth == 0:
+                fd, state.fd = state.fd, None
+                _release_os_lock(fd)
+    finally:
+        state.rlock.release()
+
+
+def locked(method: Callable) -> Callable:
+    """
+    Decorate a manager method to run under the lock of its data file.
+    
+    The instance must provide a ``lock_path`` attribute naming the data file.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with file_lock(self.lock_path):
+            return method(self, *args, **kwargs)
+    return wrapper
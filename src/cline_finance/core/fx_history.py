@@ -0,0 +1,177 @@
+"""
+FX History - Daily FX rates with vectorized as-of lookups.
+
+Daily closes of each currency against the FX pivot are kept in the local
+history store (e.g. ``EURUSD=X``), so they are downloaded once and topped up
+incrementally. Lookups take many dates at once and resolve each one to the
+last close on or before it with a single ``np.searchsorted`` per currency.
+"""
+import logging
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+
+from cline_finance.constants import FX_PIVOT_CURRENCY, HISTORY_TOPUP_INTERVAL_SECONDS
+from cline_finance.core.history_store import get_history_store
+
+logger = logging.getLogger(__name__)
+
+# Extra days fetched before the earliest requested date so weekends and holidays resolve
+_LOOKBACK_DAYS = 7
+
+# Bumped whenever a loaded FX series differs from the last one seen for its pair
+_epoch = 0
+_seen: dict[str, tuple[int, np.datetime64]] = {}  # Pair -> (bars, last date)
+_epoch_lock = threading.Lock()
+
+
+def fx_history_epoch() -> tuple[int, int]:
+    """
+    Hashable version of the FX history; results computed from it stay valid while it is equal.
+    
+    Changes when a loaded series gained or lost bars, and at least once per
+    history top-up interval (when new closes may have been stored).
+    """
+    with _epoch_lock:
+        return (int(time.time() // max(HISTORY_TOPUP_INTERVAL_SECONDS, 1)), _epoch)
+
+
+def _note_series(symbol: str, dates: np.ndarray) -> None:
+    global _epoch
+    shape = (len(dates), dates[-1] if len(dates) else np.datetime64("NaT", "D"))
+    with _epoch_lock:
+        previous = _seen.get(symbol)
+        if previous is not None and (previous[0] != shape[0] or previous[1] != shape[1]):
+            _epoch += 1
+        _seen[symbol] = shape
+
+
+def to_days(dates: Iterable) -> np.ndarray:
+    """
+    Convert dates (YYYY-MM-DD strings, date/datetime or datetime64) to datetime64[D].
+    
+    Unparseable values (e.g. "unknown") become NaT.
+    """
+    days = []
+    for value in dates:
+        try:
+            days.append(np.datetime64(str(value)[:10], "D"))
+        except ValueError:
+            days.append(np.datetime64("NaT", "D"))
+    return np.array(days, dtype="datetime64[D]")
+
+
+def _pivot_series(currency: str, pivot: str, start: str) -> Optional[tuple[np.ndarray, np.ndarray]]:
+    """Get (dates, pivot units per currency unit), trying the direct pair then the inverse."""
+    store = get_history_store()
+    for symbol, invert in ((f"{currency}{pivot}=X", False), (f"{pivot}{currency}=X", True)):
+        try:
+            series = store.get_series(symbol, "1d", start)
+        except Exception as e:
+            logger.warning(f"Could not load FX history for {symbol}: {e}")
+            continue
+        if series is None:
+            continue
+        closes = series.columns["Close"]
+        valid = ~np.isnan(closes) & (closes > 0)
+        if not valid.any():
+            continue
+        rates = 1 / closes[valid] if invert else closes[valid]
+        _note_series(symbol, series.dates)
+        return series.dates[valid], rates
+    return None
+
+
+def _pivot_rates_asof(currency: str, query: np.ndarray, pivot: str) -> np.ndarray:
+    """Pivot units per currency unit on each query date (NaN where unknown)."""
+    if currency == pivot:
+        return np.ones(len(query))
+    
+    out = np.full(len(query), np.nan)
+    known = ~np.isnat(query)
+    if not known.any():
+        return out
+    
+    start = str(query[known].min() - np.timedelta64(_LOOKBACK_DAYS, "D"))
+    series = _pivot_series(currency, pivot, start)
+    if series is None:
+        return out
+    
+    dates, rates = series
+    idx = np.searchsorted(dates, query, side="right") - 1
+    hit = known & (idx >= 0)
+    out[hit] = rates[idx[hit]]
+    return out
+
+
+def get_fx_rates_asof(
+    from_currency: str,
+    to_currency: str,
+    dates: Iterable,
+    pivot: str = FX_PIVOT_CURRENCY,
+) -> np.ndarray:
+    """
+    Get the rate to convert one unit of from_currency into to_currency on each date.
+    
+    Each date uses the last daily close on or before it. Cross rates are
+    triangulated through the pivot currency.
+    
+    Args:
+        from_currency: Source currency
+        to_currency: Target currency
+        dates: Dates to look up (any mix accepted by to_days)
+        pivot: Currency both sides are quoted against
+    
+    Returns:
+        Array of rates aligned with dates (NaN where no rate is available).
+    
+    Example:
+        >>> get_fx_rates_asof("USD", "EUR", ["2024-01-02", "2024-06-28"])
+    """
+    query = dates if isinstance(dates, np.ndarray) and dates.dtype == "datetime64[D]" else to_days(dates)
+    from_currency = from_currency.upper()
+    to_currency = to_currency.upper()
+    pivot = pivot.upper()
+    
+    if from_currency == to_currency:
+        return np.ones(len(query))
+    return _pivot_rates_asof(from_currency, query, pivot) / _pivot_rates_asof(to_currency, query, pivot)
+
+
+def convert_asof(
+    amounts: Iterable[float],
+    currencies: Iterable[str],
+    dates: Iterable,
+    to_currency: str,
+    pivot: str = FX_PIVOT_CURRENCY,
+) -> np.ndarray:
+    """
+    Convert many amounts, each at the rate of its own date.
+    
+    Amounts are grouped by currency, so the cost is one history lookup per
+    distinct currency regardless of how many amounts are converted.
+    
+    Args:
+        amounts: Amounts to convert
+        currencies: Currency of each amount
+        dates: Date of each amount
+        to_currency: Target currency
+        pivot: Currency rates are triangulated through
+    
+    Returns:
+        Array of converted amounts (NaN where no rate is available).
+    
+    Example:
+        >>> convert_asof([1000, 500], ["USD", "GBP"], ["2023-03-01", "2024-05-10"], "EUR")
+    """
+    amounts = np.asarray(amounts if isinstance(amounts, np.ndarray) else list(amounts), dtype=np.float64)
+    currencies = np.array([str(c).upper() for c in currencies])
+    query = dates if isinstance(dates, np.ndarray) and dates.dtype == "datetime64[D]" else to_days(dates)
+    out = np.full(len(amounts), np.nan)
+    
+    for currency in np.unique(currencies):
+        mask = currencies == currency
+        out[mask] = amounts[mask] * get_fx_rates_asof(currency, to_currency, query[mask], pivot)
+    return out
@@ -0,0 +1,181 @@
+"""
+FX Matrix - Cross rates for a set of currencies from one batched fetch.
+
+Each currency is quoted once against a pivot currency (USD by default) and
+every cross rate is derived in memory by triangulation:
+
+    rate(A -> B) = pivot_per_unit(A) / pivot_per_unit(B)
+
+So N currencies need at most N-1 fetches (one bulk download when possible),
+however many positions or pairs are converted.
+"""
+import logging
+from typing import Iterable, Optional
+
+from cline_finance.constants import FX_PIVOT_CURRENCY
+from cline_finance.core.executor import fan_out
+from cline_finance.core.market_cache import get_market_cache
+from cline_finance.core.providers import extract_closes, get_provider
+from cline_finance.core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_download_flights = SingleFlight()
+
+
+class FXMatrix:
+    """Exchange rates between any currencies quoted against a common pivot."""
+    
+    def __init__(self, pivot: str, pivot_rates: dict[str, float]):
+        """
+        Initialize the matrix.
+        
+        Args:
+            pivot: Pivot currency code
+            pivot_rates: Units of pivot currency per one unit of each currency
+        """
+        self.pivot = pivot
+        self.pivot_rates = {**pivot_rates, pivot: 1.0}
+    
+    @property
+    def epoch(self) -> tuple:
+        """Hashable snapshot of the rates; equal epochs give equal conversions."""
+        return (self.pivot, tuple(sorted(self.pivot_rates.items())))
+    
+    @property
+    def currencies(self) -> list[str]:
+        """Currencies with a known rate."""
+        return sorted(self.pivot_rates)
+    
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """
+        Get the rate to convert one unit of from_currency into to_currency.
+        
+        Returns:
+            The cross rate, or None if either currency is unknown.
+        """
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        if from_currency == to_currency:
+            return 1.0
+        from_rate = self.pivot_rates.get(from_currency)
+        to_rate = self.pivot_rates.get(to_currency)
+        if not from_rate or not to_rate:
+            return None
+        return from_rate / to_rate
+    
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> Optional[float]:
+        """Convert an amount (None if the rate is unknown)."""
+        rate = self.rate(from_currency, to_currency)
+        return amount * rate if rate is not None else None
+    
+    def rates_against(self, base: str, currencies: Optional[Iterable[str]] = None) -> dict[str, float]:
+        """
+        Get how many units of each currency one unit of base buys.
+        
+        Args:
+            base: Base currency
+            currencies: Currencies to include (default: all known except base)
+        """
+        base = base.upper()
+        targets = currencies if currencies is not None else self.currencies
+        rates = {}
+        for currency in targets:
+            currency = currency.upper()
+            if currency == base:
+                continue
+            rate = self.rate(base, currency)
+            if rate is not None:
+                rates[currency] = rate
+        return rates
+
+
+def _pair_symbol(from_currency: str, to_currency: str) -> str:
+    return f"{from_currency}{to_currency}=X"
+
+
+def _download_pivot_rates(currencies: tuple[str, ...], pivot: str) -> dict[str, float]:
+    """Fetch pivot rates for currencies in one bulk download, then per pair for any it missed."""
+    rates = {}
+    symbols = [_pair_symbol(c, pivot) for c in currencies]
+    
+    try:
+        data = get_provider().download(
+            symbols,
+            period="5d",
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            progress=False,
+            threads=True,
+        )
+        if data is not None and not data.empty:
+            for currency, symbol in zip(currencies, symbols):
+                closes = extract_closes(data, symbol, len(symbols))
+                if closes is not None and not closes.empty and closes.iloc[-1] > 0:
+                    rates[currency] = float(closes.iloc[-1])
+    except Exception as e:
+        logger.warning(f"Bulk FX download failed for {', '.join(currencies)}: {e}")
+    
+    missing = [c for c in currencies if c not in rates]
+    for result in fan_out(lambda c: _fetch_pivot_rate(c, pivot), missing):
+        if result.ok and result.value:
+            rates[result.item] = result.value
+        else:
+            logger.warning(f"No FX rate for {result.item}/{pivot}: {result.error}")
+    
+    cache = get_market_cache()
+    for currency, rate in rates.items():
+        cache.set("fx", ("pivot", currency, pivot), rate)
+    return rates
+
+
+def _fetch_pivot_rate(currency: str, pivot: str) -> Optional[float]:
+    """Fetch a single pivot rate, trying the direct pair then the inverse pair."""
+    provider = get_provider()
+    hist = provider.history(_pair_symbol(currency, pivot), period="5d")
+    if not hist.empty and hist["Close"].iloc[-1] > 0:
+        return float(hist["Close"].iloc[-1])
+    
+    hist = provider.history(_pair_symbol(pivot, currency), period="5d")
+    if not hist.empty and hist["Close"].iloc[-1] > 0:
+        return 1 / float(hist["Close"].iloc[-1])
+    return None
+
+
+def get_fx_matrix(currencies: Iterable[str], pivot: str = FX_PIVOT_CURRENCY) -> FXMatrix:
+    """
+    Build an FX matrix covering the given currencies.
+    
+    Pivot rates come from the market cache ("fx" kind); the ones not cached
+    are fetched together in one bulk download.
+    
+    Args:
+        currencies: Currency codes in play (e.g. portfolio currencies plus base)
+        pivot: Currency every rate is quoted against
+    
+    Returns:
+        FXMatrix with every currency that could be priced.
+    
+    Example:
+        >>> fx = get_fx_matrix(["EUR", "GBP", "USD"])
+        >>> fx.rate("GBP", "EUR")
+    """
+    pivot = pivot.upper()
+    wanted = sorted({c.upper() for c in currencies if c} - {pivot})
+    cache = get_market_cache()
+    
+    pivot_rates = {}
+    missing = []
+    for currency in wanted:
+        rate = cache.get("fx", ("pivot", currency, pivot))
+        if rate is not None:
+            pivot_rates[currency] = rate
+        else:
+            missing.append(currency)
+    
+    if missing:
+        key = (tuple(missing), pivot)
+        pivot_rates.update(_download_flights.do(key, lambda: _download_pivot_rates(tuple(missing), pivot)))
+    
+    return FXMatrix(pivot, pivot_rates)
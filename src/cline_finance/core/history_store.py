@@ -0,0 +1,385 @@
+"""
+History Store - Persistent local OHLCV price history with incremental top-ups.
+
+Bars are kept per symbol and interval as columnar NumPy arrays in
+``data/history/{interval}/{symbol}.npz``. A request only downloads the bars
+after the last stored one (plus any older range not yet covered) and serves
+the rest from disk.
+"""
+import io
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from cline_finance.constants import (
+    HISTORY_DIR,
+    HISTORY_STORE_INTERVALS,
+    HISTORY_TOPUP_INTERVAL_SECONDS,
+)
+from cline_finance.core.providers import get_provider
+from cline_finance.core.storage import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Relative close difference on the overlapping bar that signals a split/dividend re-adjustment
+_ADJUSTMENT_TOLERANCE = 1e-3
+
+# Calendar offsets for yfinance-style periods ("1d"/"5d" are handled as bar counts)
+_PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+_PERIOD_BARS = {"1d": 1, "5d": 5}
+
+# Sentinel "covered from" date for full (period="max") history
+_EARLIEST = np.datetime64("1900-01-01", "D")
+
+
+@dataclass
+class PriceSeries:
+    """Columnar OHLCV bars for one symbol and interval."""
+    
+    dates: np.ndarray        # datetime64[D], ascending, unique
+    columns: dict[str, np.ndarray]  # OHLCV column -> float64
+    covered_from: np.datetime64  # Earliest date the store has asked upstream for
+    checked_at: float = 0.0  # Last top-up time (epoch seconds)
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, covered_from: np.datetime64) -> "PriceSeries":
+        """Build a series from a yfinance history frame."""
+        index = frame.index
+        if getattr(index, "tz", None) is not None:
+            index = index.tz_localize(None)
+        dates = index.values.astype("datetime64[D]")
+        columns = {
+            col: (frame[col].to_numpy(dtype=np.float64) if col in frame.columns
+                  else np.full(len(frame), np.nan))
+            for col in OHLCV_COLUMNS
+        }
+        # Keep the last bar per day
+        _, last = np.unique(dates[::-1], return_index=True)
+        keep = np.sort(len(dates) - 1 - last)
+        return cls(
+            dates=dates[keep],
+            columns={k: v[keep] for k, v in columns.items()},
+            covered_from=covered_from,
+        )
+    
+    def merge(self, newer: "PriceSeries") -> "PriceSeries":
+        """Merge another series, preferring its bars where dates overlap."""
+        keep_old = ~np.isin(self.dates, newer.dates)
+        dates = np.concatenate([self.dates[keep_old], newer.dates])
+        order = np.argsort(dates, kind="stable")
+        columns = {
+            col: np.concatenate([self.columns[col][keep_old], newer.columns[col]])[order]
+            for col in OHLCV_COLUMNS
+        }
+        return PriceSeries(
+            dates=dates[order],
+            columns=columns,
+            covered_from=min(self.covered_from, newer.covered_from),
+            checked_at=max(self.checked_at, newer.checked_at),
+        )
+    
+    def slice(self, start: Optional[np.datetime64], end: Optional[np.datetime64]) -> "PriceSeries":
+        """Get the bars in [start, end]."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, start, side="left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, side="right"))
+        return PriceSeries(
+            dates=self.dates[lo:hi],
+            columns={k: v[lo:hi] for k, v in self.columns.items()},
+            covered_from=self.covered_from,
+            checked_at=self.checked_at,
+        )
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Convert to a DataFrame shaped like yfinance history output."""
+        index = pd.DatetimeIndex(self.dates.astype("datetime64[ns]"), name="Date")
+        return pd.DataFrame({col: self.columns[col] for col in OHLCV_COLUMNS}, index=index)
+
+
+def _safe_filename(symbol: str) -> str:
+    """Make a ticker symbol safe to use as a filename."""
+    return re.sub(r"[^A-Za-z0-9._^=-]", "_", symbol.upper())
+
+
+def _today() -> np.datetime64:
+    return np.datetime64(pd.Timestamp.now("UTC").date(), "D")
+
+
+class HistoryStore:
+    """
+    On-disk price history store with incremental top-up fetches.
+    
+    Only the intervals in HISTORY_STORE_INTERVALS are stored; other intervals
+    are fetched live from the market data provider.
+    """
+    
+    def __init__(self, root: Optional[Path] = None):
+        """
+        Initialize the history store.
+        
+        Args:
+            root: Directory for history files. Defaults to HISTORY_DIR.
+        """
+        self.root = root or HISTORY_DIR
+        self._locks: dict[tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+    
+    def _lock_for(self, symbol: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+    
+    def _path(self, symbol: str, interval: str) -> Path:
+        return self.root / interval / f"{_safe_filename(symbol)}.npz"
+    
+    def _load(self, symbol: str, interval: str) -> Optional[PriceSeries]:
+        """Load a stored series, or None if missing or unreadable."""
+        path = self._path(symbol, interval)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                return PriceSeries(
+                    dates=data["dates"],
+                    columns={col: data[col] for col in OHLCV_COLUMNS},
+                    covered_from=data["covered_from"][0],
+                    checked_at=float(data["checked_at"][0]),
+                )
+        except Exception as e:
+            logger.warning(f"Discarding unreadable history file {path}: {e}")
+            return None
+    
+    def _save(self, symbol: str, interval: str, series: PriceSeries) -> None:
+        """Write a series atomically (no backups: the store is a rebuildable cache)."""
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            dates=series.dates,
+            covered_from=np.array([series.covered_from], dtype="datetime64[D]"),
+            checked_at=np.array([series.checked_at], dtype=np.float64),
+            **series.columns,
+        )
+        atomic_write_bytes(self._path(symbol, interval), buffer.getvalue(), backups=0)
+    
+    def _fetch(
+        self,
+        symbol: str,
+        interval: str,
+        start: Optional[np.datetime64] = None,
+        end: Optional[np.datetime64] = None,
+        period: Optional[str] = None,
+    ) -> Optional[PriceSeries]:
+        """Fetch bars from the market data provider (None if nothing came back)."""
+        kwargs = {"interval": interval}
+        if period:
+            kwargs["period"] = period
+        else:
+            kwargs["start"] = str(start)
+            if end is not None:
+                # yfinance treats end as exclusive
+                kwargs["end"] = str(end + np.timedelta64(1, "D"))
+        
+        frame = get_provider().history(symbol, **kwargs)
+        if frame is None or frame.empty:
+            return None
+        
+        covered_from = _EARLIEST if period == "max" else (start if start is not None else _today())
+        series = PriceSeries.from_frame(frame, covered_from)
+        series.checked_at = time.time()
+        return series
+    
+    def _ensure(self, symbol: str, interval: str, start: Optional[np.datetime64]) -> Optional[PriceSeries]:
+        """
+        Make sure the store covers [start, today] and return the stored series.
+        
+        Args:
+            start: Earliest date needed, or None for the full history.
+        """
+        series = self._load(symbol, interval)
+        changed = False
+        
+        # Nothing stored yet, or the request reaches further back than we have
+        needed_from = _EARLIEST if start is None else start
+        if series is None or needed_from < series.covered_from:
+            if start is None:
+                fetched = self._fetch(symbol, interval, period="max")
+            else:
+                fetched = self._fetch(
+                    symbol, interval, start=start,
+                    end=series.covered_from if series is not None else None,
+                )
+            if fetched is not None:
+                series = fetched if series is None else series.merge(fetched)
+                changed = True
+            elif series is not None:
+                # Nothing older exists upstream; remember that we asked
+                series.covered_from = needed_from
+                changed = True
+        
+        if series is None:
+            return None
+        
+        # Top up bars after the last stored one (at most once per top-up interval)
+        if time.time() - series.checked_at >= HISTORY_TOPUP_INTERVAL_SECONDS and len(series.dates):
+            last_date = series.dates[-1]
+            last_close = series.columns["Close"][-1]
+            fetched = self._fetch(symbol, interval, start=last_date)
+            series.checked_at = time.time()
+            changed = True
+            
+            if fetched is not None:
+                overlap = np.searchsorted(fetched.dates, last_date)
+                readjusted = (
+                    overlap < len(fetched.dates)
+                    and fetched.dates[overlap] == last_date
+                    and last_close > 0
+                    and abs(fetched.columns["Close"][overlap] / last_close - 1) > _ADJUSTMENT_TOLERANCE
+                    and interval == "1d"
+                    and last_date < _today()
+                )
+                if readjusted:
+                    # Split or dividend re-adjusted past prices: reload the covered range
+                    logger.info(f"Price adjustment detected for {symbol}, refetching history")
+                    refetched = (
+                        self._fetch(symbol, interval, period="max")
+                        if series.covered_from == _EARLIEST
+                        else self._fetch(symbol, interval, start=series.covered_from)
+                    )
+                    if refetched is not None:
+                        refetched.covered_from = series.covered_from
+                        series = refetched
+                else:
+                    fetched.covered_from = series.covered_from
+                    series = series.merge(fetched)
+        
+        if changed:
+            self._save(symbol, interval, series)
+        return series
+    
+    def get_history(
+        self,
+        symbol: str,
+        interval: str = "1d",
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Get OHLCV bars, serving stored bars locally and fetching only what is missing.
+        
+        Args:
+            symbol: Ticker symbol
+            interval: Bar interval (1d, 1wk, 1mo are stored; others are fetched live)
+            period: yfinance-style period (1d, 5d, 1mo, ..., ytd, max). Ignored if start is given.
+            start: First date to include (YYYY-MM-DD)
+            end: Last date to include (YYYY-MM-DD)
+        
+        Returns:
+            DataFrame indexed by date with Open, High, Low, Close, Volume columns.
+        """
+        symbol = symbol.upper()
+        
+        if interval not in HISTORY_STORE_INTERVALS:
+            if start:
+                # yfinance treats end as exclusive
+                end = str(np.datetime64(end, "D") + np.timedelta64(1, "D")) if end else None
+                return get_provider().history(symbol, start=start, end=end, interval=interval)
+            return get_provider().history(symbol, period=period or "1mo", interval=interval)
+        
+        end_date = np.datetime64(end, "D") if end else None
+        bar_count = None
+        if start:
+            start_date = np.datetime64(start, "D")
+        elif period in _PERIOD_BARS:
+            # Last N bars; a week of calendar days covers them
+            bar_count = _PERIOD_BARS[period]
+            start_date = _today() - np.timedelta64(bar_count + 7, "D")
+        elif period == "ytd":
+            start_date = np.datetime64(f"{pd.Timestamp.now('UTC').year}-01-01", "D")
+        elif period == "max":
+            start_date = None
+        else:
+            offset = _PERIOD_OFFSETS.get(period or "1mo", _PERIOD_OFFSETS["1mo"])
+            start_date = np.datetime64((pd.Timestamp(_today()) - offset).date(), "D")
+        
+        with self._lock_for(symbol, interval):
+            series = self._ensure(symbol, interval, start_date)
+        
+        if series is None:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        
+        window = series.slice(start_date, end_date)
+        frame = window.to_frame()
+        if bar_count is not None:
+            frame = frame.tail(bar_count)
+        return frame
+    
+    def get_series(
+        self,
+        symbol: str,
+        interval: str = "1d",
+        start: Optional[str] = None,
+    ) -> Optional[PriceSeries]:
+        """
+        Get the stored columnar series from start to today, fetching only what is missing.
+        
+        Args:
+            symbol: Ticker symbol
+            interval: Stored bar interval (1d, 1wk, 1mo)
+            start: Earliest date needed (YYYY-MM-DD), or None for the full history
+        
+        Returns:
+            The whole stored series (it may reach back before start), or None
+            if the symbol has no data.
+        
+        Raises:
+            ValueError: If the interval is not stored.
+        """
+        if interval not in HISTORY_STORE_INTERVALS:
+            raise ValueError(f"Interval {interval} is not stored (use one of {', '.join(HISTORY_STORE_INTERVALS)})")
+        symbol = symbol.upper()
+        start_date = np.datetime64(start, "D") if start else None
+        with self._lock_for(symbol, interval):
+            return self._ensure(symbol, interval, start_date)
+    
+    def clear(self, symbol: Optional[str] = None) -> None:
+        """Delete stored history for one symbol (all intervals) or everything."""
+        for interval in HISTORY_STORE_INTERVALS:
+            if symbol:
+                self._path(symbol, interval).unlink(missing_ok=True)
+            elif (self.root / interval).exists():
+                for path in (self.root / interval).glob("*.npz"):
+                    path.unlink(missing_ok=True)
+
+
+# Singleton instance
+_history_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    """Get the singleton history store."""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore()
+    return _history_store
+
+
+def reset_history_store() -> None:
+    """Reset the singleton instance (for testing)."""
+    global _history_store
+    _history_store = None
@@ -0,0 +1,185 @@
+"""
+Ledger - Append-only log of portfolio trade events.
+
+Every portfolio mutation is written as one JSON line to ``portfolio.ledger.jsonl`` next
+to the owner's ``portfolio.json``, so a trade costs a single small append
+instead of rewriting every lot. ``portfolio.json`` becomes a periodic
+snapshot that records the sequence number and byte offset of the last event
+it contains; loading reads the snapshot and replays only the events after it.
+
+The ledger is never truncated by compaction, so it is also the complete,
+replayable trade history of the portfolio. Bulk imports are written as one
+"batch" event (a single line), so they are applied entirely or not at all.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Event operations ("batch" wraps several events that must apply together)
+LEDGER_OPS = ("add", "update", "remove", "sell", "cash", "batch")
+
+
+def flatten_events(events: Iterator[dict]) -> Iterator[dict]:
+    """Expand "batch" events into their parts (each tagged with the batch's seq and ts)."""
+    for event in events:
+        if event.get("op") != "batch":
+            yield event
+            continue
+        for part in event.get("events", []):
+            yield {"seq": event["seq"], "ts": event.get("ts"), **part, "batch": True}
+
+
+class Ledger:
+    """Append-only JSON-lines event log with sequence numbers."""
+    
+    def __init__(self, path: Path):
+        """
+        Initialize the ledger.
+        
+        Args:
+            path: Ledger file (created on the first append)
+        """
+        self.path = Path(path)
+    
+    def size(self) -> int:
+        """Current size of the ledger file in bytes (0 if missing)."""
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+    
+    def _repair_tail(self) -> None:
+        """Drop a partially written last line left behind by a crash."""
+        size = self.size()
+        if size == 0:
+            return
+        
+        with open(self.path, "rb+") as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            keep = 0
+            end = size
+            while end > 0:
+                start = max(0, end - 64 * 1024)
+                f.seek(start)
+                cut = f.read(end - start).rfind(b"\n")
+                if cut >= 0:
+                    keep = start + cut + 1
+                    break
+                end = start
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+        logger.warning(f"Truncated incomplete last event in {self.path} ({size - keep} bytes)")
+    
+    def append(self, seq: int, op: str, **payload) -> tuple[dict, int]:
+        """
+        Durably append one event.
+        
+        Callers appending from several processes must hold the portfolio's
+        file lock (core.file_lock) so sequence numbers stay unique.
+        
+        Args:
+            seq: Sequence number of the event (previous + 1)
+            op: Operation name (see LEDGER_OPS)
+            **payload: Operation fields
+        
+        Returns:
+            Tuple of (event, byte offset just past the event).
+        """
+        if op not in LEDGER_OPS:
+            raise ValueError(f"Unknown ledger operation: {op}")
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._repair_tail()
+        
+        event = {"seq": seq, "ts": datetime.utcnow().isoformat() + "Z", "op": op, **payload}
+        line = json.dumps(event, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with open(self.path, "ab") as f:
+            f.write(line.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            offset = f.tell()
+        return event, offset
+    
+    def read(self, after_seq: int = 0, offset: int = 0) -> Iterator[tuple[dict, int]]:
+        """
+        Iterate over events with a sequence number greater than after_seq.
+        
+        Args:
+            after_seq: Last sequence number already applied
+            offset: Byte offset to start scanning from (a hint; the whole
+                    file is scanned if it does not point at a line start
+                    followed by event after_seq + 1)
+        
+        Yields:
+            Tuples of (event, byte offset just past the event).
+        """
+        size = self.size()
+        if size == 0:
+            return
+        if offset and not self._starts_at(offset, after_seq + 1, size):
+            offset = 0
+        
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            position = offset
+            for raw in f:
+                position += len(raw)
+                if not raw.endswith(b"\n"):
+                    break  # Incomplete last line from an interrupted append
+                try:
+                    event = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    logger.warning(f"Skipping unreadable ledger line in {self.path} at byte {position - len(raw)}")
+                    continue
+                if event.get("seq", 0) > after_seq:
+                    yield event, position
+    
+    def _starts_at(self, offset: int, seq: int, size: int) -> bool:
+        """Check that offset is a line start holding event seq (or the end of file)."""
+        if offset == size:
+            return True
+        if offset > size:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                return False
+            line = f.readline()
+        try:
+            return json.loads(line).get("seq") == seq
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return False
+    
+    def events(
+        self,
+        symbol: Optional[str] = None,
+        op: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Get recorded events, newest first.
+        
+        Args:
+            symbol: Filter by symbol
+            op: Filter by operation
+            limit: Maximum events to return
+        
+        Returns:
+            List of event dictionaries.
+        """
+        symbol = symbol.upper() if symbol else None
+        matches = [
+            event for event in flatten_events(e for e, _ in self.read())
+            if (not symbol or event.get("symbol") == symbol)
+            and (not op or event.get("op") == op)
+        ]
+        matches.reverse()
+        return matches[:limit] if limit else matches
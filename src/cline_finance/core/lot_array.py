@@ -0,0 +1,276 @@
+"""
+Lot Array - Columnar, NumPy-backed storage for the lots of one position.
+
+Positions with long purchase histories (e.g. monthly DCA plans) keep their
+lots as parallel arrays instead of one Python object per lot:
+
+    dates      datetime64[D]  (NaT for unknown dates)
+    shares     float64
+    price      float64
+    currency   int16 codes into a process-wide currency table
+
+Totals, trade-date FX conversion and P&L are single vectorized operations,
+and JSON lot records load straight into the arrays.
+"""
+from typing import Iterable, Optional
+
+import numpy as np
+
+from cline_finance.core.fx_history import convert_asof
+
+_INITIAL_CAPACITY = 8
+
+# Process-wide currency code table (code -> name, name -> code)
+_currency_names: list[str] = []
+_currency_codes: dict[str, int] = {}
+
+
+def currency_code(currency: str) -> int:
+    """Get (registering if needed) the small-int code of a currency."""
+    currency = (currency or "").upper()
+    code = _currency_codes.get(currency)
+    if code is None:
+        code = _currency_codes[currency] = len(_currency_names)
+        _currency_names.append(currency)
+    return code
+
+
+def currency_name(code: int) -> str:
+    """Get the currency of a code."""
+    return _currency_names[code]
+
+
+def _parse_dates(raw: list[str], unparsed: dict[int, str]) -> np.ndarray:
+    """Parse YYYY-MM-DD strings in one pass; others become NaT and are kept in unparsed."""
+    cleaned = [d if len(d) == 10 else "NaT" for d in raw]
+    try:
+        dates = np.array(cleaned, dtype="datetime64[D]")
+    except ValueError:
+        dates = np.array([_parse_date(d) for d in cleaned], dtype="datetime64[D]")
+    for i in np.flatnonzero(np.isnat(dates)):
+        unparsed[int(i)] = raw[i]
+    return dates
+
+
+def _parse_date(text: str) -> np.datetime64:
+    try:
+        return np.datetime64(text, "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+class LotArray:
+    """Lots of one position as parallel arrays with amortized appends."""
+    
+    __slots__ = ("_dates", "_shares", "_price", "_currency", "_size", "_notes", "_raw_dates")
+    
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        """
+        Create an empty lot array.
+        
+        Args:
+            capacity: Initial number of lots to reserve space for
+        """
+        capacity = max(capacity, 1)
+        self._dates = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[D]")
+        self._shares = np.zeros(capacity, dtype=np.float64)
+        self._price = np.zeros(capacity, dtype=np.float64)
+        self._currency = np.zeros(capacity, dtype=np.int16)
+        self._size = 0
+        self._notes: dict[int, str] = {}       # Sparse: most lots have no notes
+        self._raw_dates: dict[int, str] = {}   # Original text of dates that did not parse
+    
+    # -------------------------------------------------------------------------
+    # Construction and conversion
+    # -------------------------------------------------------------------------
+    
+    @classmethod
+    def from_records(cls, records: list[dict], default_currency: str = "EUR") -> "LotArray":
+        """
+        Build from lot dictionaries as stored in portfolio.json or the ledger.
+        
+        Args:
+            records: Lot dictionaries (date, shares, price, currency, notes)
+            default_currency: Currency of records without one
+        """
+        n = len(records)
+        lots = cls(n)
+        raw = [str(r.get("date", "unknown")) for r in records]
+        lots._dates[:n] = _parse_dates(raw, lots._raw_dates)
+        lots._shares[:n] = np.fromiter((r.get("shares", 0) for r in records), dtype=np.float64, count=n)
+        lots._price[:n] = np.fromiter((r.get("price", 0) for r in records), dtype=np.float64, count=n)
+        currencies = [r.get("currency") or default_currency for r in records]
+        codes = {c: currency_code(c) for c in set(currencies)}
+        lots._currency[:n] = np.fromiter((codes[c] for c in currencies), dtype=np.int16, count=n)
+        lots._notes = {i: r["notes"] for i, r in enumerate(records) if r.get("notes")}
+        lots._size = n
+        return lots
+    
+    @classmethod
+    def from_lots(cls, lots: list, default_currency: str = "EUR") -> "LotArray":
+        """Build from Lot objects."""
+        array = cls(len(lots))
+        for lot in lots:
+            array.append(lot.date, lot.shares, lot.price, lot.currency or default_currency, lot.notes)
+        return array
+    
+    def to_records(self) -> list[dict]:
+        """Convert to lot dictionaries (the portfolio.json lot format)."""
+        records = []
+        for i in range(self._size):
+            record = {
+                "date": self.date_str(i),
+                "shares": float(self._shares[i]),
+                "price": float(self._price[i]),
+                "currency": _currency_names[self._currency[i]],
+            }
+            if self._notes.get(i):
+                record["notes"] = self._notes[i]
+            records.append(record)
+        return records
+    
+    def date_str(self, index: int) -> str:
+        """Get a lot date as YYYY-MM-DD (or its original text if it did not parse)."""
+        if index in self._raw_dates:
+            return self._raw_dates[index]
+        return str(self._dates[index])
+    
+    def note(self, index: int) -> Optional[str]:
+        """Get a lot's notes."""
+        return self._notes.get(index)
+    
+    # -------------------------------------------------------------------------
+    # Mutation
+    # -------------------------------------------------------------------------
+    
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self._shares))
+        extra = capacity - len(self._shares)
+        self._dates = np.concatenate([self._dates, np.full(extra, np.datetime64("NaT"), dtype="datetime64[D]")])
+        self._shares = np.concatenate([self._shares, np.zeros(extra)])
+        self._price = np.concatenate([self._price, np.zeros(extra)])
+        self._currency = np.concatenate([self._currency, np.zeros(extra, dtype=np.int16)])
+    
+    def append(
+        self,
+        date: str,
+        shares: float,
+        price: float,
+        currency: str,
+        notes: Optional[str] = None,
+    ) -> None:
+        """Append one lot (amortized O(1))."""
+        if self._size == len(self._shares):
+            self._grow(self._size + 1)
+        
+        i = self._size
+        date = str(date)
+        self._dates[i] = _parse_date(date) if len(date) == 10 else np.datetime64("NaT")
+        if np.isnat(self._dates[i]):
+            self._raw_dates[i] = date
+        self._shares[i] = shares
+        self._price[i] = price
+        self._currency[i] = currency_code(currency)
+        if notes:
+            self._notes[i] = notes
+        self._size += 1
+    
+    # -------------------------------------------------------------------------
+    # Columns
+    # -------------------------------------------------------------------------
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    @property
+    def dates(self) -> np.ndarray:
+        """Trade dates (datetime64[D], NaT where unknown)."""
+        return self._dates[:self._size]
+    
+    @property
+    def shares(self) -> np.ndarray:
+        """Shares per lot."""
+        return self._shares[:self._size]
+    
+    @property
+    def price(self) -> np.ndarray:
+        """Purchase price per share of each lot."""
+        return self._price[:self._size]
+    
+    @property
+    def currency_codes(self) -> np.ndarray:
+        """Currency code per lot (see currency_name)."""
+        return self._currency[:self._size]
+    
+    @property
+    def currencies(self) -> np.ndarray:
+        """Currency per lot as strings."""
+        return np.array(_currency_names, dtype=object)[self.currency_codes] if self._size else np.array([], dtype=object)
+    
+    @property
+    def cost(self) -> np.ndarray:
+        """Cost per lot (shares * price) in the lot's currency."""
+        return self.shares * self.price
+    
+    # -------------------------------------------------------------------------
+    # Aggregates
+    # -------------------------------------------------------------------------
+    
+    def total_shares(self) -> float:
+        """Total shares of all lots."""
+        return float(self.shares.sum())
+    
+    def total_cost(self) -> float:
+        """Total cost of all lots in their own currencies."""
+        return float(np.dot(self.shares, self.price))
+    
+    def avg_cost(self) -> float:
+        """Share-weighted average price (0 without shares)."""
+        shares = self.total_shares()
+        return self.total_cost() / shares if shares > 0 else 0.0
+    
+    def first_date(self) -> Optional[str]:
+        """Earliest known trade date."""
+        known = self.dates[~np.isnat(self.dates)]
+        return str(known.min()) if len(known) else None
+    
+    def cost_in(self, to_currency: str) -> np.ndarray:
+        """
+        Convert each lot's cost into to_currency at its trade-date FX rate.
+        
+        Args:
+            to_currency: Target currency
+        
+        Returns:
+            Converted cost per lot (NaN where no historical rate is available).
+        """
+        if not self._size:
+            return np.zeros(0)
+        return convert_asof(self.cost, self.currencies, self.dates, to_currency)
+    
+    def unrealized_pnl(self, current_price: float) -> np.ndarray:
+        """
+        Unrealized gain or loss per lot at a price (in the lots' currency).
+        
+        Example:
+            >>> lots.unrealized_pnl(190.0).sum()
+        """
+        return self.shares * (current_price - self.price)
+
+
+def concat_lot_arrays(arrays: Iterable[LotArray]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Concatenate the columns of several lot arrays.
+    
+    Returns:
+        Tuple of (cost, currencies, dates, group) where group[i] is the index
+        of the array lot i came from.
+    """
+    arrays = list(arrays)
+    if not arrays:
+        return np.zeros(0), np.array([], dtype=object), np.array([], dtype="datetime64[D]"), np.zeros(0, dtype=np.intp)
+    cost = np.concatenate([a.cost for a in arrays])
+    currencies = np.concatenate([a.currencies for a in arrays])
+    dates = np.concatenate([a.dates for a in arrays])
+    group = np.repeat(np.arange(len(arrays)), [len(a) for a in arrays])
+    return cost, currencies, dates, group
@@ -0,0 +1,171 @@
+"""
+Lot Matching - Choose which purchase lots a sale consumes and its realized P&L.
+
+Supported methods:
+
+    fifo      oldest lots first
+    lifo      newest lots first
+    hifo      highest purchase price first (minimizes realized gains)
+    specific  lots chosen by index, in the given order
+
+Candidate lots are kept in a heap keyed by the method's priority, so a sale
+costs O(n) to heapify plus O(log n) per consumed lot, whatever the order
+lots were recorded in. Matching never mutates the lots; reduce_lots returns
+the remaining lots after a sale.
+"""
+import heapq
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Iterator, Optional, Sequence
+
+MATCH_METHODS = ("fifo", "lifo", "hifo", "specific")
+
+# Share quantities below this are treated as zero (float rounding)
+SHARE_EPSILON = 1e-9
+
+
+@dataclass
+class LotMatch:
+    """Shares taken from one lot by a sale."""
+    
+    index: int          # Index of the lot in the position's lot list before the sale
+    date: str           # Purchase date of the lot
+    shares: float       # Shares sold from the lot
+    cost_price: float   # Purchase price per share of the lot
+    
+    @property
+    def cost(self) -> float:
+        return self.shares * self.cost_price
+    
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "date": self.date,
+            "shares": self.shares,
+            "cost_price": self.cost_price,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "LotMatch":
+        return cls(
+            index=data["index"],
+            date=data.get("date", "unknown"),
+            shares=data["shares"],
+            cost_price=data.get("cost_price", 0.0),
+        )
+
+
+def _date_ordinal(date: str) -> int:
+    """Sortable day number of a lot date (unknown dates sort as oldest)."""
+    try:
+        return datetime.strptime(str(date)[:10], "%Y-%m-%d").toordinal()
+    except ValueError:
+        return 0
+
+
+def _priority(method: str, lot, index: int) -> tuple:
+    """Heap key of a lot: smaller keys are sold first."""
+    if method == "fifo":
+        return (_date_ordinal(lot.date), index)
+    if method == "lifo":
+        return (-_date_ordinal(lot.date), -index)
+    return (-lot.price, _date_ordinal(lot.date), index)  # hifo
+
+
+def _heap_order(method: str, lots: Sequence) -> Iterator[int]:
+    """Yield lot indices in the method's sell order, popping lazily from a heap."""
+    heap = [(_priority(method, lot, i), i) for i, lot in enumerate(lots) if lot.shares > SHARE_EPSILON]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[1]
+
+
+def match_lots(
+    lots: Sequence,
+    shares: float,
+    method: str = "fifo",
+    lot_indices: Optional[Sequence[int]] = None,
+) -> list[LotMatch]:
+    """
+    Match a sale of shares against purchase lots.
+    
+    Args:
+        lots: The position's lots (objects with date, shares and price)
+        shares: Number of shares sold
+        method: One of MATCH_METHODS
+        lot_indices: Lots to sell from, in order (required for "specific")
+    
+    Returns:
+        The lots consumed, in the order they were matched.
+    
+    Raises:
+        ValueError: For an unknown method, invalid lot indices, or more
+                    shares than the chosen lots hold.
+    
+    Example:
+        >>> match_lots(position.lots, 15, method="hifo")
+        [LotMatch(index=3, date='2024-06-03', shares=10.0, cost_price=212.0), ...]
+    """
+    method = method.lower()
+    if method not in MATCH_METHODS:
+        raise ValueError(f"Unknown lot matching method '{method}'. Use one of: {', '.join(MATCH_METHODS)}")
+    if shares <= 0:
+        raise ValueError("Shares to sell must be positive")
+    
+    if method == "specific":
+        if not lot_indices:
+            raise ValueError("Specific-lot sales need lot_indices")
+        invalid = [i for i in lot_indices if not 0 <= i < len(lots)]
+        if invalid:
+            raise ValueError(f"Lot indices out of range (0-{len(lots) - 1}): {invalid}")
+        order = iter(dict.fromkeys(lot_indices))
+    else:
+        order = _heap_order(method, lots)
+    
+    matches = []
+    remaining = shares
+    for i in order:
+        if remaining <= SHARE_EPSILON:
+            break
+        lot = lots[i]
+        take = min(lot.shares, remaining)
+        if take <= SHARE_EPSILON:
+            continue
+        matches.append(LotMatch(index=i, date=lot.date, shares=take, cost_price=lot.price))
+        remaining -= take
+    
+    if remaining > SHARE_EPSILON:
+        held = shares - remaining
+        raise ValueError(f"Cannot sell {shares:g} shares: the selected lots hold only {held:g}")
+    return matches
+
+
+def reduce_lots(lots: Sequence, matches: Sequence[LotMatch]) -> list:
+    """
+    Get the lots left after a sale (emptied lots are dropped).
+    
+    Args:
+        lots: The lots the matches were computed against
+        matches: Result of match_lots
+    
+    Returns:
+        New list of lots; partially sold lots are copies with fewer shares.
+    """
+    sold: dict[int, float] = {}
+    for match in matches:
+        sold[match.index] = sold.get(match.index, 0.0) + match.shares
+    
+    remaining = []
+    for i, lot in enumerate(lots):
+        if i not in sold:
+            remaining.append(lot)
+            continue
+        left = lot.shares - sold[i]
+        if left > SHARE_EPSILON:
+            remaining.append(replace(lot, shares=left))
+    return remaining
+
+
+def realized_pnl(matches: Sequence[LotMatch], price: float) -> float:
+    """Realized gain or loss of selling the matched shares at price (lot prices in the same currency)."""
+    return sum(m.shares * (price - m.cost_price) for m in matches)
@@ -0,0 +1,238 @@
+"""
+Market Data Cache - Bounded LRU cache with per-kind TTLs and stale-while-revalidate.
+
+Entries are keyed by (kind, key), e.g. ("quote", "AAPL") or ("history", ("AAPL", "1mo", "1d")).
+Each kind has its own freshness window (see MARKET_CACHE_TTLS). With stale-while-revalidate
+enabled, an expired entry is returned immediately while a refresh runs on the fetch executor.
+Concurrent misses for the same entry share a single upstream fetch.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+from cline_finance.constants import (
+    MARKET_CACHE_MAX_ENTRIES,
+    MARKET_CACHE_MAX_STALE_FACTOR,
+    MARKET_CACHE_STALE_WHILE_REVALIDATE,
+    MARKET_CACHE_TTLS,
+)
+from cline_finance.core.executor import submit
+from cline_finance.core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TTL_SECONDS = 300
+
+# Lookup states
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its fetch time."""
+    
+    value: Any
+    fetched_at: float  # time.time()
+    refreshing: bool = False
+    
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class MarketDataCache:
+    """
+    Thread-safe LRU cache for market data.
+    
+    Values are never copied; callers that mutate results must copy them first.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = MARKET_CACHE_MAX_ENTRIES,
+        ttls: Optional[dict[str, float]] = None,
+        stale_while_revalidate: bool = MARKET_CACHE_STALE_WHILE_REVALIDATE,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of entries before least-recently-used eviction
+            ttls: TTL in seconds per data kind. Defaults to MARKET_CACHE_TTLS.
+            stale_while_revalidate: Serve stale entries while refreshing in background
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttls = dict(MARKET_CACHE_TTLS if ttls is None else ttls)
+        self.stale_while_revalidate = stale_while_revalidate
+        self._entries: "OrderedDict[tuple[str, Hashable], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+    
+    def ttl_for(self, kind: str) -> float:
+        """Get the TTL in seconds for a data kind."""
+        return self.ttls.get(kind, _DEFAULT_TTL_SECONDS)
+    
+    def lookup(self, kind: str, key: Hashable, ttl: Optional[float] = None) -> tuple[Any, str]:
+        """
+        Look up an entry without fetching.
+        
+        Returns:
+            Tuple of (value, state) where state is FRESH, STALE or MISS.
+            Stale entries past the maximum stale age are reported as MISS.
+        """
+        ttl = self.ttl_for(kind) if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None:
+                return None, MISS
+            age = entry.age()
+            if age < ttl:
+                self._entries.move_to_end((kind, key))
+                return entry.value, FRESH
+            if age < ttl * MARKET_CACHE_MAX_STALE_FACTOR:
+                self._entries.move_to_end((kind, key))
+                return entry.value, STALE
+            return None, MISS
+    
+    def get(self, kind: str, key: Hashable, ttl: Optional[float] = None) -> Any:
+        """Get a fresh value, or None if missing or expired."""
+        value, state = self.lookup(kind, key, ttl)
+        return value if state == FRESH else None
+    
+    def set(self, kind: str, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[(kind, key)] = CacheEntry(value=value, fetched_at=time.time())
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def fetched_at(self, kind: str, key: Hashable) -> Optional[float]:
+        """Get the fetch time (epoch seconds) of an entry, if cached."""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            return entry.fetched_at if entry else None
+    
+    def get_or_fetch(
+        self,
+        kind: str,
+        key: Hashable,
+        fetcher: Callable[[], Any],
+        ttl: Optional[float] = None,
+        stale_while_revalidate: Optional[bool] = None,
+    ) -> Any:
+        """
+        Get a cached value or fetch and cache it.
+        
+        Args:
+            kind: Data kind (quote, history, info, analyst, calendar, ...)
+            key: Cache key within the kind (e.g. symbol)
+            fetcher: Zero-argument callable that fetches the value. Exceptions
+                     propagate and nothing is cached.
+            ttl: Override the kind's TTL
+            stale_while_revalidate: Override the cache-wide stale-while-revalidate mode
+        
+        Returns:
+            The cached or freshly fetched value.
+        """
+        swr = self.stale_while_revalidate if stale_while_revalidate is None else stale_while_revalidate
+        value, state = self.lookup(kind, key, ttl)
+        
+        if state == FRESH:
+            self._hits += 1
+            return value
+        
+        if state == STALE and swr:
+            self._stale_hits += 1
+            self._refresh_in_background(kind, key, fetcher)
+            return value
+        
+        self._misses += 1
+        return self._flights.do((kind, key), lambda: self._fetch_and_set(kind, key, fetcher, ttl))
+    
+    def _fetch_and_set(self, kind: str, key: Hashable, fetcher: Callable[[], Any], ttl: Optional[float]) -> Any:
+        """Fetch and store a value unless another flight stored a fresh one meanwhile."""
+        value, state = self.lookup(kind, key, ttl)
+        if state == FRESH:
+            return value
+        value = fetcher()
+        self.set(kind, key, value)
+        return value
+    
+    def _refresh_in_background(self, kind: str, key: Hashable, fetcher: Callable[[], Any]) -> None:
+        """Schedule a refresh for a stale entry (at most one at a time per entry)."""
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is None or entry.refreshing:
+                return
+            entry.refreshing = True
+        
+        def refresh() -> None:
+            try:
+                self._flights.do((kind, key), lambda: self._fetch_and_set(kind, key, fetcher, 0))
+            except Exception as e:
+                logger.warning(f"Background refresh failed for {kind}:{key}: {e}")
+                with self._lock:
+                    current = self._entries.get((kind, key))
+                    if current is not None:
+                        current.refreshing = False
+        
+        submit(refresh)
+    
+    def invalidate(self, kind: Optional[str] = None, key: Optional[Hashable] = None) -> int:
+        """
+        Remove entries.
+        
+        Args:
+            kind: Only remove entries of this kind (all kinds if None)
+            key: Only remove this key (requires kind)
+        
+        Returns:
+            Number of entries removed.
+        """
+        with self._lock:
+            if kind is not None and key is not None:
+                return 1 if self._entries.pop((kind, key), None) is not None else 0
+            doomed = [k for k in self._entries if kind is None or k[0] == kind]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+    
+    def stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+            }
+        flights = self._flights.stats()
+        stats["coalesced_fetches"] = flights["shared"]
+        return stats
+
+
+# Singleton instance
+_market_cache: Optional[MarketDataCache] = None
+
+
+def get_market_cache() -> MarketDataCache:
+    """Get the singleton market data cache."""
+    global _market_cache
+    if _market_cache is None:
+        _market_cache = MarketDataCache()
+    return _market_cache
+
+
+def reset_market_cache() -> None:
+    """Reset the singleton instance (for testing)."""
+    global _market_cache
+    _market_cache = None
@@ -0,0 +1,170 @@
+"""
+Memory Index - Secondary indexes over the insight and decision records of a memory.
+
+A RecordIndex sits next to a list of record dictionaries and maps record
+ids to positions and field values (category, symbol, status, each tag, ...)
+to posting lists. Every posting list, like the list of all records, is kept
+sorted by (date, insertion order), so a query walks the smallest matching
+posting list newest first and stops after ``limit`` results instead of
+rebuilding, filtering and sorting every record. Appended records are picked
+up on the next access; in-place updates are reported with update().
+"""
+import bisect
+import heapq
+from typing import Any, Iterator, Optional, Sequence
+
+# Sort key of a record: (date, -position), so walking a posting list backwards
+# yields the newest records first and, within a date, the earliest recorded first
+SortKey = tuple[str, int]
+
+
+def _discard(keys: list, key: SortKey) -> None:
+    """Remove a key from a sorted list if present."""
+    i = bisect.bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        del keys[i]
+
+
+class RecordIndex:
+    """Id, field and date indexes over a list of record dictionaries."""
+    
+    def __init__(self, records: list[dict], fields: Sequence[str], multi_fields: Sequence[str] = ()):
+        """
+        Index a list of records.
+        
+        Args:
+            records: The records (indexed in place, not copied)
+            fields: Fields with a single value per record (e.g. "status")
+            multi_fields: Fields holding a list of values (e.g. "tags")
+        """
+        self.records = records
+        self.fields = tuple(fields)
+        self.multi_fields = tuple(multi_fields)
+        self._rebuild()
+    
+    def _key(self, position: int, record: Optional[dict] = None) -> SortKey:
+        record = self.records[position] if record is None else record
+        return (str(record.get("date") or ""), -position)
+    
+    def _values(self, record: dict) -> Iterator[tuple[str, Any]]:
+        """(field, value) pairs a record is posted under."""
+        for name in self.fields:
+            yield name, record.get(name)
+        for name in self.multi_fields:
+            for value in dict.fromkeys(record.get(name) or []):
+                yield name, value
+    
+    def _rebuild(self) -> None:
+        self._by_id: dict[str, int] = {}
+        self._postings: dict[str, dict[Any, list[SortKey]]] = {
+            name: {} for name in (*self.fields, *self.multi_fields)
+        }
+        self._by_date: list[SortKey] = []
+        for position, record in enumerate(self.records):
+            key = self._key(position)
+            self._by_date.append(key)
+            if record.get("id"):
+                self._by_id[record["id"]] = position
+            for name, value in self._values(record):
+                self._postings[name].setdefault(value, []).append(key)
+        
+        self._by_date.sort()
+        for postings in self._postings.values():
+            for keys in postings.values():
+                keys.sort()
+        self._count = len(self.records)
+    
+    def sync(self) -> None:
+        """Index records appended to the list since the last access."""
+        if len(self.records) < self._count:
+            self._rebuild()
+            return
+        for position in range(self._count, len(self.records)):
+            self._add(position, self.records[position])
+        self._count = len(self.records)
+    
+    def _add(self, position: int, record: dict) -> None:
+        key = self._key(position, record)
+        bisect.insort(self._by_date, key)
+        if record.get("id"):
+            self._by_id[record["id"]] = position
+        for name, value in self._values(record):
+            bisect.insort(self._postings[name].setdefault(value, []), key)
+    
+    def _remove(self, position: int, record: dict) -> None:
+        key = self._key(position, record)
+        _discard(self._by_date, key)
+        if self._by_id.get(record.get("id")) == position:
+            del self._by_id[record["id"]]
+        for name, value in self._values(record):
+            keys = self._postings[name].get(value)
+            if keys is not None:
+                _discard(keys, key)
+                if not keys:
+                    del self._postings[name][value]
+    
+    def update(self, position: int, before: dict) -> None:
+        """
+        Re-index a record that was changed in place.
+        
+        Args:
+            position: Position of the record in the list
+            before: Copy of the record as it was indexed
+        """
+        self._remove(position, before)
+        self._add(position, self.records[position])
+    
+    def position(self, record_id: str) -> Optional[int]:
+        """Position of the record with this id, or None."""
+        return self._by_id.get(record_id)
+    
+    def lookup(self, name: str, value: Any) -> list[int]:
+        """Positions of the records posted under field=value, oldest first."""
+        return [-key[1] for key in self._postings[name].get(value, [])]
+    
+    def query(self, **filters: Any) -> Iterator[dict]:
+        """
+        Yield the records matching all filters, newest first.
+        
+        Args:
+            **filters: field=value for single-valued fields, field=[values]
+                       for multi-valued fields (any value matches). None
+                       values and empty value lists are ignored.
+        
+        Example:
+            >>> list(itertools.islice(index.query(category="market", tags=["fed"]), 10))
+        """
+        filters = {
+            name: value for name, value in filters.items()
+            if value is not None and (value or name not in self.multi_fields)
+        }
+        candidates = []
+        for name, value in filters.items():
+            postings = self._postings[name]
+            if name in self.multi_fields:
+                lists = [postings[v] for v in dict.fromkeys(value) if v in postings]
+            else:
+                lists = [postings[value]] if value in postings else []
+            candidates.append((sum(len(keys) for keys in lists), name, lists))
+        
+        if candidates:
+            _, driver, lists = min(candidates, key=lambda c: c[0])
+            keys = heapq.merge(*(reversed(keys) for keys in lists), reverse=True)
+        else:
+            driver, keys = None, reversed(self._by_date)
+        
+        checks = [(name, value) for name, value in filters.items() if name != driver]
+        previous = None
+        for key in keys:
+            if key == previous:  # Posted under several of the requested values
+                continue
+            previous = key
+            record = self.records[-key[1]]
+            if all(self._matches(record, name, value) for name, value in checks):
+                yield record
+    
+    def _matches(self, record: dict, name: str, value: Any) -> bool:
+        if name in self.multi_fields:
+            held = record.get(name) or []
+            return any(v in held for v in value)
+        return record.get(name) == value
@@ -2,22 +2,40 @@
 Memory Manager - Handles persistent storage of insights, decisions, and portfolio history.
 Supports multi-owner functionality with separate memory files per owner.
 """
-import json
 import logging
+import os
 import uuid
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 from cline_finance.constants import (
     DATA_DIR,
     RETENTION_PERIODS,
     INSIGHT_CATEGORIES,
+    SEARCH_INDEX_NAME,
+    STORAGE_BACKEND,
 )
+from cline_finance.core.file_lock import file_lock, locked
+from cline_finance.core.memory_index import RecordIndex
+from cline_finance.core.memory_segments import SEGMENT_KEYS, MemorySegment, segment_path
+from cline_finance.core.search_index import SearchIndex
+from cline_finance.core.snapshot_writer import flush_snapshots
+from cline_finance.core.storage import StorageError, data_file_exists, read_json
 
 logger = logging.getLogger(__name__)
 
+# Records fetched per round when filtering ranked search hits
+_SEARCH_BATCH = 200
+
+# Indexed fields per memory section: (single-valued fields, multi-valued fields)
+INDEXED_FIELDS = {
+    "insights": (("category", "symbol"), ("tags",)),
+    "decisions": (("symbol", "action", "status"), ()),
+}
+
 
 @dataclass
 class Insight:
@@ -94,6 +112,27 @@ class Decision:
         )
 
 
+def _decision_text(record: dict) -> str:
+    """Searchable text of a decision record."""
+    return " ".join(t for t in (record.get("rationale"), record.get("outcome")) if t)
+
+
+def _insight_matches(
+    insight: Insight,
+    category: Optional[str],
+    symbol: Optional[str],
+    tags: Optional[list[str]],
+    include_expired: bool,
+) -> bool:
+    if not include_expired and insight.is_expired():
+        return False
+    if category and insight.category != category:
+        return False
+    if symbol and insight.symbol != symbol.upper():
+        return False
+    return not tags or any(t in insight.tags for t in tags)
+
+
 @dataclass
 class PortfolioSnapshot:
     """Represents a point-in-time portfolio snapshot."""
@@ -145,14 +184,54 @@ def _get_memory_path_for_owner(owner_slug: Optional[str] = None) -> Path:
     return owner_dir / "memory.json"
 
 
+def memory_data_exists(memory_file: Path) -> bool:
+    """Check whether an owner has memory data (segments or a memory.json from before them)."""
+    return data_file_exists(memory_file) or any(
+        segment_path(memory_file, section).exists() for section in SEGMENT_KEYS
+    )
+
+
+def read_memory(memory_file: Path) -> dict:
+    """
+    Read all memory sections (in the memory.json layout) without changing any file.
+    
+    Reads the segments if there are any, otherwise a memory.json from before
+    them; unlike MemoryManager, a memory.json is never split into segments.
+    
+    Args:
+        memory_file: The owner's memory.json path
+    
+    Returns:
+        Dictionary with "insights", "decisions" and "snapshots" lists.
+    
+    Raises:
+        StorageError: If a memory.json and all its backups are unreadable.
+    """
+    if any(segment_path(memory_file, section).exists() for section in SEGMENT_KEYS):
+        return {
+            section: MemorySegment(segment_path(memory_file, section), key).load()
+            for section, key in SEGMENT_KEYS.items()
+        }
+    data = read_json(memory_file, default={})
+    return {section: data.get(section, []) for section in SEGMENT_KEYS}
+
+
 class MemoryManager:
     """
     Manages persistent memory for the financial advisor with multi-owner support.
     
-    All data stored in owner-specific memory.json file with sections:
+    Each owner's memory is split into one append-only segment per section
+    (core.memory_segments), next to the owner's memory.json path:
     - insights: Market and portfolio insights
     - decisions: Investment decisions with outcomes
     - snapshots: Portfolio history snapshots
+    
+    A change appends one line to its section's segment and a section is read
+    only when first used, so saving an insight never reads or writes the
+    snapshots. Writes hold an advisory lock on memory.json (core.file_lock)
+    and first read what other processes appended, so several server
+    processes can share one DATA_DIR. Insight and decision queries go through
+    secondary indexes (core.memory_index) kept up to date on insert and update.
     """
     
     def __init__(self, memory_file: Optional[Path] = None, owner_slug: Optional[str] = None):
@@ -165,8 +244,11 @@ class MemoryManager:
         """
         self._explicit_file = memory_file
         self._owner_slug = owner_slug
-        self._data: Optional[dict] = None
-        self._loaded_path: Optional[Path] = None
+        self._segments: dict[str, MemorySegment] = {}
+        self._segments_file: Optional[Path] = None  # Memory file the segments belong to
+        self._indexes: dict[str, RecordIndex] = {}
+        self._index_generations: dict[str, int] = {}  # Segment generation each index reflects
+        self._search: Optional[SearchIndex] = None
     
     @property
     def memory_file(self) -> Path:
@@ -175,65 +257,170 @@ class MemoryManager:
             return self._explicit_file
         return _get_memory_path_for_owner(self._owner_slug)
     
-    def _ensure_directory(self) -> None:
-        """Ensure data directory exists."""
-        self.memory_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    def _should_reload(self) -> bool:
-        """Check if we need to reload due to owner change."""
-        if self._data is None:
-            return True
-        current_path = self.memory_file
-        return self._loaded_path != current_path
-    
-    def _load(self, force: bool = False) -> dict:
-        """Load memory data from file."""
-        if not force and not self._should_reload() and self._data is not None:
-            return self._data
-        
-        current_path = self.memory_file
-        
-        if not current_path.exists():
-            self._data = {"insights": [], "decisions": [], "snapshots": []}
-            self._loaded_path = current_path
-            return self._data
-        
-        try:
-            with open(current_path, "r", encoding="utf-8") as f:
-                self._data = json.load(f)
-            self._loaded_path = current_path
-        except (json.JSONDecodeError, IOError) as e:
-            logger.warning(f"Error loading {current_path}: {e}")
-            self._data = {"insights": [], "decisions": [], "snapshots": []}
-            self._loaded_path = current_path
-        
-        return self._data
-    
-    def _save(self) -> None:
-        """Save memory data to file."""
-        if self._data is None:
+    @property
+    def lock_path(self) -> Path:
+        """Data file whose lock guards read-modify-write cycles."""
+        return self.memory_file
+    
+    def _segment(self, section: str) -> MemorySegment:
+        """Get the segment of a section for the current owner."""
+        memory_file = self.memory_file
+        if self._segments_file != memory_file:
+            self._migrate_memory_file(memory_file)
+            self._segments = {}
+            self._indexes = {}
+            self._segments_file = memory_file
+        
+        segment = self._segments.get(section)
+        if segment is None:
+            segment = self._segments[section] = MemorySegment(
+                segment_path(memory_file, section), SEGMENT_KEYS[section]
+            )
+        return segment
+    
+    def _records(self, section: str) -> list[dict]:
+        """Records of a section, up to date with its segment on disk."""
+        return self._segment(section).load()
+    
+    @staticmethod
+    def _migrate_memory_file(memory_file: Path) -> None:
+        """Split a memory.json from before segments into one segment per section (once)."""
+        paths = {section: segment_path(memory_file, section) for section in SEGMENT_KEYS}
+        if any(p.exists() for p in paths.values()) or not data_file_exists(memory_file):
             return
         
-        self._ensure_directory()
-        self._data["last_updated"] = datetime.utcnow().isoformat() + "Z"
-        
-        current_path = self.memory_file
-        with open(current_path, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, indent=2)
-        
-        self._loaded_path = current_path
+        with file_lock(memory_file):
+            if any(p.exists() for p in paths.values()):
+                return  # Another process migrated first
+            try:
+                data = read_json(memory_file)
+            except StorageError as e:
+                # The unreadable file was moved aside, so starting empty loses nothing
+                logger.error(f"Error loading {memory_file}: {e}")
+                return
+            
+            # The insights segment takes over the memory revision, so the search index stays current
+            for section, key in SEGMENT_KEYS.items():
+                revision = data.get("revision", 0) if section == "insights" else 0
+                MemorySegment(paths[section], key).rewrite(data.get(section, []), revision)
+            if memory_file.exists():
+                os.replace(memory_file, memory_file.with_name(f"{memory_file.name}.migrated"))
+        logger.info(f"Split {memory_file} into memory segments")
+    
+    def _load(self, force: bool = False) -> dict:
+        """Read all sections (in the memory.json layout)."""
+        if force:
+            self._segments_file = None
+        return {section: self._records(section) for section in SEGMENT_KEYS}
     
     def reload(self) -> dict:
         """Force reload memory from disk."""
-        self._data = None
-        self._loaded_path = None
-        data = self._load(force=True)
-        return data if data is not None else {"insights": [], "decisions": [], "snapshots": []}
+        return self._load(force=True)
+    
+    def _index(self, section: str) -> RecordIndex:
+        """Get the index of a section ("insights" or "decisions"), up to date with its segment."""
+        segment = self._segment(section)
+        records = segment.load()
+        index = self._indexes.get(section)
+        if (
+            index is None
+            or index.records is not records
+            or self._index_generations.get(section) != segment.generation
+        ):
+            fields, multi_fields = INDEXED_FIELDS[section]
+            index = self._indexes[section] = RecordIndex(records, fields, multi_fields)
+            self._index_generations[section] = segment.generation
+        else:
+            index.sync()
+        return index
+    
+    def _append_records(self, section: str, records: list[dict]) -> int:
+        """
+        Append records to a section ("insights" or "decisions") in one write.
+        
+        Returns:
+            The new memory revision.
+        """
+        self._segment(section).append(records)
+        return self._memory_revision()
+    
+    # -------------------------------------------------------------------------
+    # Full-text Search Index
+    # -------------------------------------------------------------------------
+    
+    def _memory_revision(self) -> int:
+        """Revision of the insights and decisions, bumped by every change to them."""
+        return self._segment("insights").revision() + self._segment("decisions").revision()
+    
+    def _search_documents(self) -> Iterator[tuple[str, str, str]]:
+        """(id, section, text) of every insight and decision."""
+        for record in self._records("insights"):
+            if record.get("id"):
+                yield record["id"], "insights", record.get("content", "")
+        for record in self._records("decisions"):
+            if record.get("id"):
+                yield record["id"], "decisions", _decision_text(record)
+    
+    def _records_by_id(self, section: str, ids: list[str]) -> list[dict]:
+        """Records of a section with the given ids, in the order of ids."""
+        index = self._index(section)
+        positions = (index.position(i) for i in ids)
+        return [index.records[p] for p in positions if p is not None]
+    
+    def _search_index(self) -> SearchIndex:
+        """Get the owner's search index without checking it is current."""
+        path = self.memory_file.with_name(SEARCH_INDEX_NAME)
+        if self._search is None or self._search.path != path:
+            self._search = SearchIndex(path)
+        return self._search
+    
+    def _current_search_index(self) -> SearchIndex:
+        """Get the owner's search index, rebuilding it if it lags the memory."""
+        index = self._search_index()
+        index.load()
+        if index.revision != self._memory_revision():
+            with file_lock(self.lock_path):
+                index.load()
+                revision = self._memory_revision()
+                if index.revision != revision:
+                    index.rebuild(revision, self._search_documents())
+        return index
+    
+    def _index_changes(
+        self,
+        revision: int,
+        added: Optional[list[tuple[str, str, str]]] = None,
+        removed: Optional[list[str]] = None,
+    ) -> None:
+        """Add a change to the search index (a failure only delays it to the next rebuild)."""
+        try:
+            self._search_index().update(revision, added or [], removed or [])
+        except Exception as e:
+            logger.warning(f"Search index update failed, it will be rebuilt: {e}")
+    
+    def _ranked_records(self, section: str, query: str, accept, limit: Optional[int]) -> list[tuple[dict, float]]:
+        """Ranked records of a section matching query and accepted by the filter."""
+        hits = self._current_search_index().search(query, section)
+        results = []
+        for start in range(0, len(hits), _SEARCH_BATCH):
+            batch = hits[start:start + _SEARCH_BATCH]
+            scores = {hit.doc_id: hit.score for hit in batch}
+            for record in self._records_by_id(section, [hit.doc_id for hit in batch]):
+                if accept(record):
+                    results.append((record, scores[record["id"]]))
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+    
+    def _put_snapshot(self, record: dict) -> None:
+        """Store a snapshot, replacing any existing snapshot for the same date."""
+        self._segment("snapshots").put(record)
     
     # -------------------------------------------------------------------------
     # Insights Management
     # -------------------------------------------------------------------------
     
+    @locked
     def save_insight(
         self,
         category: str,
@@ -263,9 +450,8 @@ class MemoryManager:
             relevance_expires=expiry_date,
         )
         
-        data = self._load()
-        data["insights"].append(insight.to_dict())
-        self._save()
+        revision = self._append_records("insights", [insight.to_dict()])
+        self._index_changes(revision, added=[(insight.id, "insights", insight.content)])
         
         logger.info(f"Saved insight: {category} - {content[:50]}...")
         return insight
@@ -278,36 +464,59 @@ class MemoryManager:
         include_expired: bool = False,
         limit: int = 20,
     ) -> list[Insight]:
-        """Retrieve insights matching criteria."""
-        data = self._load()
-        insights = [Insight.from_dict(i) for i in data.get("insights", [])]
-        
-        filtered = []
-        for insight in insights:
-            if not include_expired and insight.is_expired():
-                continue
-            if category and insight.category != category:
-                continue
-            if symbol and insight.symbol != symbol.upper():
-                continue
-            if tags and not any(t in insight.tags for t in tags):
-                continue
-            filtered.append(insight)
-        
-        filtered.sort(key=lambda x: x.date, reverse=True)
-        return filtered[:limit]
+        """Retrieve insights matching criteria, newest first."""
+        matches = self._index("insights").query(
+            category=category or None,
+            symbol=symbol.upper() if symbol else None,
+            tags=tags,
+        )
+        insights = (Insight.from_dict(i) for i in matches)
+        if not include_expired:
+            insights = (i for i in insights if not i.is_expired())
+        return list(islice(insights, limit))
     
+    def search_insights(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        symbol: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        include_expired: bool = False,
+        limit: int = 20,
+    ) -> list[tuple[Insight, float]]:
+        """
+        Rank insights by relevance to a free-text query (BM25 over their content).
+        
+        Args:
+            query: Words to look for
+            category, symbol, tags, include_expired: Filters as in get_insights
+            limit: Maximum number of insights
+        
+        Returns:
+            (insight, score) pairs, most relevant first.
+        """
+        ranked = self._ranked_records(
+            "insights",
+            query,
+            lambda r: _insight_matches(Insight.from_dict(r), category, symbol, tags, include_expired),
+            limit,
+        )
+        return [(Insight.from_dict(r), score) for r, score in ranked]
+    
+    @locked
     def cleanup_expired_insights(self) -> int:
         """Remove expired insights from storage."""
-        data = self._load()
-        original_count = len(data.get("insights", []))
-        insights = [Insight.from_dict(i) for i in data.get("insights", [])]
-        valid_insights = [i for i in insights if not i.is_expired()]
+        original_count = len(self._records("insights"))
+        expired_ids = [
+            i["id"] for i in self._records("insights")
+            if i.get("id") and Insight.from_dict(i).is_expired()
+        ]
         
-        data["insights"] = [i.to_dict() for i in valid_insights]
-        self._save()
+        if expired_ids:
+            self._segment("insights").remove(expired_ids)
+            self._index_changes(self._memory_revision(), removed=expired_ids)
         
-        removed = original_count - len(valid_insights)
+        removed = original_count - len(self._records("insights"))
         logger.info(f"Cleaned up {removed} expired insights")
         return removed
     
@@ -315,6 +524,7 @@ class MemoryManager:
     # Decisions Management
     # -------------------------------------------------------------------------
     
+    @locked
     def track_decision(
         self,
         action: str,
@@ -338,26 +548,61 @@ class MemoryManager:
             review_date=review_date,
         )
         
-        data = self._load()
-        data["decisions"].append(decision.to_dict())
-        self._save()
+        revision = self._append_records("decisions", [decision.to_dict()])
+        self._index_changes(revision, added=[(decision.id, "decisions", decision.rationale)])
         
         logger.info(f"Tracked decision: {action} {symbol or ''}")
         return decision
     
+    @locked
+    def track_decisions(self, decisions: list[dict], review_days: int = 30) -> list[Decision]:
+        """
+        Track many decisions with a single write (e.g. for a bulk import).
+        
+        Args:
+            decisions: Dictionaries with track_decision arguments (action,
+                       rationale, symbol, shares, price, and optionally date)
+            review_days: Days until review, counted from today
+        
+        Returns:
+            The tracked decisions.
+        """
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        review_date = (datetime.utcnow() + timedelta(days=review_days)).strftime("%Y-%m-%d")
+        
+        tracked = [
+            Decision(
+                id=str(uuid.uuid4()),
+                date=d.get("date") or today,
+                action=d["action"],
+                symbol=d["symbol"].upper() if d.get("symbol") else None,
+                shares=d.get("shares"),
+                price=d.get("price"),
+                rationale=d["rationale"],
+                review_date=review_date,
+            )
+            for d in decisions
+        ]
+        if tracked:
+            revision = self._append_records("decisions", [d.to_dict() for d in tracked])
+            self._index_changes(revision, added=[(d.id, "decisions", d.rationale) for d in tracked])
+            logger.info(f"Tracked {len(tracked)} decisions")
+        return tracked
+    
     def get_pending_reviews(self) -> list[Decision]:
         """Get decisions that are due for review."""
-        data = self._load()
+        index = self._index("decisions")
         today = datetime.utcnow().strftime("%Y-%m-%d")
         pending = []
         
-        for d in data.get("decisions", []):
-            decision = Decision.from_dict(d)
-            if decision.status == "pending" and decision.review_date and decision.review_date <= today:
+        for i in sorted(index.lookup("status", "pending")):
+            decision = Decision.from_dict(index.records[i])
+            if decision.review_date and decision.review_date <= today:
                 pending.append(decision)
         
         return pending
     
+    @locked
     def update_decision_outcome(
         self,
         decision_id: str,
@@ -365,20 +610,24 @@ class MemoryManager:
         status: str = "reviewed",
     ) -> Optional[Decision]:
         """Update a decision with its outcome."""
-        data = self._load()
-        
-        for i, d in enumerate(data.get("decisions", [])):
-            if d.get("id") == decision_id:
-                d["outcome"] = outcome
-                d["outcome_date"] = datetime.utcnow().strftime("%Y-%m-%d")
-                d["status"] = status
-                data["decisions"][i] = d
-                self._save()
-                logger.info(f"Updated decision {decision_id} outcome")
-                return Decision.from_dict(d)
-        
-        logger.warning(f"Decision {decision_id} not found")
-        return None
+        index = self._index("decisions")
+        i = index.position(decision_id)
+        if i is None:
+            logger.warning(f"Decision {decision_id} not found")
+            return None
+        
+        d = index.records[i]
+        before = dict(d)
+        d["outcome"] = outcome
+        d["outcome_date"] = datetime.utcnow().strftime("%Y-%m-%d")
+        d["status"] = status
+        segment = self._segment("decisions")
+        segment.put(d)
+        index.update(i, before)
+        self._index_generations["decisions"] = segment.generation
+        self._index_changes(self._memory_revision(), added=[(decision_id, "decisions", _decision_text(d))])
+        logger.info(f"Updated decision {decision_id} outcome")
+        return Decision.from_dict(d)
     
     def get_decisions(
         self,
@@ -387,59 +636,69 @@ class MemoryManager:
         status: Optional[str] = None,
         limit: int = 20,
     ) -> list[Decision]:
-        """Get decisions matching criteria."""
-        data = self._load()
-        decisions = [Decision.from_dict(d) for d in data.get("decisions", [])]
-        
-        filtered = []
-        for d in decisions:
-            if symbol and d.symbol != symbol.upper():
-                continue
-            if action and d.action != action:
-                continue
-            if status and d.status != status:
-                continue
-            filtered.append(d)
-        
-        filtered.sort(key=lambda x: x.date, reverse=True)
-        return filtered[:limit]
+        """Get decisions matching criteria, newest first."""
+        matches = self._index("decisions").query(
+            symbol=symbol.upper() if symbol else None,
+            action=action or None,
+            status=status or None,
+        )
+        return [Decision.from_dict(d) for d in islice(matches, limit)]
+    
+    def search_decisions(
+        self,
+        query: str,
+        symbol: Optional[str] = None,
+        action: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[tuple[Decision, float]]:
+        """
+        Rank decisions by relevance to a free-text query (BM25 over rationale and outcome).
+        
+        Args:
+            query: Words to look for
+            symbol, action, status: Filters as in get_decisions
+            limit: Maximum number of decisions
+        
+        Returns:
+            (decision, score) pairs, most relevant first.
+        """
+        symbol = symbol.upper() if symbol else None
+        
+        def accept(record: dict) -> bool:
+            decision = Decision.from_dict(record)
+            return (
+                (not symbol or decision.symbol == symbol)
+                and (not action or decision.action == action)
+                and (not status or decision.status == status)
+            )
+        
+        ranked = self._ranked_records("decisions", query, accept, limit)
+        return [(Decision.from_dict(r), score) for r, score in ranked]
     
     # -------------------------------------------------------------------------
     # Portfolio History Management
     # -------------------------------------------------------------------------
     
+    @locked
     def save_portfolio_snapshot(
         self,
         total_value_eur: float,
         total_cost_basis: float,
         cash: float,
         positions: list[dict],
+        date: Optional[str] = None,
     ) -> PortfolioSnapshot:
-        """Save a portfolio snapshot."""
+        """Save a portfolio snapshot (date defaults to today, replacing that day's snapshot)."""
         snapshot = PortfolioSnapshot(
-            date=datetime.utcnow().strftime("%Y-%m-%d"),
+            date=date or datetime.utcnow().strftime("%Y-%m-%d"),
             total_value_eur=total_value_eur,
             total_cost_basis=total_cost_basis,
             cash=cash,
             positions=positions,
         )
         
-        data = self._load()
-        today = snapshot.date
-        
-        # Check if we already have a snapshot for today
-        existing_index = None
-        for i, s in enumerate(data.get("snapshots", [])):
-            if s.get("date") == today:
-                existing_index = i
-                break
-        
-        if existing_index is not None:
-            data["snapshots"][existing_index] = snapshot.to_dict()
-        else:
-            data["snapshots"].append(snapshot.to_dict())
-        
-        self._save()
+        self._put_snapshot(snapshot.to_dict())
         logger.info(f"Saved portfolio snapshot: €{total_value_eur:,.2f}")
         return snapshot
     
@@ -449,8 +708,8 @@ class MemoryManager:
         limit: Optional[int] = None,
     ) -> list[PortfolioSnapshot]:
         """Get portfolio history snapshots."""
-        data = self._load()
-        snapshots = [PortfolioSnapshot.from_dict(s) for s in data.get("snapshots", [])]
+        flush_snapshots(str(self.lock_path))
+        snapshots = [PortfolioSnapshot.from_dict(s) for s in self._records("snapshots")]
         
         if days:
             cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
@@ -522,7 +781,11 @@ def get_memory_manager(owner_slug: Optional[str] = None) -> MemoryManager:
     cache_key = owner_slug or ""
     
     if cache_key not in _memory_managers:
-        _memory_managers[cache_key] = MemoryManager(owner_slug=owner_slug)
+        if STORAGE_BACKEND == "sqlite":
+            from cline_finance.core.sqlite_store import SQLiteMemoryManager
+            _memory_managers[cache_key] = SQLiteMemoryManager(owner_slug=owner_slug)
+        else:
+            _memory_managers[cache_key] = MemoryManager(owner_slug=owner_slug)
     
     return _memory_managers[cache_key]
 
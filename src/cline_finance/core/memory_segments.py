@@ -0,0 +1,237 @@
+"""
+Memory Segments - Append-only JSON-lines storage for one memory section.
+
+Each section of an owner's memory (insights, decisions, snapshots) lives in
+its own segment next to memory.json, e.g. ``memory.insights.jsonl``. Every
+change is one appended line:
+
+    {"rev": 7, "op": "add", "records": [...]}     new records
+    {"rev": 8, "op": "put", "record": {...}}      insert or replace by key
+    {"rev": 9, "op": "remove", "keys": [...]}     delete by key
+
+so saving an insight writes one short line to one file and never touches
+the snapshots. A segment is parsed when its section is first used; later
+loads read only the lines appended since (by this or another process).
+Once MEMORY_COMPACT_EVERY records have been replaced or removed, the segment
+is rewritten with just its live records. ``rev`` counts the changes made to
+the segment and survives compaction.
+"""
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from cline_finance.constants import MEMORY_COMPACT_EVERY
+from cline_finance.core.storage import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+# Sections and the field identifying their records
+SEGMENT_KEYS = {
+    "insights": "id",
+    "decisions": "id",
+    "snapshots": "date",
+}
+
+_REV_RE = re.compile(rb'\{"rev":(\d+)')
+
+
+def segment_path(memory_file: Path, section: str) -> Path:
+    """Segment file of a section (memory.json -> memory.insights.jsonl)."""
+    return memory_file.with_name(f"{memory_file.stem}.{section}.jsonl")
+
+
+def _dumps(change: dict) -> bytes:
+    return (json.dumps(change, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class MemorySegment:
+    """Records of one memory section, kept in an append-only JSON-lines file."""
+    
+    def __init__(self, path: Path, key: str):
+        """
+        Initialize the segment (nothing is read until first use).
+        
+        Args:
+            path: Segment file (created on the first change)
+            key: Field identifying a record for put and remove
+        """
+        self.path = Path(path)
+        self.key = key
+        self.generation = 0  # Bumped when records are replaced or removed (appends do not count)
+        self._records: Optional[list[dict]] = None
+        self._positions: dict = {}
+        self._revision = 0
+        self._offset = 0     # Bytes of the file applied to _records
+        self._inode: Optional[int] = None
+        self._dead = 0       # Records replaced or removed since the last compaction
+    
+    def _reset(self) -> None:
+        self._records = []
+        self._positions = {}
+        self._revision = 0
+        self._offset = 0
+        self._inode = None
+        self._dead = 0
+        self.generation += 1
+    
+    def load(self) -> list[dict]:
+        """
+        Get the records, reading only what was appended since the last call.
+        
+        Returns:
+            The live list of records (replaced by a new list when the file was
+            rewritten or records were removed).
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self._records is None or self._offset:
+                self._reset()
+            return self._records
+        
+        if self._records is None or st.st_ino != self._inode or st.st_size < self._offset:
+            self._reset()
+            self._inode = st.st_ino
+        if st.st_size > self._offset:
+            self._read_from(self._offset)
+        return self._records
+    
+    def _read_from(self, offset: int) -> None:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            position = offset
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Incomplete last line from an interrupted append
+                position += len(raw)
+                try:
+                    change = json.loads(raw)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    logger.warning(f"Skipping unreadable line in {self.path} at byte {position - len(raw)}")
+                    continue
+                self._apply(change)
+        self._offset = position
+    
+    def _apply(self, change: dict) -> None:
+        op = change.get("op")
+        records = self._records
+        if op == "add":
+            for record in change.get("records", []):
+                if record.get(self.key) is not None:
+                    self._positions[record[self.key]] = len(records)
+                records.append(record)
+        elif op == "put":
+            record = change["record"]
+            key = record.get(self.key)
+            i = self._positions.get(key)
+            if i is not None and i < len(records) and records[i].get(self.key) == key:
+                records[i] = record
+                self._dead += 1
+                self.generation += 1
+            else:
+                if key is not None:
+                    self._positions[key] = len(records)
+                records.append(record)
+        elif op == "remove":
+            doomed = set(change.get("keys", []))
+            kept = [r for r in records if r.get(self.key) not in doomed]
+            self._dead += len(records) - len(kept)
+            self._records = kept
+            self._positions = {r[self.key]: i for i, r in enumerate(kept) if r.get(self.key) is not None}
+            self.generation += 1
+        self._revision = max(self._revision, change.get("rev", 0))
+    
+    def revision(self) -> int:
+        """Number of changes made to the segment (only its last line is read if it changed on disk)."""
+        if self._records is not None:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return 0
+            if st.st_ino == self._inode and st.st_size == self._offset:
+                return self._revision
+        return self._tail_revision()
+    
+    def _tail_revision(self) -> int:
+        """Read the rev of the last complete line."""
+        try:
+            with open(self.path, "rb") as f:
+                end = f.seek(0, os.SEEK_END)
+                tail = b""
+                while end > 0:
+                    start = max(0, end - 4096)
+                    f.seek(start)
+                    tail = f.read(end - start) + tail
+                    end = start
+                    lines = tail.split(b"\n")[:-1]  # Complete lines only
+                    if len(lines) >= 2 or (lines and start == 0):
+                        match = _REV_RE.match(lines[-1])
+                        if match:
+                            return int(match.group(1))
+                        break
+        except FileNotFoundError:
+            return 0
+        self.load()  # No readable last line: replay the segment
+        return self._revision
+    
+    # -------------------------------------------------------------------------
+    # Changes (callers hold the memory file lock)
+    # -------------------------------------------------------------------------
+    
+    def _append(self, change: dict) -> int:
+        self.load()
+        change = {"rev": self._revision + 1, **change}
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            if f.tell() > self._offset:
+                f.truncate(self._offset)  # Drop an incomplete line left by a crash
+            f.write(_dumps(change))
+            f.flush()
+            os.fsync(f.fileno())
+            self._offset = f.tell()
+            self._inode = os.fstat(f.fileno()).st_ino
+        
+        self._apply(change)
+        if self._dead >= MEMORY_COMPACT_EVERY:
+            self.compact()
+        return self._revision
+    
+    def append(self, records: list[dict]) -> int:
+        """Append records; returns the segment's new revision."""
+        return self._append({"op": "add", "records": records})
+    
+    def put(self, record: dict) -> int:
+        """Insert a record or replace the one with the same key; returns the new revision."""
+        return self._append({"op": "put", "record": record})
+    
+    def remove(self, keys: list) -> int:
+        """Delete the records with these keys; returns the new revision."""
+        return self._append({"op": "remove", "keys": list(keys)})
+    
+    def rewrite(self, records: list[dict], revision: Optional[int] = None) -> None:
+        """
+        Replace the segment file with one line per record.
+        
+        Args:
+            records: All live records
+            revision: Revision to record (default: keep the current one)
+        """
+        revision = self._revision if revision is None else revision
+        lines = [_dumps({"rev": revision, "op": "add", "records": [r]}) for r in records]
+        if not lines:
+            lines = [_dumps({"rev": revision, "op": "add", "records": []})]
+        atomic_write_bytes(self.path, b"".join(lines))
+        
+        self._reset()
+        self._inode = os.stat(self.path).st_ino
+        self._read_from(0)
+    
+    def compact(self) -> None:
+        """Rewrite the segment with only its live records."""
+        dead = self._dead
+        self.rewrite(list(self.load()))
+        logger.info(f"Compacted {self.path.name}: dropped {dead} superseded records")
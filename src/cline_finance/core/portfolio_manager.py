@@ -1,21 +1,36 @@
 """
 Portfolio Manager - Handles CRUD operations for portfolio data with multi-owner support.
 """
-import json
 import logging
+from collections import defaultdict
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
-from cline_finance.constants import DATA_DIR
+import numpy as np
+
+from cline_finance.constants import DATA_DIR, LEDGER_COMPACT_EVERY, LOT_STORE, STORAGE_BACKEND
+from cline_finance.core.file_lock import FileStamp, file_stamp, locked
+from cline_finance.core.fx_history import get_fx_rates_asof
+from cline_finance.core.fx_matrix import get_fx_matrix
+from cline_finance.core.ledger import Ledger
+from cline_finance.core.lot_array import LotArray
+from cline_finance.core.lot_matching import LotMatch, match_lots, realized_pnl, reduce_lots
+from cline_finance.core.storage import data_file_exists, read_json, write_json
+from cline_finance.core.valuation_engine import invalidate_valuations
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Lot:
-    """Represents a single purchase lot within a position."""
+    """
+    Represents a single purchase lot within a position.
+    
+    Lots are treated as values: replace a lot rather than editing its fields,
+    so the owning position's cached totals stay correct.
+    """
     
     date: str           # Purchase date (YYYY-MM-DD)
     shares: float       # Shares in this lot
@@ -47,9 +62,88 @@ class Lot:
         )
 
 
+class LotList(list):
+    """
+    List of lots that keeps its position's share and cost totals current.
+    
+    Appends update the totals incrementally; any other change (removal,
+    replacement) recomputes them from the remaining lots.
+    """
+    
+    def __init__(self, lots=(), owner: Optional["Position"] = None):
+        super().__init__(lots)
+        self._owner = owner
+    
+    def _added(self, lots) -> None:
+        if self._owner is not None:
+            for lot in lots:
+                self._owner._add_totals(lot)
+    
+    def __reduce__(self):
+        # Copies and pickles are re-attached by Position.__setstate__
+        return (LotList, (list(self),))
+    
+    def _changed(self) -> None:
+        if self._owner is not None:
+            self._owner._recompute_totals()
+    
+    def append(self, lot) -> None:
+        super().append(lot)
+        self._added((lot,))
+    
+    def insert(self, index, lot) -> None:
+        super().insert(index, lot)
+        self._added((lot,))
+    
+    def extend(self, lots) -> None:
+        lots = list(lots)
+        super().extend(lots)
+        self._added(lots)
+    
+    def __iadd__(self, lots):
+        self.extend(lots)
+        return self
+    
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._changed()
+        return self
+    
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._changed()
+    
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._changed()
+    
+    def pop(self, index=-1):
+        lot = super().pop(index)
+        self._changed()
+        return lot
+    
+    def remove(self, lot) -> None:
+        super().remove(lot)
+        self._changed()
+    
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+
 @dataclass
 class Position:
-    """Represents a single portfolio position with lot tracking."""
+    """
+    Represents a single portfolio position with lot tracking.
+    
+    Share and cost totals are maintained as lots are added or removed (see
+    LotList), so shares, avg_cost and cost_basis are O(1).
+    
+    Lots may also be given as a LotArray (CLINE_FINANCE_LOT_STORE=array).
+    Lot objects are then only created if ``lots`` is accessed; totals,
+    serialization, new lots from the ledger and ``lot_array`` work on the
+    arrays directly.
+    """
     
     symbol: str
     currency: str = "EUR"
@@ -61,23 +155,90 @@ class Position:
     company_name: Optional[str] = None
     notes: Optional[str] = None
     
+    def __setattr__(self, name, value) -> None:
+        if name == "lots":
+            if isinstance(value, LotArray):
+                # Keep lots columnar until someone asks for Lot objects
+                self.__dict__.pop("lots", None)
+                self._lot_array = value
+                self._total_shares = value.total_shares()
+                self._total_cost = value.total_cost()
+                return
+            value = LotList(value, owner=self)
+            object.__setattr__(self, name, value)
+            self._recompute_totals()
+            return
+        object.__setattr__(self, name, value)
+    
+    def __getattr__(self, name):
+        # Only reached when "lots" is still held as a LotArray
+        array = self.__dict__.get("_lot_array")
+        if name != "lots" or array is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        self.lots = [
+            Lot(
+                date=array.date_str(i),
+                shares=float(shares),
+                price=float(price),
+                currency=currency,
+                notes=array.note(i),
+            )
+            for i, (shares, price, currency) in enumerate(zip(array.shares, array.price, array.currencies))
+        ]
+        self._lot_array = array  # Still in sync until the lots change
+        return self.__dict__["lots"]
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lots = state["lots"] if "lots" in state else state["_lot_array"]
+    
+    @property
+    def lots_loaded(self) -> bool:
+        """Whether lots exist as Lot objects (False while held only as a LotArray)."""
+        return "lots" in self.__dict__
+    
+    @property
+    def lot_array(self) -> LotArray:
+        """Lots as columnar arrays (built from the Lot objects if needed)."""
+        array = self.__dict__.get("_lot_array")
+        if array is None:
+            array = self._lot_array = LotArray.from_lots(self.lots, self.currency or "USD")
+        return array
+    
+    def append_lot(self, lot: Lot) -> None:
+        """Add a lot, without creating Lot objects for a columnar position."""
+        if self.lots_loaded:
+            self.lots.append(lot)
+            return
+        self._lot_array.append(lot.date, lot.shares, lot.price, lot.currency, lot.notes)
+        self._total_shares += lot.shares
+        self._total_cost += lot.shares * lot.price
+    
+    def _add_totals(self, lot: Lot) -> None:
+        self._total_shares += lot.shares
+        self._total_cost += lot.shares * lot.price
+        self._lot_array = None
+    
+    def _recompute_totals(self) -> None:
+        self._total_shares = sum(lot.shares for lot in self.lots)
+        self._total_cost = sum(lot.shares * lot.price for lot in self.lots)
+        self._lot_array = None
+    
     @property
     def shares(self) -> float:
         """Total shares computed from all lots."""
-        return sum(lot.shares for lot in self.lots) if self.lots else 0
+        return self._total_shares
     
     @property
     def avg_cost(self) -> float:
         """Weighted average cost computed from all lots."""
-        if not self.lots:
-            return 0
-        total_cost = sum(lot.shares * lot.price for lot in self.lots)
-        total_shares = sum(lot.shares for lot in self.lots)
-        return total_cost / total_shares if total_shares > 0 else 0
+        return self._total_cost / self._total_shares if self._total_shares > 0 else 0
     
     @property
     def first_purchase(self) -> Optional[str]:
         """Get the earliest lot date."""
+        if not self.lots_loaded:
+            return self._lot_array.first_date()
         if self.lots:
             dates = [lot.date for lot in self.lots if lot.date != "unknown"]
             return min(dates) if dates else None
@@ -86,14 +247,14 @@ class Position:
     @property
     def cost_basis(self) -> float:
         """Total cost basis of this position."""
-        return sum(lot.shares * lot.price for lot in self.lots) if self.lots else 0
+        return self._total_cost
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
         result = {
             "symbol": self.symbol,
             "currency": self.currency,
-            "lots": [lot.to_dict() for lot in self.lots],
+            "lots": [lot.to_dict() for lot in self.lots] if self.lots_loaded else self._lot_array.to_records(),
         }
         if self.sector:
             result["sector"] = self.sector
@@ -117,7 +278,9 @@ class Position:
         
         # Handle lots
         lots_data = data.get("lots", [])
-        if lots_data:
+        if lots_data and LOT_STORE == "array":
+            lots = LotArray.from_records(lots_data)
+        elif lots_data:
             lots = [Lot.from_dict(lot) for lot in lots_data]
         else:
             # Legacy migration: create single lot from shares/avg_cost
@@ -148,9 +311,73 @@ class Position:
         )
 
 
+class PositionList(list):
+    """List of positions that keeps its portfolio's symbol index current."""
+    
+    def __init__(self, positions=(), owner: Optional["Portfolio"] = None):
+        super().__init__(positions)
+        self._owner = owner
+    
+    def __reduce__(self):
+        # Copies and pickles are re-attached by Portfolio.__setstate__
+        return (PositionList, (list(self),))
+    
+    def _changed(self) -> None:
+        if self._owner is not None:
+            self._owner._rebuild_index()
+    
+    def append(self, position) -> None:
+        super().append(position)
+        if self._owner is not None:
+            self._owner._index.setdefault(position.symbol.upper(), position)
+    
+    def insert(self, index, position) -> None:
+        super().insert(index, position)
+        self._changed()
+    
+    def extend(self, positions) -> None:
+        super().extend(positions)
+        self._changed()
+    
+    def __iadd__(self, positions):
+        self.extend(positions)
+        return self
+    
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._changed()
+        return self
+    
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._changed()
+    
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._changed()
+    
+    def pop(self, index=-1):
+        position = super().pop(index)
+        self._changed()
+        return position
+    
+    def remove(self, position) -> None:
+        super().remove(position)
+        self._changed()
+    
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+
 @dataclass
 class Portfolio:
-    """Represents the complete portfolio."""
+    """
+    Represents the complete portfolio.
+    
+    Positions are indexed by upper-case symbol (see PositionList), so
+    get_position is a dictionary lookup.
+    """
     
     positions: list[Position] = field(default_factory=list)
     cash: float = 0.0
@@ -158,6 +385,24 @@ class Portfolio:
     owner: Optional[str] = None
     last_updated: Optional[str] = None
     
+    def __setattr__(self, name, value) -> None:
+        if name == "positions":
+            value = PositionList(value, owner=self)
+            object.__setattr__(self, name, value)
+            self._rebuild_index()
+            return
+        object.__setattr__(self, name, value)
+    
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.positions = state["positions"]
+    
+    def _rebuild_index(self) -> None:
+        index = {}
+        for position in self.positions:
+            index.setdefault(position.symbol.upper(), position)
+        self._index = index
+    
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -196,15 +441,176 @@ class Portfolio:
     
     def get_position(self, symbol: str) -> Optional[Position]:
         """Get a position by symbol."""
-        symbol_upper = symbol.upper()
-        for pos in self.positions:
-            if pos.symbol.upper() == symbol_upper:
-                return pos
-        return None
+        return self._index.get(symbol.upper())
     
     def total_cost_basis(self) -> float:
         """Calculate total cost basis of all positions."""
-        return sum(p.shares * p.avg_cost for p in self.positions)
+        return sum(p.cost_basis for p in self.positions)
+    
+    def apply_event(self, event: dict) -> None:
+        """
+        Apply one ledger event (see core.ledger) to this portfolio in place.
+        
+        Args:
+            event: Event dictionary with "op" and its operation fields
+        """
+        op = event["op"]
+        symbol = event.get("symbol")
+        
+        if op == "batch":
+            for part in event["events"]:
+                self.apply_event({**part, "ts": event.get("ts")})
+        elif op == "add":
+            lot = Lot.from_dict(event["lot"])
+            existing = self.get_position(symbol)
+            if existing:
+                existing.append_lot(lot)
+                if event.get("sector"):
+                    existing.sector = event["sector"]
+                if event.get("company_name"):
+                    existing.company_name = event["company_name"]
+            else:
+                self.positions.append(Position(
+                    symbol=symbol,
+                    currency=event.get("currency", lot.currency),
+                    lots=[lot],
+                    sector=event.get("sector"),
+                    asset_type=event.get("asset_type", "stock"),
+                    isin=event.get("isin"),
+                    exchange=event.get("exchange"),
+                    company_name=event.get("company_name"),
+                ))
+        elif op == "update":
+            position = self.get_position(symbol)
+            if position is not None:
+                if "lots" in event:
+                    position.lots = [Lot.from_dict(lot) for lot in event["lots"]]
+                if "notes" in event:
+                    position.notes = event["notes"]
+        elif op == "remove":
+            position = self.get_position(symbol)
+            if position is not None:
+                self.positions = [p for p in self.positions if p is not position]
+        elif op == "sell":
+            position = self.get_position(symbol)
+            if position is not None:
+                lots = reduce_lots(position.lots, [LotMatch.from_dict(m) for m in event["matches"]])
+                if lots:
+                    position.lots = lots
+                else:
+                    self.positions = [p for p in self.positions if p is not position]
+        elif op == "cash":
+            self.cash = event["amount"]
+        else:
+            raise ValueError(f"Unknown ledger operation: {op}")
+        
+        if event.get("owner"):
+            self.owner = event["owner"]
+        self.last_updated = event.get("ts", self.last_updated)
+
+
+# FX rate converting a lot into a sale currency: (lot currency, purchase date, sale currency) -> (rate, exact)
+LotRates = dict[tuple[str, str, str], tuple[float, bool]]
+
+
+def _resolve_lot_rates(conversions: Iterable[tuple[str, str, str]]) -> LotRates:
+    """
+    Look up the FX rates converting lots into sale currencies.
+    
+    Fetches market data, so it runs before the portfolio lock is taken.
+    Each lot gets the rate of its purchase date (exact) or, if none is
+    known (e.g. a lot dated "unknown" or no FX history offline), today's
+    rate (approximate). Lots with neither are left out.
+    
+    Args:
+        conversions: (lot currency, purchase date, sale currency) triples
+    """
+    wanted: dict[tuple[str, str], set[str]] = defaultdict(set)
+    for lot_currency, date, currency in conversions:
+        if lot_currency and currency and lot_currency.upper() != currency.upper():
+            wanted[(lot_currency.upper(), currency.upper())].add(str(date))
+    if not wanted:
+        return {}
+    
+    try:
+        fx = get_fx_matrix({c for pair in wanted for c in pair})
+    except Exception as e:
+        logger.warning(f"Could not load current FX rates for lot conversion: {e}")
+        fx = None
+    
+    rates: LotRates = {}
+    for (lot_currency, currency), dates in wanted.items():
+        dates = sorted(dates)
+        try:
+            historical = get_fx_rates_asof(lot_currency, currency, dates)
+        except Exception as e:
+            logger.warning(f"Could not load {lot_currency}/{currency} FX history: {e}")
+            historical = np.full(len(dates), np.nan)
+        current = fx.rate(lot_currency, currency) if fx is not None else None
+        for date, rate in zip(dates, historical):
+            if not np.isnan(rate):
+                rates[(lot_currency, date, currency)] = (float(rate), True)
+            elif current:
+                rates[(lot_currency, date, currency)] = (float(current), False)
+    return rates
+
+
+def _sell_payload(
+    symbol: str,
+    lots: list,
+    shares: float,
+    price: float,
+    currency: Optional[str],
+    method: str,
+    lot_indices: Optional[list[int]],
+    date: str,
+    reason: Optional[str],
+    rates: Optional[LotRates] = None,
+) -> dict:
+    """
+    Match a sale against lots and build its ledger "sell" event fields.
+    
+    Cost basis and realized P&L are in the sale currency: matched lots bought
+    in another currency are converted with rates from _resolve_lot_rates. If
+    any of them used today's rate or no rate at all (cost taken as is), the
+    event's "cost_basis_fx" is "approximate" instead of "trade_date".
+    
+    Raises:
+        ValueError: If the lots can't cover the sale.
+    """
+    matches = match_lots(lots, shares, method=method, lot_indices=lot_indices)
+    currency = currency or (lots[matches[0].index].currency if matches else "EUR")
+    
+    cost = 0.0
+    cost_basis_fx = None
+    for m in matches:
+        lot_currency = (lots[m.index].currency or currency).upper()
+        if lot_currency == currency.upper():
+            cost += m.cost
+            continue
+        rate, exact = (rates or {}).get((lot_currency, str(m.date), currency.upper()), (None, False))
+        if rate is None:
+            logger.warning(f"No {lot_currency}/{currency} rate for the {symbol} lot of {m.date}; cost taken unconverted")
+            rate = 1.0
+        cost += m.cost * rate
+        cost_basis_fx = "trade_date" if exact and cost_basis_fx != "approximate" else "approximate"
+    pnl = realized_pnl(matches, price) if cost_basis_fx is None else shares * price - cost
+    
+    payload = {
+        "symbol": symbol,
+        "shares": shares,
+        "price": price,
+        "currency": currency,
+        "date": date,
+        "method": method.lower(),
+        "matches": [m.to_dict() for m in matches],
+        "proceeds": shares * price,
+        "cost_basis": cost,
+        "realized_pnl": pnl,
+        "cost_basis_fx": cost_basis_fx,
+        "reason": reason,
+    }
+    return {k: v for k, v in payload.items() if v is not None}
 
 
 def _get_portfolio_path_for_owner(owner_slug: Optional[str] = None) -> Path:
@@ -234,12 +640,26 @@ def _get_portfolio_path_for_owner(owner_slug: Optional[str] = None) -> Path:
     return owner_dir / "portfolio.json"
 
 
+def _get_ledger_path(portfolio_path: Path) -> Path:
+    """Get the ledger file that belongs to a portfolio snapshot file."""
+    return portfolio_path.with_name(f"{portfolio_path.stem}.ledger.jsonl")
+
+
 class PortfolioManager:
     """
     Manages portfolio data with file persistence and multi-owner support.
     
     Provides CRUD operations for portfolio positions with automatic
     file synchronization and validation.
+    
+    Every mutation is appended to the owner's trade ledger (core.ledger);
+    portfolio.json is a snapshot that is rewritten only every
+    LEDGER_COMPACT_EVERY events. Loading reads the snapshot and replays the
+    ledger events recorded after it.
+    
+    Mutations hold an advisory lock on portfolio.json (core.file_lock), so
+    several server processes can share one DATA_DIR. The cached portfolio is
+    reused until the snapshot or the ledger changes on disk.
     """
     
     def __init__(self, portfolio_path: Optional[Path] = None, owner_slug: Optional[str] = None):
@@ -255,6 +675,11 @@ class PortfolioManager:
         self._owner_slug = owner_slug
         self._portfolio: Optional[Portfolio] = None
         self._loaded_path: Optional[Path] = None
+        self._ledger: Optional[Ledger] = None
+        self._ledger_seq = 0
+        self._ledger_offset = 0
+        self._pending_events = 0
+        self._snapshot_stamp: Optional[FileStamp] = None
     
     @property
     def portfolio_path(self) -> Path:
@@ -263,73 +688,171 @@ class PortfolioManager:
             return self._explicit_path
         return _get_portfolio_path_for_owner(self._owner_slug)
     
+    @property
+    def lock_path(self) -> Path:
+        """Data file whose lock guards read-modify-write cycles."""
+        return self.portfolio_path
+    
+    @property
+    def ledger(self) -> Ledger:
+        """Get the trade ledger of the loaded portfolio."""
+        self.load()
+        return self._ledger
+    
+    @property
+    def version(self) -> tuple:
+        """Marker that changes whenever the portfolio changes (loads it if needed)."""
+        self.load()
+        return (str(self._loaded_path), self._snapshot_stamp, self._ledger_seq)
+    
     def _ensure_directory(self) -> None:
         """Ensure the data directory exists."""
         self.portfolio_path.parent.mkdir(parents=True, exist_ok=True)
     
     def _should_reload(self) -> bool:
-        """Check if we need to reload due to owner change."""
+        """Check if we need to reload due to owner change or a new snapshot on disk."""
         if self._portfolio is None:
             return True
         current_path = self.portfolio_path
-        return self._loaded_path != current_path
+        if self._loaded_path != current_path:
+            return True
+        return file_stamp(current_path) != self._snapshot_stamp
+    
+    def _replay(self, after_seq: int, offset: int) -> int:
+        """Apply ledger events after after_seq to the loaded portfolio; returns the count."""
+        replayed = 0
+        for event, offset in self._ledger.read(after_seq=after_seq, offset=offset):
+            self._portfolio.apply_event(event)
+            self._ledger_seq = event["seq"]
+            self._ledger_offset = offset
+            replayed += 1
+        self._pending_events += replayed
+        return replayed
     
     def load(self, force: bool = False) -> Portfolio:
         """
         Load portfolio from file.
         
+        Reads the last snapshot and replays the ledger events recorded after
+        it. Because the ledger is never truncated, a snapshot recovered from a
+        backup is brought up to date the same way.
+        
+        If only the ledger grew since the last load (e.g. another process
+        recorded a trade), just the new events are applied to the cached copy.
+        
         Args:
             force: Force reload even if already loaded.
         
         Returns:
             Portfolio object with current holdings.
         """
-        if not force and not self._should_reload() and self._portfolio is not None:
-            return self._portfolio
+        if not force and not self._should_reload():
+            ledger_size = self._ledger.size()
+            if ledger_size == self._ledger_offset:
+                return self._portfolio
+            if ledger_size > self._ledger_offset:
+                replayed = self._replay(self._ledger_seq, self._ledger_offset)
+                if replayed:
+                    logger.info(f"Applied {replayed} new ledger events to cached portfolio")
+                return self._portfolio
         
         current_path = self.portfolio_path
+        ledger = Ledger(_get_ledger_path(current_path))
+        snapshot_stamp = file_stamp(current_path)
         
-        if not current_path.exists():
-            logger.info(f"Portfolio file not found at {current_path}, creating empty portfolio")
-            self._portfolio = Portfolio()
-            self._loaded_path = current_path
-            return self._portfolio
-        
-        with open(current_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if data_file_exists(current_path):
+            data = read_json(current_path)
+            portfolio = Portfolio.from_dict(data)
+            mark = data.get("ledger", {})
+        else:
+            if ledger.size() == 0:
+                logger.info(f"Portfolio file not found at {current_path}, creating empty portfolio")
+            portfolio = Portfolio()
+            mark = {}
         
-        self._portfolio = Portfolio.from_dict(data)
+        self._portfolio = portfolio
         self._loaded_path = current_path
-        logger.info(f"Loaded portfolio with {len(self._portfolio.positions)} positions from {current_path}")
+        self._snapshot_stamp = snapshot_stamp
+        self._ledger = ledger
+        self._ledger_seq = mark.get("seq", 0)
+        self._ledger_offset = mark.get("offset", 0)
+        self._pending_events = 0
+        replayed = self._replay(self._ledger_seq, self._ledger_offset)
+        # A stale offset hint (ledger replaced or lost) would force a reload on every call
+        self._ledger_offset = min(self._ledger_offset, ledger.size())
+        logger.info(
+            f"Loaded portfolio with {len(portfolio.positions)} positions from {current_path}"
+            f" ({replayed} ledger events replayed)"
+        )
         return self._portfolio
     
+    @locked
     def save(self) -> None:
         """
-        Save portfolio to file.
+        Save a portfolio snapshot to file (ledger compaction).
         
-        Updates the last_updated timestamp automatically.
+        The snapshot records the last ledger event it contains, so later
+        loads only replay the events appended after it.
         """
         if self._portfolio is None:
             raise ValueError("No portfolio loaded to save")
         
         self._ensure_directory()
-        self._portfolio.last_updated = datetime.utcnow().isoformat() + "Z"
+        if not self._portfolio.last_updated:
+            self._portfolio.last_updated = datetime.utcnow().isoformat() + "Z"
         
         # Sync owner name from settings if not set
         if not self._portfolio.owner:
-            from cline_finance.core.settings_manager import get_settings_manager
-            sm = get_settings_manager()
-            owner = sm.get_current_owner()
-            if owner:
-                self._portfolio.owner = owner.name
+            self._portfolio.owner = self._current_owner_name()
         
         current_path = self.portfolio_path
-        with open(current_path, "w", encoding="utf-8") as f:
-            json.dump(self._portfolio.to_dict(), f, indent=2)
+        data = self._portfolio.to_dict()
+        data["ledger"] = {"seq": self._ledger_seq, "offset": self._ledger_offset}
+        write_json(current_path, data)
         
         self._loaded_path = current_path
-        logger.info(f"Saved portfolio to {current_path}")
+        self._snapshot_stamp = file_stamp(current_path)
+        self._pending_events = 0
+        logger.info(f"Saved portfolio snapshot to {current_path} at ledger event {self._ledger_seq}")
+    
+    def _current_owner_name(self) -> Optional[str]:
+        """Get the current owner's display name from settings."""
+        from cline_finance.core.settings_manager import get_settings_manager
+        owner = get_settings_manager().get_current_owner()
+        return owner.name if owner else None
+    
+    def _record(self, op: str, **payload) -> dict:
+        """
+        Append a mutation to the ledger and apply it to the loaded portfolio.
+        
+        Compacts the ledger into a new snapshot every LEDGER_COMPACT_EVERY events.
+        
+        Args:
+            op: Ledger operation
+            **payload: Operation fields (None values are omitted)
+        
+        Returns:
+            The recorded event.
+        """
+        portfolio = self.load()
+        payload = {k: v for k, v in payload.items() if v is not None}
+        if not portfolio.owner:
+            owner = self._current_owner_name()
+            if owner:
+                payload["owner"] = owner
+        
+        event, offset = self._ledger.append(self._ledger_seq + 1, op, **payload)
+        portfolio.apply_event(event)
+        self._ledger_seq = event["seq"]
+        self._ledger_offset = offset
+        self._pending_events += 1
+        invalidate_valuations(str(self.portfolio_path))
+        
+        if self._pending_events >= LEDGER_COMPACT_EVERY:
+            self.save()
+        return event
     
+    @locked
     def add_position(
         self,
         symbol: str,
@@ -366,6 +889,7 @@ class PortfolioManager:
             The added or updated Position.
         """
         portfolio = self.load()
+        symbol = symbol.upper()
         existing = portfolio.get_position(symbol)
         
         # Create the new lot
@@ -378,37 +902,211 @@ class PortfolioManager:
             notes=notes,
         )
         
-        if existing:
-            # Append new lot to existing position
-            existing.lots.append(new_lot)
-            
-            # Update optional fields if provided
-            if sector:
-                existing.sector = sector
-            if company_name:
-                existing.company_name = company_name
-            # Position-level notes are separate from lot notes
-            
-            logger.info(f"Added lot to {symbol}: +{shares} shares @ {currency}{avg_cost:.2f} (total: {existing.shares} @ {existing.avg_cost:.2f})")
-            self.save()
-            return existing
-        
-        # Create new position with initial lot
-        new_position = Position(
-            symbol=symbol.upper(),
+        # Position-level notes are separate from lot notes
+        self._record(
+            "add",
+            symbol=symbol,
+            lot=new_lot.to_dict(),
             currency=currency,
-            lots=[new_lot],
             sector=sector,
             asset_type=asset_type,
             isin=isin,
             exchange=exchange,
             company_name=company_name,
         )
-        portfolio.positions.append(new_position)
-        logger.info(f"Added new position {symbol}: {shares} shares @ {currency}{avg_cost:.2f}")
-        self.save()
-        return new_position
+        position = portfolio.get_position(symbol)
+        
+        if existing:
+            logger.info(f"Added lot to {symbol}: +{shares} shares @ {currency}{avg_cost:.2f} (total: {position.shares} @ {position.avg_cost:.2f})")
+        else:
+            logger.info(f"Added new position {symbol}: {shares} shares @ {currency}{avg_cost:.2f}")
+        return position
+    
+    def record_trades(self, trades: list[dict], strict: bool = True) -> tuple[list[dict], list[tuple[int, str]]]:
+        """
+        Record many buys and sells at once (bulk import).
+        
+        Trades are applied in the given order, so a sell can consume lots
+        bought earlier in the same list. Everything is recorded as one ledger
+        batch and the snapshot is written once, so the trades are applied
+        entirely or not at all.
+        
+        Args:
+            trades: Dictionaries with symbol, shares, price and optionally
+                    side ("buy" or "sell", default "buy"), date, currency,
+                    notes; buys may carry sector, asset_type, isin, exchange,
+                    company_name; sells may carry method and lot_indices
+            strict: Raise on the first invalid sell instead of skipping it
+        
+        Returns:
+            Tuple of (recorded events, rejected trades as (index, reason)).
+        
+        Raises:
+            ValueError: If strict and a sell cannot be matched against the lots.
+        """
+        # FX rates for sells of lots in another currency, fetched before locking
+        portfolio = self.load()
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        lots: dict[str, list[tuple[str, str]]] = {}
+        conversions = set()
+        for trade in trades:
+            symbol = trade["symbol"].upper()
+            if symbol not in lots:
+                position = portfolio.get_position(symbol)
+                lots[symbol] = [(l.currency, str(l.date)) for l in position.lots] if position else []
+            if trade.get("side", "buy") == "sell":
+                targets = [trade["currency"]] if trade.get("currency") else {c for c, _ in lots[symbol]}
+                conversions.update((c, d, t) for c, d in lots[symbol] for t in targets)
+            else:
+                lots[symbol].append((trade.get("currency") or "EUR", trade.get("date") or today))
+        
+        return self._record_trades(trades, strict, _resolve_lot_rates(conversions))
+    
+    @locked
+    def _record_trades(
+        self,
+        trades: list[dict],
+        strict: bool,
+        rates: LotRates,
+    ) -> tuple[list[dict], list[tuple[int, str]]]:
+        portfolio = self.load()
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        
+        # Lots as they will be after each trade, for matching later sells
+        lots_by_symbol: dict[str, list] = {}
+        parts = []
+        rejected = []
+        for i, trade in enumerate(trades):
+            symbol = trade["symbol"].upper()
+            if symbol not in lots_by_symbol:
+                position = portfolio.get_position(symbol)
+                lots_by_symbol[symbol] = list(position.lots) if position else []
+            lots = lots_by_symbol[symbol]
+            
+            if trade.get("side", "buy") == "sell":
+                try:
+                    part = _sell_payload(
+                        symbol, lots, trade["shares"], trade["price"],
+                        currency=trade.get("currency"),
+                        method=trade.get("method", "fifo"),
+                        lot_indices=trade.get("lot_indices"),
+                        date=trade.get("date") or today,
+                        reason=trade.get("notes"),
+                        rates=rates,
+                    )
+                except ValueError as e:
+                    if strict:
+                        raise
+                    rejected.append((i, str(e)))
+                    continue
+                lots_by_symbol[symbol] = reduce_lots(lots, [LotMatch.from_dict(m) for m in part["matches"]])
+                parts.append({"op": "sell", **part})
+                continue
+            
+            currency = trade.get("currency") or "EUR"
+            lot = Lot(
+                date=trade.get("date") or today,
+                shares=trade["shares"],
+                price=trade["price"],
+                currency=currency,
+                notes=trade.get("notes"),
+            )
+            lots.append(lot)
+            part = {
+                "op": "add",
+                "symbol": symbol,
+                "lot": lot.to_dict(),
+                "currency": currency,
+                "sector": trade.get("sector"),
+                "asset_type": trade.get("asset_type", "stock"),
+                "isin": trade.get("isin"),
+                "exchange": trade.get("exchange"),
+                "company_name": trade.get("company_name"),
+            }
+            parts.append({k: v for k, v in part.items() if v is not None})
+        
+        if not parts:
+            return [], rejected
+        
+        self._record("batch", events=parts)
+        if self._pending_events:
+            self.save()
+        logger.info(f"Recorded {len(parts)} trades across {len(lots_by_symbol)} positions ({len(rejected)} rejected)")
+        return parts, rejected
+    
+    def sell_position(
+        self,
+        symbol: str,
+        shares: float,
+        price: float,
+        method: str = "fifo",
+        lot_indices: Optional[list[int]] = None,
+        date: Optional[str] = None,
+        reason: Optional[str] = None,
+    ) -> dict:
+        """
+        Sell shares of a position, consuming lots by a matching method.
+        
+        The sale and its realized P&L are kept in the trade ledger; lots
+        that are not fully sold keep their date and price.
+        
+        Args:
+            symbol: Stock ticker to sell
+            shares: Number of shares to sell
+            price: Sale price per share (in the position's currency)
+            method: "fifo", "lifo", "hifo" or "specific" (see core.lot_matching)
+            lot_indices: Lots to sell from for method="specific"
+            date: Trade date (YYYY-MM-DD), defaults to today
+            reason: Optional reason, kept in the trade ledger
+        
+        Returns:
+            The sell event with matched lots, proceeds, cost and realized P&L.
+        
+        Raises:
+            ValueError: If the position doesn't exist or the lots can't cover the sale.
+        """
+        # FX rates for lots in another currency, fetched before locking
+        position = self.load().get_position(symbol)
+        rates = {}
+        if position is not None:
+            targets = [position.currency] if position.currency else {l.currency for l in position.lots}
+            rates = _resolve_lot_rates((l.currency, str(l.date), t) for l in position.lots for t in targets)
+        return self._sell_position(symbol, shares, price, method, lot_indices, date, reason, rates)
+    
+    @locked
+    def _sell_position(
+        self,
+        symbol: str,
+        shares: float,
+        price: float,
+        method: str,
+        lot_indices: Optional[list[int]],
+        date: Optional[str],
+        reason: Optional[str],
+        rates: LotRates,
+    ) -> dict:
+        portfolio = self.load()
+        position = portfolio.get_position(symbol)
+        if not position:
+            raise ValueError(f"Position {symbol} not found in portfolio")
+        
+        payload = _sell_payload(
+            position.symbol, position.lots, shares, price,
+            currency=position.currency,
+            method=method,
+            lot_indices=lot_indices,
+            date=date or datetime.utcnow().strftime("%Y-%m-%d"),
+            reason=reason,
+            rates=rates,
+        )
+        event = self._record("sell", **payload)
+        logger.info(
+            f"Sold {shares} {position.symbol} @ {price:.2f} ({method}): "
+            f"realized {payload['realized_pnl']:+.2f} {payload['currency']}"
+        )
+        return event
     
+    @locked
     def update_position(
         self,
         symbol: str,
@@ -419,13 +1117,14 @@ class PortfolioManager:
         """
         Update an existing position.
         
-        Note: If shares or avg_cost are provided, this will consolidate all lots
-        into a single lot with the new values (for manual corrections).
+        Note: If shares or avg_cost are provided, every lot is rescaled so the
+        totals match (for manual corrections); lot dates are kept. Use
+        sell_position to record an actual sale.
         
         Args:
             symbol: Stock ticker to update
-            shares: New total share count (consolidates lots if provided)
-            avg_cost: New average cost (consolidates lots if provided)
+            shares: New total share count (rescales lot sizes if provided)
+            avg_cost: New average cost (rescales lot prices if provided)
             notes: Updated position-level notes (if provided)
         
         Returns:
@@ -440,54 +1139,69 @@ class PortfolioManager:
         if not position:
             raise ValueError(f"Position {symbol} not found in portfolio")
         
-        # If shares or avg_cost is being modified, consolidate lots
+        lots = None
         if shares is not None or avg_cost is not None:
-            # Use provided values or current computed values
-            new_shares = shares if shares is not None else position.shares
-            new_avg_cost = avg_cost if avg_cost is not None else position.avg_cost
+            current_shares = position.shares
+            current_avg = position.avg_cost
+            new_avg_cost = avg_cost if avg_cost is not None else current_avg
             
-            # Get earliest date from existing lots
-            earliest_date = position.first_purchase or datetime.utcnow().strftime("%Y-%m-%d")
-            
-            # Replace all lots with a single consolidated lot
-            position.lots = [Lot(
-                date=earliest_date,
-                shares=new_shares,
-                price=new_avg_cost,
-                currency=position.currency,
-                notes="Consolidated from manual adjustment",
-            )]
-            logger.info(f"Consolidated {symbol} lots: {new_shares} shares @ {new_avg_cost:.2f}")
-        
-        if notes is not None:
-            position.notes = notes
+            if current_shares > 0 and current_avg > 0:
+                # Rescale every lot, keeping lot dates and relative sizes
+                share_factor = (shares if shares is not None else current_shares) / current_shares
+                price_factor = new_avg_cost / current_avg
+                lots = [
+                    Lot(
+                        date=lot.date,
+                        shares=lot.shares * share_factor,
+                        price=lot.price * price_factor,
+                        currency=lot.currency,
+                        notes=lot.notes,
+                    ).to_dict()
+                    for lot in position.lots
+                ]
+                logger.info(f"Rescaled {len(lots)} {symbol} lots to {shares or current_shares} shares @ {new_avg_cost:.2f}")
+            else:
+                # Nothing to rescale: replace with a single lot
+                lots = [Lot(
+                    date=position.first_purchase or datetime.utcnow().strftime("%Y-%m-%d"),
+                    shares=shares if shares is not None else current_shares,
+                    price=new_avg_cost,
+                    currency=position.currency,
+                    notes="Manual adjustment",
+                ).to_dict()]
         
+        self._record("update", symbol=position.symbol, lots=lots, notes=notes)
         logger.info(f"Updated position {symbol}")
-        self.save()
         return position
     
-    def remove_position(self, symbol: str) -> bool:
+    @locked
+    def remove_position(self, symbol: str, reason: Optional[str] = None) -> bool:
         """
         Remove a position from the portfolio.
         
         Args:
             symbol: Stock ticker to remove.
+            reason: Optional reason, kept in the trade ledger.
         
         Returns:
             True if position was removed, False if not found.
         """
         portfolio = self.load()
-        symbol_upper = symbol.upper()
+        position = portfolio.get_position(symbol)
         
-        for i, pos in enumerate(portfolio.positions):
-            if pos.symbol.upper() == symbol_upper:
-                removed = portfolio.positions.pop(i)
-                logger.info(f"Removed position {removed.symbol}")
-                self.save()
-                return True
+        if not position:
+            logger.warning(f"Position {symbol} not found for removal")
+            return False
         
-        logger.warning(f"Position {symbol} not found for removal")
-        return False
+        self._record(
+            "remove",
+            symbol=position.symbol,
+            shares=position.shares,
+            avg_cost=position.avg_cost,
+            reason=reason,
+        )
+        logger.info(f"Removed position {position.symbol}")
+        return True
     
     def get_portfolio(self) -> Portfolio:
         """
@@ -498,6 +1212,7 @@ class PortfolioManager:
         """
         return self.load()
     
+    @locked
     def update_cash(self, amount: float) -> float:
         """
         Update cash balance.
@@ -509,8 +1224,7 @@ class PortfolioManager:
             New cash balance.
         """
         portfolio = self.load()
-        portfolio.cash = amount
-        self.save()
+        self._record("cash", amount=amount)
         return portfolio.cash
     
     def get_summary(self) -> dict:
@@ -534,7 +1248,7 @@ class PortfolioManager:
                     "symbol": p.symbol,
                     "shares": p.shares,
                     "avg_cost": p.avg_cost,
-                    "cost_basis": p.shares * p.avg_cost,
+                    "cost_basis": p.cost_basis,
                     "sector": p.sector,
                     "asset_type": p.asset_type,
                 }
@@ -542,6 +1256,25 @@ class PortfolioManager:
             ],
         }
     
+    def get_trade_history(
+        self,
+        symbol: Optional[str] = None,
+        op: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Get recorded portfolio events from the ledger, newest first.
+        
+        Args:
+            symbol: Filter by symbol
+            op: Filter by operation ("add", "update", "remove", "sell", "cash")
+            limit: Maximum events to return
+        
+        Returns:
+            List of ledger event dictionaries.
+        """
+        return self.ledger.events(symbol=symbol, op=op, limit=limit)
+    
     def reload(self) -> Portfolio:
         """Force reload portfolio from disk."""
         self._portfolio = None
@@ -575,7 +1308,11 @@ def get_portfolio_manager(owner_slug: Optional[str] = None) -> PortfolioManager:
     cache_key = owner_slug or ""
     
     if cache_key not in _portfolio_managers:
-        _portfolio_managers[cache_key] = PortfolioManager(owner_slug=owner_slug)
+        if STORAGE_BACKEND == "sqlite":
+            from cline_finance.core.sqlite_store import SQLitePortfolioManager
+            _portfolio_managers[cache_key] = SQLitePortfolioManager(owner_slug=owner_slug)
+        else:
+            _portfolio_managers[cache_key] = PortfolioManager(owner_slug=owner_slug)
     
     return _portfolio_managers[cache_key]
 
@@ -0,0 +1,387 @@
+"""
+Market Data Providers - Pluggable source for all upstream market data.
+
+Every tool reads market data through ``get_provider()`` instead of calling
+yfinance directly. Three providers are available:
+- YFinanceProvider: live data from Yahoo Finance (default)
+- RecordingProvider: wraps another provider and saves every response as a fixture
+- ReplayProvider: serves recorded fixtures offline, with optional injected latency
+
+Select one with CLINE_FINANCE_PROVIDER (yfinance, record, replay). Fixtures live
+in CLINE_FINANCE_FIXTURES_DIR (default: data/fixtures).
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional
+
+import pandas as pd
+import yfinance as yf
+
+from cline_finance.constants import (
+    MARKET_DATA_PROVIDER,
+    PROVIDER_FIXTURES_DIR,
+    REPLAY_JITTER_MS,
+    REPLAY_LATENCY_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+# fast_info fields exposed by providers (yfinance computes each one lazily)
+FAST_INFO_FIELDS = ("lastPrice", "previousClose", "currency", "lastVolume", "marketCap")
+
+
+class MarketDataProvider(ABC):
+    """
+    Interface for market data sources.
+    
+    Methods mirror the yfinance calls used by the tools and return the same
+    shapes (dicts, lists and DataFrames), so implementations are drop-in.
+    """
+    
+    name = "base"
+    
+    @abstractmethod
+    def info(self, symbol: str) -> dict:
+        """Get ``ticker.info``."""
+    
+    @abstractmethod
+    def fast_info(self, symbol: str) -> dict:
+        """Get the FAST_INFO_FIELDS of ``ticker.fast_info`` as a dict."""
+    
+    @abstractmethod
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        """Get ``ticker.history(**kwargs)``."""
+    
+    @abstractmethod
+    def download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        """Get ``yf.download(symbols, **kwargs)``."""
+    
+    @abstractmethod
+    def news(self, symbol: str) -> list[dict]:
+        """Get ``ticker.news``."""
+    
+    @abstractmethod
+    def recommendations(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Get ``ticker.recommendations``."""
+    
+    @abstractmethod
+    def upgrades_downgrades(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Get ``ticker.upgrades_downgrades``."""
+    
+    @abstractmethod
+    def calendar(self, symbol: str) -> Any:
+        """Get ``ticker.calendar``."""
+    
+    @abstractmethod
+    def earnings_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Get ``ticker.earnings_history``."""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live market data from yfinance."""
+    
+    name = "yfinance"
+    
+    def info(self, symbol: str) -> dict:
+        return yf.Ticker(symbol).info or {}
+    
+    def fast_info(self, symbol: str) -> dict:
+        fast_info = yf.Ticker(symbol).fast_info
+        result = {}
+        for field in FAST_INFO_FIELDS:
+            try:
+                result[field] = fast_info.get(field)
+            except Exception:
+                result[field] = None
+        return result
+    
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return yf.Ticker(symbol).history(**kwargs)
+    
+    def download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        return yf.download(symbols, **kwargs)
+    
+    def news(self, symbol: str) -> list[dict]:
+        return yf.Ticker(symbol).news or []
+    
+    def recommendations(self, symbol: str) -> Optional[pd.DataFrame]:
+        return yf.Ticker(symbol).recommendations
+    
+    def upgrades_downgrades(self, symbol: str) -> Optional[pd.DataFrame]:
+        return yf.Ticker(symbol).upgrades_downgrades
+    
+    def calendar(self, symbol: str) -> Any:
+        return yf.Ticker(symbol).calendar
+    
+    def earnings_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        return yf.Ticker(symbol).earnings_history
+
+
+def _fixture_slug(symbol: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._^=-]", "_", symbol.upper())
+
+
+def _fixture_key(method: str, subject: str, kwargs: dict) -> str:
+    """Stable hash of a call (method, symbol(s), keyword arguments)."""
+    payload = json.dumps([method, subject, kwargs], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _relative_kwargs(kwargs: dict) -> Optional[dict]:
+    """
+    Arguments of a dated call with start/end as days before today.
+    
+    History windows are derived from the current date, so a call recorded
+    with start=today-30 is asked for again with a later start on later days.
+    Keyed this way, it still matches its fixture. Returns None for calls
+    without dates.
+    """
+    if kwargs.get("start") is None and kwargs.get("end") is None:
+        return None
+    today = pd.Timestamp.now("UTC").normalize().tz_localize(None)
+    relative = dict(kwargs)
+    for name in ("start", "end"):
+        if relative.get(name) is not None:
+            days = (today - pd.Timestamp(relative[name]).normalize()).days
+            relative[name] = f"today-{days}d"
+    return relative
+
+
+class _FixtureStore:
+    """Fixture files at ``{root}/{method}/{symbol}__{key}.pkl``."""
+    
+    def __init__(self, root: Path):
+        self.root = Path(root)
+    
+    def path(self, method: str, subject: str, kwargs: dict) -> Path:
+        return self.root / method / f"{_fixture_slug(subject)}__{_fixture_key(method, subject, kwargs)}.pkl"
+    
+    def save(self, method: str, subject: str, kwargs: dict, value: Any) -> None:
+        path = self.path(method, subject, kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.to_pickle(value, path)
+    
+    def load(self, method: str, subject: str, kwargs: dict) -> Any:
+        """
+        Load the fixture recorded for exactly this call.
+        
+        Raises:
+            LookupError: If the call was not recorded (another period, window
+                or argument is another call; record it again).
+        """
+        path = self.path(method, subject, kwargs)
+        if not path.exists():
+            raise LookupError(f"No fixture recorded for {method}({subject}, {kwargs})")
+        return pd.read_pickle(path)
+
+
+def _download_subject(symbols: list[str]) -> str:
+    """Fixture subject for a multi-symbol download (order-independent)."""
+    joined = ",".join(sorted(s.upper() for s in symbols))
+    return f"batch-{hashlib.sha1(joined.encode()).hexdigest()[:12]}"
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Passes calls to another provider and records every response as a fixture.
+    
+    Failed calls are not recorded.
+    """
+    
+    name = "record"
+    
+    def __init__(self, inner: Optional[MarketDataProvider] = None, fixtures_dir: Optional[Path] = None):
+        """
+        Initialize the recorder.
+        
+        Args:
+            inner: Provider to record (default: YFinanceProvider)
+            fixtures_dir: Where fixtures are written (default: PROVIDER_FIXTURES_DIR)
+        """
+        self.inner = inner or YFinanceProvider()
+        self.fixtures = _FixtureStore(fixtures_dir or PROVIDER_FIXTURES_DIR)
+    
+    def _record(self, method: str, subject: str, kwargs: dict, value: Any) -> Any:
+        try:
+            self.fixtures.save(method, subject, kwargs, value)
+        except Exception as e:
+            logger.warning(f"Could not record fixture for {method}({subject}): {e}")
+        return value
+    
+    def info(self, symbol: str) -> dict:
+        return self._record("info", symbol, {}, self.inner.info(symbol))
+    
+    def fast_info(self, symbol: str) -> dict:
+        return self._record("fast_info", symbol, {}, self.inner.fast_info(symbol))
+    
+    def _record_dated(self, method: str, subject: str, kwargs: dict, value: Any) -> Any:
+        """Record a call with start/end both as made and relative to today."""
+        relative = _relative_kwargs(kwargs)
+        if relative is not None:
+            self._record(f"{method}_relative", subject, relative, value)
+        return self._record(method, subject, kwargs, value)
+    
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self._record_dated("history", symbol, kwargs, self.inner.history(symbol, **kwargs))
+    
+    def download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        return self._record_dated("download", _download_subject(symbols), kwargs, self.inner.download(symbols, **kwargs))
+    
+    def news(self, symbol: str) -> list[dict]:
+        return self._record("news", symbol, {}, self.inner.news(symbol))
+    
+    def recommendations(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._record("recommendations", symbol, {}, self.inner.recommendations(symbol))
+    
+    def upgrades_downgrades(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._record("upgrades_downgrades", symbol, {}, self.inner.upgrades_downgrades(symbol))
+    
+    def calendar(self, symbol: str) -> Any:
+        return self._record("calendar", symbol, {}, self.inner.calendar(symbol))
+    
+    def earnings_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._record("earnings_history", symbol, {}, self.inner.earnings_history(symbol))
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded fixtures without network access.
+    
+    Each call sleeps ``latency_ms`` plus a jitter in [0, jitter_ms) derived
+    from the call itself, so a replayed run has the same timing every time.
+    Calls with no fixture raise LookupError, like a failed fetch. Dated
+    history and download calls also match a fixture recorded on an earlier
+    day for the same window relative to that day (e.g. the last 30 days).
+    """
+    
+    name = "replay"
+    
+    def __init__(
+        self,
+        fixtures_dir: Optional[Path] = None,
+        latency_ms: float = REPLAY_LATENCY_MS,
+        jitter_ms: float = REPLAY_JITTER_MS,
+    ):
+        """
+        Initialize the replayer.
+        
+        Args:
+            fixtures_dir: Where fixtures are read from (default: PROVIDER_FIXTURES_DIR)
+            latency_ms: Fixed delay injected into every call
+            jitter_ms: Maximum extra delay, deterministic per call
+        """
+        self.fixtures = _FixtureStore(fixtures_dir or PROVIDER_FIXTURES_DIR)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+    
+    def _replay(self, method: str, subject: str, kwargs: dict) -> Any:
+        delay_ms = self.latency_ms
+        if self.jitter_ms > 0:
+            fraction = int(_fixture_key(method, subject, kwargs), 16) / 16 ** 16
+            delay_ms += fraction * self.jitter_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        return self.fixtures.load(method, subject, kwargs)
+    
+    def _replay_dated(self, method: str, subject: str, kwargs: dict) -> Any:
+        """Replay a call with start/end, falling back to the fixture recorded as many days ago."""
+        try:
+            return self._replay(method, subject, kwargs)
+        except LookupError:
+            relative = _relative_kwargs(kwargs)
+            if relative is None:
+                raise
+            return self.fixtures.load(f"{method}_relative", subject, relative)
+    
+    def info(self, symbol: str) -> dict:
+        return self._replay("info", symbol, {})
+    
+    def fast_info(self, symbol: str) -> dict:
+        return self._replay("fast_info", symbol, {})
+    
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        return self._replay_dated("history", symbol, kwargs)
+    
+    def download(self, symbols: list[str], **kwargs) -> pd.DataFrame:
+        return self._replay_dated("download", _download_subject(symbols), kwargs)
+    
+    def news(self, symbol: str) -> list[dict]:
+        return self._replay("news", symbol, {})
+    
+    def recommendations(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._replay("recommendations", symbol, {})
+    
+    def upgrades_downgrades(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._replay("upgrades_downgrades", symbol, {})
+    
+    def calendar(self, symbol: str) -> Any:
+        return self._replay("calendar", symbol, {})
+    
+    def earnings_history(self, symbol: str) -> Optional[pd.DataFrame]:
+        return self._replay("earnings_history", symbol, {})
+
+
+def extract_closes(data: pd.DataFrame, symbol: str, batch_size: int) -> Optional[pd.Series]:
+    """Get the Close column for one symbol from a ``download()`` frame (None if absent)."""
+    if isinstance(data.columns, pd.MultiIndex):
+        if symbol not in data.columns.get_level_values(0):
+            return None
+        frame = data[symbol]
+    elif batch_size == 1:
+        # Single-ticker downloads may come back with flat columns
+        frame = data
+    else:
+        return None
+    
+    if "Close" not in frame.columns:
+        return None
+    return frame["Close"].dropna()
+
+
+def create_provider(name: str) -> MarketDataProvider:
+    """
+    Create a provider by name.
+    
+    Args:
+        name: yfinance, record or replay
+    
+    Returns:
+        A new provider instance.
+    """
+    name = name.lower()
+    if name == "record":
+        return RecordingProvider()
+    if name == "replay":
+        return ReplayProvider()
+    if name != "yfinance":
+        logger.warning(f"Unknown market data provider '{name}', using yfinance")
+    return YFinanceProvider()
+
+
+# Singleton instance
+_provider: Optional[MarketDataProvider] = None
+
+
+def get_provider() -> MarketDataProvider:
+    """Get the active market data provider (configured by CLINE_FINANCE_PROVIDER)."""
+    global _provider
+    if _provider is None:
+        _provider = create_provider(MARKET_DATA_PROVIDER)
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    """Replace the active provider (e.g. with a ReplayProvider in benchmarks)."""
+    global _provider
+    _provider = provider
+
+
+def reset_provider() -> None:
+    """Reset the singleton instance (for testing)."""
+    global _provider
+    _provider = None
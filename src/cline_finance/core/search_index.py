@@ -0,0 +1,322 @@
+"""
+Search Index - On-disk inverted index with BM25 ranking over memory texts.
+
+Insight contents and decision rationales and outcomes are tokenized into a
+per-owner inverted index (section -> term -> {memory id: term frequency})
+kept next to the owner's memory. Queries are ranked with Okapi BM25, so
+recall returns the few memories relevant to a question instead of
+everything in a category.
+
+On disk the index is a snapshot (``search_index.json``) plus an append-only
+log of changes (``search_index.log.jsonl``): saving, updating or removing
+memories appends one line, and the log is folded into the snapshot every
+SEARCH_INDEX_COMPACT_EVERY changes. Both carry the memory revision they
+reflect; the memory manager rebuilds the index whenever that differs from
+the memory's own revision (first use, a crash between the two writes, ...).
+"""
+import heapq
+import json
+import logging
+import math
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from cline_finance.constants import SEARCH_INDEX_COMPACT_EVERY
+from cline_finance.core.file_lock import file_stamp
+from cline_finance.core.storage import StorageError, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+# Okapi BM25 parameters: term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.&'][a-z0-9]+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have i in is it its of on or "
+    "so than that the their there this to was we were what when which will with".split()
+)
+
+
+def _stem(token: str) -> str:
+    """Fold simple plurals ("earnings" -> "earning", "rates" -> "rate")."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into index terms.
+    
+    Example:
+        >>> tokenize("Fed rates hit BRK.B earnings")
+        ['fed', 'rate', 'hit', 'brk.b', 'earning']
+    """
+    return [_stem(t) for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def _term_frequencies(text: str) -> dict[str, int]:
+    frequencies: dict[str, int] = defaultdict(int)
+    for term in tokenize(text):
+        frequencies[term] += 1
+    return dict(frequencies)
+
+
+@dataclass
+class SearchHit:
+    """A memory matching a query."""
+    
+    doc_id: str
+    section: str   # "insights" or "decisions"
+    score: float   # BM25 relevance (higher is better)
+
+
+class SearchIndex:
+    """Inverted index of memory texts with BM25 ranking."""
+    
+    def __init__(self, path: Path):
+        """
+        Initialize the index (loaded on first use).
+        
+        Args:
+            path: Snapshot file; the change log sits next to it
+        """
+        self.path = Path(path)
+        self.log_path = self.path.with_name(f"{self.path.stem}.log.jsonl")
+        self.revision = -1  # Memory revision the index reflects (-1: none)
+        self._stamp = None
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._docs: dict[str, tuple[str, int]] = {}     # id -> (section, length in terms)
+        self._terms: dict[str, dict[str, int]] = {}     # id -> term frequencies
+        self._postings: dict[str, dict[str, dict[str, int]]] = defaultdict(dict)  # section -> term -> {id: tf}
+        self._stats: dict[str, list[int]] = defaultdict(lambda: [0, 0])           # section -> [documents, terms]
+        self._logged = 0
+    
+    def __len__(self) -> int:
+        return len(self._docs)
+    
+    # -------------------------------------------------------------------------
+    # Loading and persistence
+    # -------------------------------------------------------------------------
+    
+    def load(self) -> None:
+        """Read the snapshot and replay the change log (no-op if neither changed)."""
+        stamp = (file_stamp(self.path), file_stamp(self.log_path))
+        if stamp == self._stamp:
+            return
+        
+        self._reset()
+        self.revision = -1
+        try:
+            data = read_json(self.path, default=None, backups=0)
+        except StorageError as e:
+            logger.warning(f"Search index unreadable, it will be rebuilt: {e}")
+            data = None
+        if data:
+            # On disk, documents are numbered and posting lists are flat [number, tf, ...] lists
+            self.revision = data.get("revision", -1)
+            ids = []
+            for doc_id, section, length in data.get("docs", []):
+                ids.append(doc_id)
+                self._docs[doc_id] = (section, length)
+                self._terms[doc_id] = {}
+                self._stats[section][0] += 1
+                self._stats[section][1] += length
+            for section, terms in data.get("postings", {}).items():
+                for term, flat in terms.items():
+                    postings = self._postings[section][term] = {}
+                    for number, tf in zip(flat[::2], flat[1::2]):
+                        postings[ids[number]] = tf
+                        self._terms[ids[number]][term] = tf
+        
+        for change in self._read_log():
+            if change.get("rev", 0) <= self.revision:
+                continue  # Already folded into the snapshot
+            if change["rev"] != self.revision + 1:
+                break  # Gap: the index is stale and will be rebuilt
+            self._apply(change.get("add", []), change.get("remove", []))
+            self.revision = change["rev"]
+            self._logged += 1
+        self._stamp = stamp
+    
+    def _read_log(self) -> Iterable[dict]:
+        try:
+            with open(self.log_path, "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break  # Incomplete last line from an interrupted append
+                    try:
+                        yield json.loads(raw)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        logger.warning(f"Skipping unreadable line in {self.log_path}")
+        except FileNotFoundError:
+            return
+    
+    def save(self) -> None:
+        """Write the whole index as a new snapshot and clear the change log."""
+        numbers = {doc_id: n for n, doc_id in enumerate(self._docs)}
+        postings = {
+            section: {
+                term: [value for doc_id, tf in docs.items() for value in (numbers[doc_id], tf)]
+                for term, docs in terms.items()
+            }
+            for section, terms in self._postings.items()
+        }
+        write_json(
+            self.path,
+            {
+                "revision": self.revision,
+                "docs": [[doc_id, section, length] for doc_id, (section, length) in self._docs.items()],
+                "postings": postings,
+            },
+            backups=0,
+            indent=None,
+        )
+        try:
+            os.remove(self.log_path)
+        except FileNotFoundError:
+            pass
+        self._logged = 0
+        self._stamp = (file_stamp(self.path), file_stamp(self.log_path))
+    
+    # -------------------------------------------------------------------------
+    # Updates
+    # -------------------------------------------------------------------------
+    
+    def _add(self, doc_id: str, section: str, frequencies: dict[str, int]) -> None:
+        self._remove(doc_id)
+        length = sum(frequencies.values())
+        self._docs[doc_id] = (section, length)
+        self._terms[doc_id] = frequencies
+        self._stats[section][0] += 1
+        self._stats[section][1] += length
+        terms = self._postings[section]
+        for term, tf in frequencies.items():
+            terms.setdefault(term, {})[doc_id] = tf
+    
+    def _remove(self, doc_id: str) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        section, length = doc
+        self._stats[section][0] -= 1
+        self._stats[section][1] -= length
+        terms = self._postings[section]
+        for term in self._terms.pop(doc_id, {}):
+            postings = terms.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del terms[term]
+    
+    def _apply(self, added: list, removed: list) -> None:
+        for doc_id in removed:
+            self._remove(doc_id)
+        for doc_id, section, frequencies in added:
+            self._add(doc_id, section, frequencies)
+    
+    def update(
+        self,
+        revision: int,
+        added: Iterable[tuple[str, str, str]] = (),
+        removed: Iterable[str] = (),
+    ) -> bool:
+        """
+        Index the changes that produced a memory revision.
+        
+        Args:
+            revision: Memory revision after the changes
+            added: (id, section, text) of new or changed memories
+            removed: Ids of deleted memories
+        
+        Returns:
+            False if the index does not reflect the previous revision; it is
+            then left alone and rebuilt by the next search.
+        """
+        self.load()
+        if self.revision != revision - 1:
+            return False
+        
+        change = {
+            "rev": revision,
+            "add": [[doc_id, section, _term_frequencies(text)] for doc_id, section, text in added],
+            "remove": list(removed),
+        }
+        self._apply(change["add"], change["remove"])
+        self.revision = revision
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "ab") as f:
+            f.write((json.dumps(change, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8"))
+        self._logged += 1
+        
+        if self._logged >= SEARCH_INDEX_COMPACT_EVERY:
+            self.save()
+        else:
+            self._stamp = (file_stamp(self.path), file_stamp(self.log_path))
+        return True
+    
+    def rebuild(self, revision: int, documents: Iterable[tuple[str, str, str]]) -> None:
+        """
+        Index all memories from scratch.
+        
+        Args:
+            revision: Current memory revision
+            documents: (id, section, text) of every memory
+        """
+        self._reset()
+        for doc_id, section, text in documents:
+            self._add(doc_id, section, _term_frequencies(text))
+        self.revision = revision
+        self.save()
+        logger.info(f"Rebuilt search index: {len(self._docs)} memories")
+    
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+    
+    def search(self, query: str, section: str, limit: Optional[int] = None) -> list[SearchHit]:
+        """
+        Rank the memories of a section against a query.
+        
+        Args:
+            query: Free text; memories matching any of its terms are ranked
+            section: "insights" or "decisions"
+            limit: Maximum hits (None for all)
+        
+        Returns:
+            Hits sorted by descending BM25 score.
+        
+        Example:
+            >>> index.search("fed rate cut impact on banks", "insights", limit=5)
+        """
+        documents, total_length = self._stats.get(section, (0, 0))
+        if not documents:
+            return []
+        average_length = total_length / documents or 1.0
+        
+        terms = self._postings.get(section, {})
+        docs = self._docs
+        scores: dict[str, float] = defaultdict(float)
+        for term in dict.fromkeys(tokenize(query)):
+            matches = terms.get(term)
+            if not matches:
+                continue
+            idf = math.log(1 + (documents - len(matches) + 0.5) / (len(matches) + 0.5))
+            for doc_id, tf in matches.items():
+                norm = 1 - BM25_B + BM25_B * docs[doc_id][1] / average_length
+                scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        
+        if limit is not None:
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        else:
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [SearchHit(doc_id=doc_id, section=section, score=score) for doc_id, score in ranked]
@@ -10,6 +10,9 @@ from pathlib import Path
 from typing import Optional, Dict
 
 from cline_finance.constants import DATA_DIR
+from cline_finance.core.storage import data_file_exists, read_json, write_json
+from cline_finance.core.snapshot_writer import flush_snapshots
+from cline_finance.core.valuation_engine import invalidate_valuations
 
 logger = logging.getLogger(__name__)
 
@@ -229,7 +232,7 @@ class SettingsManager:
         # Check for migration first
         migrated_owner = self._migrate_legacy_data()
         
-        if not self.settings_path.exists():
+        if not data_file_exists(self.settings_path):
             logger.info(f"Settings file not found at {self.settings_path}, creating new")
             self._settings = GlobalSettings()
             
@@ -242,8 +245,7 @@ class SettingsManager:
             return self._settings
         
         try:
-            with open(self.settings_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = read_json(self.settings_path)
             
             # Check if it's old format (no "owners" key)
             if "owners" not in data and "base_currency" in data:
@@ -285,8 +287,7 @@ class SettingsManager:
             self._settings.created_at = now
         self._settings.updated_at = now
         
-        with open(self.settings_path, "w", encoding="utf-8") as f:
-            json.dump(self._settings.to_dict(), f, indent=2)
+        write_json(self.settings_path, self._settings.to_dict())
         
         logger.info(f"Saved settings to {self.settings_path}")
     
@@ -379,8 +380,10 @@ class SettingsManager:
                 available = [o.name for o in settings.owners.values()]
                 raise ValueError(f"Owner '{name_or_slug}' not found. Available: {available}")
         
+        flush_snapshots()  # Pending snapshots belong to the previous owner
         settings.current_owner = slug
         self.save()
+        invalidate_valuations()  # Never serve the previous owner's valuation
         
         logger.info(f"Switched to owner '{slug}'")
         return settings.owners[slug]
@@ -0,0 +1,89 @@
+"""
+Single Flight - Coalesce concurrent identical fetches into one upstream call.
+
+When several tool calls ask for the same key at the same time (e.g. a quote
+for AAPL from portfolio_valuation and portfolio_table), only the first caller
+runs the fetch; the others wait for it and receive the same result or error.
+"""
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+
+@dataclass
+class _Call:
+    """An in-flight fetch."""
+    
+    done: threading.Event = field(default_factory=threading.Event)
+    value: Any = None
+    error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+    
+    Results are not kept after the call completes; pair this with a cache for
+    reuse over time.
+    """
+    
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._shared = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` unless a call with the same key is already in flight.
+        
+        Args:
+            key: Identity of the fetch (e.g. ("quote", "AAPL"))
+            fn: Zero-argument callable doing the fetch
+        
+        Returns:
+            The result of ``fn``, shared with all concurrent callers for the key.
+        
+        Raises:
+            Exception: Whatever ``fn`` raised, re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+        
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+    
+    def in_flight(self) -> int:
+        """Number of keys currently being fetched."""
+        with self._lock:
+            return len(self._calls)
+    
+    def stats(self) -> dict:
+        """Get counts of executed and shared (coalesced) calls."""
+        with self._lock:
+            return {
+                "executed": self._executed,
+                "shared": self._shared,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,146 @@
+"""
+Snapshot Writer - Coalesced background writes of daily portfolio snapshots.
+
+Every valuation records the day's portfolio snapshot. Writing it takes the
+owner's memory lock and an fsync, so on the request thread the tool would
+wait for other writers and the disk. Instead, snapshots are handed to this
+writer: the latest one per memory file is kept and written by a background
+thread SNAPSHOT_DEBOUNCE_SECONDS after the first one arrived, so a burst of
+valuations costs one write. Readers of the history flush pending snapshots
+first, and whatever is still pending is flushed at interpreter exit.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Optional
+
+from cline_finance.constants import SNAPSHOT_DEBOUNCE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotWriter:
+    """Keeps the latest pending snapshot per memory file and writes it off-thread."""
+    
+    def __init__(self, debounce_seconds: float = SNAPSHOT_DEBOUNCE_SECONDS):
+        """
+        Initialize the writer.
+        
+        Args:
+            debounce_seconds: Seconds a snapshot waits for newer ones
+                              (0 writes on the calling thread)
+        """
+        self.debounce_seconds = debounce_seconds
+        self._lock = threading.Lock()
+        self._pending: dict[str, tuple[Any, dict]] = {}
+        self._timers: dict[str, threading.Timer] = {}
+        self.writes = 0  # Snapshots actually written
+    
+    def submit(self, memory_manager, **snapshot) -> None:
+        """
+        Queue a snapshot, replacing any snapshot still pending for the same memory file.
+        
+        Args:
+            memory_manager: Manager whose save_portfolio_snapshot writes it
+            **snapshot: Arguments of save_portfolio_snapshot
+        
+        Example:
+            >>> get_snapshot_writer().submit(mm, total_value_eur=1000.0, total_cost_basis=900.0,
+            ...                              cash=0.0, positions=[])
+        """
+        snapshot.setdefault("date", datetime.utcnow().strftime("%Y-%m-%d"))
+        if self.debounce_seconds <= 0:
+            self._write(memory_manager, snapshot)
+            return
+        
+        key = str(memory_manager.lock_path)
+        overdue = None
+        with self._lock:
+            if key in self._pending and self._pending[key][1]["date"] != snapshot["date"]:
+                # Midnight passed: yesterday's last snapshot must not be replaced
+                overdue = self._pending.pop(key)
+            self._pending[key] = (memory_manager, snapshot)
+            if key not in self._timers:
+                timer = threading.Timer(self.debounce_seconds, self.flush, args=(key,))
+                timer.daemon = True
+                self._timers[key] = timer
+                timer.start()
+        if overdue is not None:
+            self._write(*overdue)
+    
+    def flush(self, key: Optional[str] = None) -> int:
+        """
+        Write pending snapshots now.
+        
+        Args:
+            key: Lock path of the memory file to flush (all if None)
+        
+        Returns:
+            Number of snapshots written.
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._pending)
+            batch = []
+            for k in keys:
+                timer = self._timers.pop(k, None)
+                if timer is not None:
+                    timer.cancel()
+                if k in self._pending:
+                    batch.append(self._pending.pop(k))
+        
+        for memory_manager, snapshot in batch:
+            self._write(memory_manager, snapshot)
+        return len(batch)
+    
+    def pending(self) -> int:
+        """Number of snapshots waiting to be written."""
+        with self._lock:
+            return len(self._pending)
+    
+    def _write(self, memory_manager, snapshot: dict) -> None:
+        try:
+            memory_manager.save_portfolio_snapshot(**snapshot)
+            self.writes += 1
+        except Exception as e:
+            logger.warning(f"Failed to save portfolio snapshot: {e}")
+
+
+# Global writer instance
+_writer: Optional[SnapshotWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_snapshot_writer() -> SnapshotWriter:
+    """Get the global snapshot writer instance."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SnapshotWriter()
+        return _writer
+
+
+def flush_snapshots(key: Optional[str] = None) -> int:
+    """
+    Write pending snapshots of one memory file (or all) if a writer exists.
+    
+    Args:
+        key: Lock path of the memory file (all if None)
+    
+    Returns:
+        Number of snapshots written.
+    """
+    with _writer_lock:
+        writer = _writer
+    return writer.flush(key) if writer is not None else 0
+
+
+def reset_snapshot_writer() -> None:
+    """Flush and drop the global writer (for testing and reconfiguration)."""
+    global _writer
+    flush_snapshots()
+    with _writer_lock:
+        _writer = None
+
+
+atexit.register(flush_snapshots)
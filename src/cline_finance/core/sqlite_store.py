@@ -0,0 +1,803 @@
+"""
+SQLite Store - Optional per-owner SQLite backend (CLINE_FINANCE_STORAGE=sqlite).
+
+Each owner directory holds one ``finance.db`` in WAL mode with indexed tables
+for positions, lots, trades, insights, decisions and snapshots.
+SQLitePortfolioManager and SQLiteMemoryManager keep the PortfolioManager and
+MemoryManager APIs, but a trade writes only the rows it touches and queries
+such as ``get_insights(symbol=...)`` or ``get_pending_reviews()`` are index
+lookups instead of scans over the whole JSON file.
+
+The first time a database is opened, the owner's existing JSON files
+(portfolio.json with its ledger, the memory segments or memory.json) are
+imported once; the JSON files are left in place untouched.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Optional
+
+from cline_finance.constants import FILE_LOCK_TIMEOUT_SECONDS, SQLITE_DB_NAME
+from cline_finance.core.file_lock import locked
+from cline_finance.core.ledger import Ledger, flatten_events
+from cline_finance.core.memory_manager import (
+    Decision,
+    Insight,
+    MemoryManager,
+    PortfolioSnapshot,
+    _decision_text,
+    memory_data_exists,
+    read_memory,
+)
+from cline_finance.core.portfolio_manager import (
+    Lot,
+    Portfolio,
+    PortfolioManager,
+    Position,
+    _get_ledger_path,
+)
+from cline_finance.core.snapshot_writer import flush_snapshots
+from cline_finance.core.storage import data_file_exists
+from cline_finance.core.valuation_engine import invalidate_valuations
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    currency TEXT NOT NULL,
+    sector TEXT,
+    asset_type TEXT NOT NULL DEFAULT 'stock',
+    isin TEXT,
+    exchange TEXT,
+    company_name TEXT,
+    notes TEXT
+);
+CREATE TABLE IF NOT EXISTS lots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    shares REAL NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS lots_symbol_date ON lots (symbol, date);
+CREATE TABLE IF NOT EXISTS trades (
+    seq INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    op TEXT NOT NULL,
+    symbol TEXT,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trades_symbol ON trades (symbol, seq);
+CREATE TABLE IF NOT EXISTS insights (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    content TEXT NOT NULL,
+    symbol TEXT,
+    tags TEXT NOT NULL DEFAULT '[]',
+    relevance_expires TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS insights_category ON insights (category, date);
+CREATE INDEX IF NOT EXISTS insights_symbol ON insights (symbol, date);
+CREATE INDEX IF NOT EXISTS insights_expiry ON insights (relevance_expires);
+CREATE TABLE IF NOT EXISTS decisions (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    action TEXT NOT NULL,
+    symbol TEXT,
+    shares REAL,
+    price REAL,
+    rationale TEXT NOT NULL,
+    outcome TEXT,
+    outcome_date TEXT,
+    review_date TEXT,
+    status TEXT NOT NULL DEFAULT 'pending'
+);
+CREATE INDEX IF NOT EXISTS decisions_status_review ON decisions (status, review_date);
+CREATE INDEX IF NOT EXISTS decisions_symbol ON decisions (symbol, date);
+CREATE TABLE IF NOT EXISTS snapshots (
+    date TEXT PRIMARY KEY,
+    total_value_eur REAL NOT NULL,
+    total_cost_basis REAL NOT NULL,
+    cash REAL NOT NULL,
+    positions TEXT NOT NULL DEFAULT '[]'
+);
+"""
+
+_INSIGHT_COLUMNS = ("id", "date", "category", "content", "symbol", "tags", "relevance_expires", "source")
+_DECISION_COLUMNS = (
+    "id", "date", "action", "symbol", "shares", "price", "rationale",
+    "outcome", "outcome_date", "review_date", "status",
+)
+_SECTION_COLUMNS = {"insights": _INSIGHT_COLUMNS, "decisions": _DECISION_COLUMNS}
+
+
+class SQLiteStore:
+    """A per-owner SQLite database shared by the portfolio and memory managers."""
+    
+    def __init__(self, path: Path):
+        """
+        Open (and create if needed) the database.
+        
+        Args:
+            path: Database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._local_writes = 0
+        
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=FILE_LOCK_TIMEOUT_SECONDS,
+            isolation_level=None,  # Transactions are explicit (see transaction())
+            check_same_thread=False,
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        with self.transaction() as conn:
+            _set_meta(conn, "schema_version", SCHEMA_VERSION)
+    
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Use the connection for reads."""
+        with self._lock:
+            yield self._conn
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction (committed on success, rolled back on error)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._local_writes += 1
+    
+    def version(self) -> tuple[int, int]:
+        """Change marker: differs whenever this or another connection committed."""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return data_version, self._local_writes
+    
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_stores: dict[str, SQLiteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_sqlite_store(path: Path) -> SQLiteStore:
+    """
+    Get the shared store for a database file, importing JSON data on first use.
+    
+    Args:
+        path: Database file (``<owner_dir>/finance.db``)
+    
+    Returns:
+        SQLiteStore instance
+    """
+    key = str(Path(path).resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and not store.path.exists():
+            # Owner directory was deleted; start over with a new database
+            store.close()
+            store = None
+        if store is None:
+            store = _stores[key] = SQLiteStore(path)
+            migrate_json_to_sqlite(store)
+        return store
+
+
+def close_sqlite_stores() -> None:
+    """Close all open databases (after deleting owners, and for testing)."""
+    global _stores
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores = {}
+
+
+# -----------------------------------------------------------------------------
+# Row helpers
+# -----------------------------------------------------------------------------
+
+def _set_meta(conn: sqlite3.Connection, key: str, value) -> None:
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, json.dumps(value)),
+    )
+
+
+def _get_meta(conn: sqlite3.Connection) -> dict:
+    return {row["key"]: json.loads(row["value"]) for row in conn.execute("SELECT key, value FROM meta")}
+
+
+def _get_counter(conn: sqlite3.Connection, key: str) -> int:
+    """Read a revision counter from the meta table (0 if never bumped)."""
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row["value"]) if row else 0
+
+
+def _bump_counter(conn: sqlite3.Connection, key: str) -> int:
+    """Increment a revision counter and return its new value."""
+    value = _get_counter(conn, key) + 1
+    _set_meta(conn, key, value)
+    return value
+
+
+def _write_portfolio_meta(conn: sqlite3.Connection, portfolio: Portfolio) -> int:
+    """Write the portfolio's scalar fields and return its new revision."""
+    _set_meta(conn, "cash", portfolio.cash)
+    _set_meta(conn, "base_currency", portfolio.base_currency)
+    _set_meta(conn, "owner", portfolio.owner)
+    _set_meta(conn, "last_updated", portfolio.last_updated)
+    # Portfolio writes only: memory writes to the same database leave it alone
+    return _bump_counter(conn, "portfolio_revision")
+
+
+def _upsert_position(conn: sqlite3.Connection, position: Position) -> None:
+    """Insert or update a position row (its lots are written separately)."""
+    conn.execute(
+        """
+        INSERT INTO positions (symbol, currency, sector, asset_type, isin, exchange, company_name, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(symbol) DO UPDATE SET
+            currency = excluded.currency, sector = excluded.sector, asset_type = excluded.asset_type,
+            isin = excluded.isin, exchange = excluded.exchange,
+            company_name = excluded.company_name, notes = excluded.notes
+        """,
+        (
+            position.symbol, position.currency, position.sector, position.asset_type,
+            position.isin, position.exchange, position.company_name, position.notes,
+        ),
+    )
+
+
+def _insert_lots(conn: sqlite3.Connection, symbol: str, lots: list[Lot]) -> None:
+    conn.executemany(
+        "INSERT INTO lots (symbol, date, shares, price, currency, notes) VALUES (?, ?, ?, ?, ?, ?)",
+        [(symbol, lot.date, lot.shares, lot.price, lot.currency, lot.notes) for lot in lots],
+    )
+
+
+def _sync_position(conn: sqlite3.Connection, portfolio: Portfolio, symbol: str) -> None:
+    """Rewrite the rows of one position (or delete them if it no longer exists)."""
+    position = portfolio.get_position(symbol)
+    stored = position.symbol if position else symbol
+    conn.execute("DELETE FROM lots WHERE symbol = ?", (stored,))
+    if position is None:
+        conn.execute("DELETE FROM positions WHERE symbol = ?", (stored,))
+        return
+    _upsert_position(conn, position)
+    _insert_lots(conn, position.symbol, position.lots)
+
+
+def _write_portfolio(conn: sqlite3.Connection, portfolio: Portfolio) -> int:
+    """Replace all portfolio rows and return the new revision."""
+    conn.execute("DELETE FROM lots")
+    conn.execute("DELETE FROM positions")
+    for position in portfolio.positions:
+        _upsert_position(conn, position)
+        _insert_lots(conn, position.symbol, position.lots)
+    return _write_portfolio_meta(conn, portfolio)
+
+
+def _read_portfolio(conn: sqlite3.Connection) -> Portfolio:
+    meta = _get_meta(conn)
+    lots = defaultdict(list)
+    for row in conn.execute("SELECT symbol, date, shares, price, currency, notes FROM lots ORDER BY id"):
+        lots[row["symbol"]].append(Lot(
+            date=row["date"],
+            shares=row["shares"],
+            price=row["price"],
+            currency=row["currency"],
+            notes=row["notes"],
+        ))
+    
+    positions = [
+        Position(
+            symbol=row["symbol"],
+            currency=row["currency"],
+            lots=lots.get(row["symbol"], []),
+            sector=row["sector"],
+            asset_type=row["asset_type"],
+            isin=row["isin"],
+            exchange=row["exchange"],
+            company_name=row["company_name"],
+            notes=row["notes"],
+        )
+        for row in conn.execute("SELECT * FROM positions ORDER BY rowid")
+    ]
+    return Portfolio(
+        positions=positions,
+        cash=meta.get("cash") or 0.0,
+        base_currency=meta.get("base_currency") or "EUR",
+        owner=meta.get("owner"),
+        last_updated=meta.get("last_updated"),
+    )
+
+
+def _insert_trade(conn: sqlite3.Connection, event: dict) -> None:
+    conn.execute(
+        "INSERT INTO trades (seq, ts, op, symbol, event) VALUES (?, ?, ?, ?, ?)",
+        (event["seq"], event["ts"], event["op"], event.get("symbol"), json.dumps(event, ensure_ascii=False)),
+    )
+
+
+def _apply_trade(conn: sqlite3.Connection, portfolio: Portfolio, event: dict) -> None:
+    """Record one trade event and update the rows of the position it touches."""
+    _insert_trade(conn, event)
+    portfolio.apply_event(event)
+    
+    op = event["op"]
+    if op == "add":
+        position = portfolio.get_position(event["symbol"])
+        _upsert_position(conn, position)
+        _insert_lots(conn, position.symbol, [Lot.from_dict(event["lot"])])
+    elif op in ("update", "remove", "sell"):
+        _sync_position(conn, portfolio, event["symbol"])
+
+
+def _insert_record(conn: sqlite3.Connection, section: str, record: dict) -> None:
+    """Insert an insight or decision dictionary (as produced by to_dict)."""
+    columns = _SECTION_COLUMNS[section]
+    values = [record.get(c) for c in columns]
+    if section == "insights":
+        values[columns.index("tags")] = json.dumps(record.get("tags") or [])
+    conn.execute(
+        f"INSERT OR REPLACE INTO {section} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        values,
+    )
+
+
+def _put_snapshot(conn: sqlite3.Connection, record: dict) -> None:
+    conn.execute(
+        """
+        INSERT INTO snapshots (date, total_value_eur, total_cost_basis, cash, positions)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            total_value_eur = excluded.total_value_eur, total_cost_basis = excluded.total_cost_basis,
+            cash = excluded.cash, positions = excluded.positions
+        """,
+        (
+            record["date"], record.get("total_value_eur", 0), record.get("total_cost_basis", 0),
+            record.get("cash", 0), json.dumps(record.get("positions", []), ensure_ascii=False),
+        ),
+    )
+
+
+def _row_to_insight(row: sqlite3.Row) -> Insight:
+    data = {k: row[k] for k in row.keys() if row[k] is not None}
+    data["tags"] = json.loads(row["tags"] or "[]")
+    return Insight.from_dict(data)
+
+
+def _row_to_decision(row: sqlite3.Row) -> Decision:
+    return Decision.from_dict({k: row[k] for k in row.keys() if row[k] is not None})
+
+
+def _row_to_snapshot(row: sqlite3.Row) -> PortfolioSnapshot:
+    data = dict(row)
+    data["positions"] = json.loads(row["positions"] or "[]")
+    return PortfolioSnapshot.from_dict(data)
+
+
+# -----------------------------------------------------------------------------
+# JSON migration
+# -----------------------------------------------------------------------------
+
+def migrate_json_to_sqlite(store: SQLiteStore) -> Optional[dict]:
+    """
+    Import an owner's JSON files into a new database (runs once per database).
+    
+    Reads portfolio.json (replaying its trade ledger), the ledger events
+    themselves and the memory segments (or a legacy memory.json) from the
+    database's directory.
+    
+    Args:
+        store: Store to import into
+    
+    Returns:
+        Counts of imported records, or None if the database was already migrated.
+    """
+    directory = store.path.parent
+    portfolio_path = directory / "portfolio.json"
+    memory_path = directory / "memory.json"
+    ledger = Ledger(_get_ledger_path(portfolio_path))
+    
+    with store.read() as conn:
+        if "migrated_at" in _get_meta(conn):
+            return None
+    
+    portfolio = None
+    if data_file_exists(portfolio_path) or ledger.size():
+        portfolio = PortfolioManager(portfolio_path=portfolio_path).load()
+    memory = read_memory(memory_path) if memory_data_exists(memory_path) else {}
+    
+    counts = {"positions": 0, "trades": 0, "insights": 0, "decisions": 0, "snapshots": 0}
+    with store.transaction() as conn:
+        if "migrated_at" in _get_meta(conn):
+            return None  # Another process migrated first
+        
+        if portfolio is not None:
+            _write_portfolio(conn, portfolio)
+            counts["positions"] = len(portfolio.positions)
+            # Batches become one row per part, so trade rows are renumbered
+            for seq, event in enumerate(flatten_events(e for e, _ in ledger.read()), 1):
+                _insert_trade(conn, {**event, "seq": seq})
+                counts["trades"] += 1
+        for section in ("insights", "decisions"):
+            for record in memory.get(section, []):
+                _insert_record(conn, section, record)
+                counts[section] += 1
+        for record in memory.get("snapshots", []):
+            _put_snapshot(conn, record)
+            counts["snapshots"] += 1
+        
+        _set_meta(conn, "migrated_at", datetime.utcnow().isoformat() + "Z")
+        _set_meta(conn, "migrated_counts", counts)
+    
+    if any(counts.values()):
+        logger.info(f"Imported JSON data from {directory} into {store.path}: {counts}")
+    return counts
+
+
+# -----------------------------------------------------------------------------
+# Managers
+# -----------------------------------------------------------------------------
+
+class SQLitePortfolioManager(PortfolioManager):
+    """
+    PortfolioManager backed by the owner's SQLite database.
+    
+    A mutation writes its trade row and the rows of the affected position in
+    one transaction. The cached portfolio is reused until the database
+    changes.
+    """
+    
+    def __init__(self, portfolio_path: Optional[Path] = None, owner_slug: Optional[str] = None):
+        super().__init__(portfolio_path=portfolio_path, owner_slug=owner_slug)
+        self._version: Optional[tuple[int, int]] = None
+        self._revision = 0
+    
+    @property
+    def db_path(self) -> Path:
+        """Get the database path (owner-aware)."""
+        return self.portfolio_path.with_name(SQLITE_DB_NAME)
+    
+    @property
+    def lock_path(self) -> Path:
+        """Data file whose lock guards read-modify-write cycles."""
+        return self.db_path
+    
+    def _store(self) -> SQLiteStore:
+        return get_sqlite_store(self.db_path)
+    
+    @property
+    def version(self) -> tuple:
+        """Marker that changes whenever the portfolio changes (loads it if needed)."""
+        self.load()
+        return (str(self._loaded_path), self._revision)
+    
+    def _should_reload(self) -> bool:
+        """Check if we need to reload due to owner change or a committed change."""
+        if self._portfolio is None:
+            return True
+        if self._loaded_path != self.db_path:
+            return True
+        return self._store().version() != self._version
+    
+    def load(self, force: bool = False) -> Portfolio:
+        """
+        Load portfolio from the database.
+        
+        Args:
+            force: Force reload even if already loaded.
+        
+        Returns:
+            Portfolio object with current holdings.
+        """
+        if not force and not self._should_reload():
+            return self._portfolio
+        
+        current_path = self.db_path
+        store = self._store()
+        with store.read() as conn:
+            self._version = store.version()
+            self._revision = _get_counter(conn, "portfolio_revision")
+            self._portfolio = _read_portfolio(conn)
+        self._loaded_path = current_path
+        logger.info(f"Loaded portfolio with {len(self._portfolio.positions)} positions from {current_path}")
+        return self._portfolio
+    
+    def save(self) -> None:
+        """Write the whole loaded portfolio to the database."""
+        if self._portfolio is None:
+            raise ValueError("No portfolio loaded to save")
+        
+        if not self._portfolio.owner:
+            self._portfolio.owner = self._current_owner_name()
+        
+        store = self._store()
+        with store.transaction() as conn:
+            self._revision = _write_portfolio(conn, self._portfolio)
+        self._version = store.version()
+        logger.info(f"Saved portfolio to {self.db_path}")
+    
+    def _record(self, op: str, **payload) -> dict:
+        """
+        Record a mutation as a trade row and update the affected rows.
+        
+        Args:
+            op: Ledger operation
+            **payload: Operation fields (None values are omitted)
+        
+        Returns:
+            The recorded event.
+        """
+        portfolio = self.load()
+        payload = {k: v for k, v in payload.items() if v is not None}
+        if not portfolio.owner:
+            owner = self._current_owner_name()
+            if owner:
+                payload["owner"] = owner
+        
+        store = self._store()
+        try:
+            with store.transaction() as conn:
+                seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM trades").fetchone()[0]
+                ts = datetime.utcnow().isoformat() + "Z"
+                event = {"seq": seq, "ts": ts, "op": op, **payload}
+                # A batch is stored as one trade row per part, all in this transaction
+                parts = event.pop("events") if op == "batch" else [{"op": op}]
+                for offset, part in enumerate(parts):
+                    _apply_trade(conn, portfolio, {**event, **part, "seq": seq + offset})
+                self._revision = _write_portfolio_meta(conn, portfolio)
+        except BaseException:
+            self._portfolio = None  # In-memory copy may be ahead of the rolled-back database
+            raise
+        
+        self._version = store.version()
+        invalidate_valuations(str(self.portfolio_path))
+        return event
+    
+    def get_trade_history(
+        self,
+        symbol: Optional[str] = None,
+        op: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Get recorded portfolio events, newest first.
+        
+        Args:
+            symbol: Filter by symbol
+            op: Filter by operation ("add", "update", "remove", "sell", "cash")
+            limit: Maximum events to return
+        
+        Returns:
+            List of event dictionaries.
+        """
+        clauses, params = [], []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol.upper())
+        if op:
+            clauses.append("op = ?")
+            params.append(op)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT event FROM trades {where} ORDER BY seq DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        with self._store().read() as conn:
+            return [json.loads(row["event"]) for row in conn.execute(query, params)]
+
+
+class SQLiteMemoryManager(MemoryManager):
+    """MemoryManager backed by the owner's SQLite database (queries use indexes)."""
+    
+    @property
+    def db_path(self) -> Path:
+        """Get the database path (owner-aware)."""
+        return self.memory_file.with_name(SQLITE_DB_NAME)
+    
+    @property
+    def lock_path(self) -> Path:
+        """Data file whose lock guards read-modify-write cycles."""
+        return self.db_path
+    
+    def _store(self) -> SQLiteStore:
+        return get_sqlite_store(self.db_path)
+    
+    def _load(self, force: bool = False) -> dict:
+        """Read all sections (in the memory.json layout)."""
+        with self._store().read() as conn:
+            return {
+                "insights": [_row_to_insight(r).to_dict() for r in conn.execute("SELECT * FROM insights ORDER BY rowid")],
+                "decisions": [_row_to_decision(r).to_dict() for r in conn.execute("SELECT * FROM decisions ORDER BY rowid")],
+                "snapshots": [_row_to_snapshot(r).to_dict() for r in conn.execute("SELECT * FROM snapshots ORDER BY date")],
+            }
+    
+    def _append_records(self, section: str, records: list[dict]) -> int:
+        with self._store().transaction() as conn:
+            for record in records:
+                _insert_record(conn, section, record)
+            return _bump_counter(conn, "memory_revision")
+    
+    def _memory_revision(self) -> int:
+        with self._store().read() as conn:
+            return _get_counter(conn, "memory_revision")
+    
+    def _search_documents(self) -> Iterator[tuple[str, str, str]]:
+        with self._store().read() as conn:
+            insights = conn.execute("SELECT id, content FROM insights").fetchall()
+            decisions = conn.execute("SELECT id, rationale, outcome FROM decisions").fetchall()
+        for row in insights:
+            yield row["id"], "insights", row["content"]
+        for row in decisions:
+            yield row["id"], "decisions", _decision_text(dict(row))
+    
+    def _records_by_id(self, section: str, ids: list[str]) -> list[dict]:
+        if not ids:
+            return []
+        to_record = _row_to_insight if section == "insights" else _row_to_decision
+        with self._store().read() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM {section} WHERE id IN ({', '.join('?' * len(ids))})", ids,
+            ).fetchall()
+        records = {row["id"]: to_record(row).to_dict() for row in rows}
+        return [records[i] for i in ids if i in records]
+    
+    def _put_snapshot(self, record: dict) -> None:
+        with self._store().transaction() as conn:
+            _put_snapshot(conn, record)
+    
+    def get_insights(
+        self,
+        category: Optional[str] = None,
+        symbol: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        include_expired: bool = False,
+        limit: int = 20,
+    ) -> list[Insight]:
+        """Retrieve insights matching criteria."""
+        clauses, params = [], []
+        if not include_expired:
+            # An insight expires at the start of its relevance_expires day
+            clauses.append("(relevance_expires IS NULL OR relevance_expires > ?)")
+            params.append(datetime.utcnow().strftime("%Y-%m-%d"))
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol.upper())
+        if tags:
+            clauses.append(f"EXISTS (SELECT 1 FROM json_each(insights.tags) WHERE value IN ({', '.join('?' * len(tags))}))")
+            params.extend(tags)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        with self._store().read() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM insights {where} ORDER BY date DESC, rowid LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [_row_to_insight(r) for r in rows]
+    
+    @locked
+    def cleanup_expired_insights(self) -> int:
+        """Remove expired insights from storage."""
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        expired = "FROM insights WHERE relevance_expires IS NOT NULL AND relevance_expires <= ?"
+        with self._store().transaction() as conn:
+            expired_ids = [row["id"] for row in conn.execute(f"SELECT id {expired}", (today,))]
+            removed = conn.execute(f"DELETE {expired}", (today,)).rowcount
+            revision = _bump_counter(conn, "memory_revision")
+        self._index_changes(revision, removed=expired_ids)
+        logger.info(f"Cleaned up {removed} expired insights")
+        return removed
+    
+    def get_pending_reviews(self) -> list[Decision]:
+        """Get decisions that are due for review."""
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        with self._store().read() as conn:
+            rows = conn.execute(
+                "SELECT * FROM decisions WHERE status = 'pending' AND review_date <= ? ORDER BY rowid",
+                (today,),
+            ).fetchall()
+        return [_row_to_decision(r) for r in rows]
+    
+    @locked
+    def update_decision_outcome(
+        self,
+        decision_id: str,
+        outcome: str,
+        status: str = "reviewed",
+    ) -> Optional[Decision]:
+        """Update a decision with its outcome."""
+        with self._store().transaction() as conn:
+            updated = conn.execute(
+                "UPDATE decisions SET outcome = ?, outcome_date = ?, status = ? WHERE id = ?",
+                (outcome, datetime.utcnow().strftime("%Y-%m-%d"), status, decision_id),
+            ).rowcount
+            row = conn.execute("SELECT * FROM decisions WHERE id = ?", (decision_id,)).fetchone()
+            revision = _bump_counter(conn, "memory_revision") if updated else None
+        
+        if not updated:
+            logger.warning(f"Decision {decision_id} not found")
+            return None
+        self._index_changes(revision, added=[(decision_id, "decisions", _decision_text(dict(row)))])
+        logger.info(f"Updated decision {decision_id} outcome")
+        return _row_to_decision(row)
+    
+    def get_decisions(
+        self,
+        symbol: Optional[str] = None,
+        action: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[Decision]:
+        """Get decisions matching criteria."""
+        clauses, params = [], []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol.upper())
+        if action:
+            clauses.append("action = ?")
+            params.append(action)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        with self._store().read() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM decisions {where} ORDER BY date DESC, rowid LIMIT ?",
+                [*params, limit],
+            ).fetchall()
+        return [_row_to_decision(r) for r in rows]
+    
+    def get_portfolio_history(
+        self,
+        days: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[PortfolioSnapshot]:
+        """Get portfolio history snapshots."""
+        flush_snapshots(str(self.lock_path))
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d") if days else ""
+        query = "SELECT * FROM snapshots WHERE date >= ? ORDER BY date DESC"
+        params: list = [cutoff]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        with self._store().read() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [_row_to_snapshot(r) for r in reversed(rows)]
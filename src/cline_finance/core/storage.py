@@ -0,0 +1,186 @@
+"""
+Storage - Crash-safe JSON persistence shared by all data files.
+
+Writes go to a temporary file in the same directory, are fsynced, and then
+atomically renamed over the target, so a crash never leaves a truncated file.
+The previous versions are kept as rolling backups (``portfolio.json.bak1``,
+``.bak2``, ...) and reads fall back to the newest readable backup.
+"""
+import json
+import logging
+import os
+import shutil
+import stat
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from cline_finance.constants import STORAGE_BACKUPS, STORAGE_JSON_INDENT
+
+logger = logging.getLogger(__name__)
+
+
+class StorageError(Exception):
+    """Raised when a data file and all of its backups are unreadable."""
+
+
+def backup_path(path: Path, index: int) -> Path:
+    """Get the path of the index-th backup (1 = most recent)."""
+    return path.with_name(f"{path.name}.bak{index}")
+
+
+def data_file_exists(path: Path, backups: int = STORAGE_BACKUPS) -> bool:
+    """Check whether a data file or any of its backups exists."""
+    path = Path(path)
+    return path.exists() or any(backup_path(path, i).exists() for i in range(1, backups + 1))
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a rename by syncing the directory entry (no-op where unsupported)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotate_backups(path: Path, backups: int) -> None:
+    """Shift backups by one and make .bak1 a copy of the current file (which stays in place)."""
+    for index in range(backups - 1, 0, -1):
+        older = backup_path(path, index)
+        if older.exists():
+            os.replace(older, backup_path(path, index + 1))
+    
+    # Hard-link (or copy) under a temporary name, then rename over .bak1
+    tmp_name = path.with_name(f".{path.name}.bak.tmp")
+    try:
+        os.unlink(tmp_name)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, tmp_name)
+    except OSError:
+        shutil.copy2(path, tmp_name)
+    os.replace(tmp_name, backup_path(path, 1))
+
+
+def atomic_write_bytes(path: Path, data: bytes, backups: int = STORAGE_BACKUPS) -> None:
+    """
+    Atomically replace a file's contents.
+    
+    The target always exists (old or new contents) and keeps its permissions;
+    new files follow the umask.
+    
+    Args:
+        path: Target file
+        data: New contents
+        backups: Number of previous versions to keep (0 to keep none)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Created like open() would create the target: mode 0o666 minus the umask
+    tmp_name = path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+    fd = os.open(tmp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            try:
+                os.fchmod(f.fileno(), stat.S_IMODE(os.stat(path).st_mode))
+            except FileNotFoundError:
+                pass
+            os.fsync(f.fileno())
+        
+        if backups > 0 and path.exists():
+            _rotate_backups(path, backups)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    
+    _fsync_directory(path.parent)
+
+
+def dumps_json(data: Any, indent: Optional[int] = STORAGE_JSON_INDENT) -> bytes:
+    """Serialize to JSON bytes (compact unless an indent is configured)."""
+    if indent:
+        text = json.dumps(data, indent=indent, ensure_ascii=False)
+    else:
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+def write_json(
+    path: Path,
+    data: Any,
+    backups: int = STORAGE_BACKUPS,
+    indent: Optional[int] = STORAGE_JSON_INDENT,
+) -> None:
+    """
+    Atomically write a JSON file, keeping rolling backups.
+    
+    Args:
+        path: Target file
+        data: JSON-serializable data
+        backups: Number of previous versions to keep
+        indent: Indentation (None for compact output)
+    """
+    atomic_write_bytes(Path(path), dumps_json(data, indent), backups)
+
+
+def _quarantine(path: Path) -> Path:
+    """Move an unreadable file aside so it is not overwritten."""
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    target = path.with_name(f"{path.name}.corrupt-{stamp}")
+    os.replace(path, target)
+    return target
+
+
+def read_json(path: Path, default: Any = None, backups: int = STORAGE_BACKUPS) -> Any:
+    """
+    Read a JSON file, falling back to the newest readable backup.
+    
+    Args:
+        path: File to read
+        default: Returned when neither the file nor any backup exists
+        backups: Number of backups to consider
+    
+    Returns:
+        The parsed data.
+    
+    Raises:
+        StorageError: If the file exists but it and all backups are unreadable.
+            The unreadable file is moved to ``<name>.corrupt-<timestamp>``.
+    """
+    path = Path(path)
+    candidates = [path] + [backup_path(path, i) for i in range(1, backups + 1)]
+    existing = [p for p in candidates if p.exists()]
+    if not existing:
+        return default
+    
+    errors = []
+    for candidate in existing:
+        try:
+            with open(candidate, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+            errors.append(f"{candidate.name}: {e}")
+            continue
+        if candidate != path:
+            logger.warning(f"{path} unreadable ({'; '.join(errors)}), recovered from {candidate.name}")
+        return data
+    
+    message = f"{path} and its backups are unreadable: {'; '.join(errors)}"
+    if path.exists():
+        message += f" (moved to {_quarantine(path).name})"
+    raise StorageError(message)
@@ -0,0 +1,134 @@
+"""
+Ticker Info Store - Shared per-symbol cache of yfinance ``ticker.info``.
+
+``ticker.info`` is the slowest yfinance call, so every consumer (quotes, analyst
+ratings, earnings, market movers, FX) reads it through this store. Each fetch is
+split in two cache entries:
+- slow-moving fields (STATIC_INFO_FIELDS: names, sector, exchange, currency,
+  price targets) under the "info_static" kind with a long TTL
+- everything else (prices, volume, ratios) under the "info" kind with a short TTL
+
+Callers ask only for the fields they need, so a request for static fields is
+served from cache long after the price fields have expired. Concurrent fetches
+of the same symbol share one upstream call.
+"""
+import logging
+import threading
+from typing import Iterable, Optional
+
+from cline_finance.constants import STATIC_INFO_FIELDS
+from cline_finance.core.executor import submit
+from cline_finance.core.market_cache import get_market_cache, STALE, MISS
+from cline_finance.core.providers import get_provider
+from cline_finance.core.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
+_flights = SingleFlight()
+
+
+def _fetch_info(symbol: str) -> dict:
+    """Fetch ticker.info (coalescing concurrent fetches of the same symbol)."""
+    return _flights.do(symbol, lambda: _load_info(symbol))
+
+
+def _load_info(symbol: str) -> dict:
+    """Fetch ticker.info and store both halves in the market cache."""
+    info = get_provider().info(symbol) or {}
+    cache = get_market_cache()
+    cache.set("info_static", symbol, {k: v for k, v in info.items() if k in STATIC_INFO_FIELDS})
+    cache.set("info", symbol, {k: v for k, v in info.items() if k not in STATIC_INFO_FIELDS})
+    return info
+
+
+def _refresh_in_background(symbol: str) -> None:
+    """Refresh a symbol's info on the fetch executor (one refresh per symbol at a time)."""
+    with _refreshing_lock:
+        if symbol in _refreshing:
+            return
+        _refreshing.add(symbol)
+    
+    def refresh() -> None:
+        try:
+            _fetch_info(symbol)
+        except Exception as e:
+            logger.warning(f"Background info refresh failed for {symbol}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(symbol)
+    
+    submit(refresh)
+
+
+def get_ticker_info(
+    symbol: str,
+    fields: Optional[Iterable[str]] = None,
+    max_age: Optional[float] = None,
+) -> dict:
+    """
+    Get ticker.info for a symbol, fetching it at most once per freshness window.
+    
+    Args:
+        symbol: Ticker symbol
+        fields: Fields to return. If None, returns the full info dict.
+                Requests that only touch STATIC_INFO_FIELDS never need price freshness.
+        max_age: Override the freshness window (seconds) for both halves
+    
+    Returns:
+        Dictionary with the requested fields (missing fields map to None when
+        fields are given).
+    
+    Raises:
+        Exception: Whatever yfinance raises if a fetch is needed and fails.
+    
+    Example:
+        >>> get_ticker_info("AAPL", fields=["longName", "sector"])
+    """
+    symbol = symbol.upper()
+    field_list = list(fields) if fields is not None else None
+    need_static = field_list is None or any(f in STATIC_INFO_FIELDS for f in field_list)
+    need_price = field_list is None or any(f not in STATIC_INFO_FIELDS for f in field_list)
+    
+    cache = get_market_cache()
+    static, static_state = cache.lookup("info_static", symbol, max_age)
+    price, price_state = cache.lookup("info", symbol, max_age)
+    
+    states = []
+    if need_static:
+        states.append(static_state)
+    if need_price:
+        states.append(price_state)
+    
+    if MISS in states or (STALE in states and not cache.stale_while_revalidate):
+        info = _fetch_info(symbol)
+    else:
+        if STALE in states:
+            _refresh_in_background(symbol)
+        info = {**(static or {}), **(price or {})}
+    
+    if field_list is None:
+        return dict(info)
+    return {f: info.get(f) for f in field_list}
+
+
+def peek_ticker_info(symbol: str, fields: Iterable[str]) -> dict:
+    """
+    Get already-cached ticker.info fields without triggering a fetch.
+    
+    Stale values are returned as-is; fields that were never fetched map to None.
+    
+    Args:
+        symbol: Ticker symbol
+        fields: Fields to return
+    
+    Example:
+        >>> peek_ticker_info("AAPL", ["shortName"])
+    """
+    cache = get_market_cache()
+    static, _ = cache.lookup("info_static", symbol.upper())
+    price, _ = cache.lookup("info", symbol.upper())
+    info = {**(static or {}), **(price or {})}
+    return {f: info.get(f) for f in fields}
+
@@ -0,0 +1,257 @@
+"""
+Valuation Engine - Incremental portfolio valuation.
+
+A position's valuation depends only on its own lots, its quote and the FX
+rate of its currency. The engine keeps the last valuation of every position
+keyed by exactly those inputs and recomputes only the positions whose key
+changed. The assembled portfolio valuation is kept as well, keyed by
+(portfolio version, resolved quotes, FX epoch), so a repeated call with nothing
+changed returns without touching any position.
+
+Within VALUATION_CACHE_TTL_SECONDS the last valuation is also shared as is
+by later tools (portfolio table, report, ...) without resolving quotes
+again. Portfolio mutations and owner switches invalidate it.
+"""
+import copy
+import logging
+import threading
+import time
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def position_key(position) -> tuple:
+    """Inputs of a position's valuation that come from the portfolio itself."""
+    return (
+        position.symbol.upper(),
+        position.shares,
+        position.cost_basis,
+        position.currency,
+        position.sector,
+        position.asset_type,
+        position.company_name,
+    )
+
+
+def lot_key(position) -> tuple:
+    """Inputs of a position's trade-date cost basis: its lots' costs, dates and currencies."""
+    lots = position.lot_array
+    return position_key(position) + (
+        lots.cost.tobytes(),
+        lots.dates.tobytes(),
+        lots.currency_codes.tobytes(),
+    )
+
+
+class ValuationEngine:
+    """Memoizes per-position valuations and the last assembled valuation."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._positions: dict[str, tuple[Hashable, Any]] = {}
+        self._cost_basis: dict[tuple[str, str], tuple[Hashable, float]] = {}
+        self._result_key: Optional[Hashable] = None
+        self._result: Optional[dict] = None
+        self._result_context: Optional[Hashable] = None
+        self._result_at = 0.0
+        self.last_recomputed = 0  # Positions recomputed by the last call to value_positions
+    
+    def cached_result(self, key: Hashable) -> Optional[dict]:
+        """
+        Get the last valuation if it was stored under key.
+        
+        Returns:
+            A copy of the valuation, or None if the inputs changed since.
+        """
+        with self._lock:
+            if self._result is None or self._result_key != key:
+                return None
+            return copy.deepcopy(self._result)
+    
+    def recent_result(self, context: Hashable, ttl: float) -> Optional[dict]:
+        """
+        Get the last valuation if it is younger than ttl, whatever the quotes did since.
+        
+        Args:
+            context: Portfolio-side inputs (portfolio version, base currency, ...)
+                     that must match those the valuation was stored with
+            ttl: Maximum age in seconds
+        
+        Returns:
+            A copy of the valuation, or None if it is too old or invalidated.
+        """
+        with self._lock:
+            if self._result is None or self._result_context != context:
+                return None
+            if time.monotonic() - self._result_at >= ttl:
+                return None
+            return copy.deepcopy(self._result)
+    
+    def store_result(self, key: Hashable, result: dict, context: Hashable = None) -> None:
+        """
+        Keep an assembled valuation for cached_result and recent_result.
+        
+        Args:
+            key: All inputs of the valuation
+            result: The valuation
+            context: Portfolio-side inputs (see recent_result)
+        """
+        with self._lock:
+            self._result_key = key
+            self._result = copy.deepcopy(result)
+            self._result_context = context
+            self._result_at = time.monotonic()
+    
+    def invalidate_result(self) -> None:
+        """Forget the assembled valuation (per-position values stay, they are keyed by their inputs)."""
+        with self._lock:
+            self._result_key = None
+            self._result = None
+            self._result_context = None
+    
+    def value_positions(
+        self,
+        positions: Iterable,
+        key_fn: Callable[[Any], Hashable],
+        value_fn: Callable[[Any], Any],
+    ) -> list:
+        """
+        Value positions, reusing the previous value of every unchanged one.
+        
+        Args:
+            positions: Positions to value
+            key_fn: All inputs of a position's value (lots, quote, FX rate)
+            value_fn: Computes a position's value
+        
+        Returns:
+            One value per position, in order. Values of positions that are
+            no longer passed in are forgotten.
+        """
+        values = []
+        fresh = {}
+        recomputed = 0
+        with self._lock:
+            previous = self._positions
+        
+        for position in positions:
+            symbol = position.symbol.upper()
+            key = key_fn(position)
+            cached = previous.get(symbol)
+            if cached is not None and cached[0] == key:
+                value = cached[1]
+            else:
+                value = value_fn(position)
+                recomputed += 1
+            fresh[symbol] = (key, value)
+            values.append(value)
+        
+        with self._lock:
+            self._positions = fresh
+            self.last_recomputed = recomputed
+        if recomputed:
+            logger.debug(f"Revalued {recomputed}/{len(values)} positions")
+        return values
+    
+    def cost_basis(
+        self,
+        positions: list,
+        base_currency: str,
+        compute_fn: Callable[[list], tuple[dict[str, float], set[str]]],
+        epoch: Callable[[], Hashable] = lambda: None,
+    ) -> tuple[dict[str, float], set[str]]:
+        """
+        Get the base-currency cost basis per symbol, converting only changed positions.
+        
+        Args:
+            positions: Positions in the portfolio
+            base_currency: Currency of the result
+            compute_fn: Computes ({symbol: cost basis}, symbols whose value is
+                        approximate) for a list of positions; approximate
+                        values are returned but not kept
+            epoch: Version of the rates compute_fn uses (e.g. fx_history_epoch);
+                   values kept under another version are recomputed
+        
+        Returns:
+            Tuple of ({upper-cased symbol: cost basis in base_currency},
+            symbols whose cost basis is approximate).
+        """
+        with self._lock:
+            cached = dict(self._cost_basis)
+        estimated = set()
+        
+        version = epoch()
+        keys = {p.symbol.upper(): (lot_key(p), version) for p in positions}
+        stale = [
+            p for p in positions
+            if cached.get((p.symbol.upper(), base_currency), (None,))[0] != keys[p.symbol.upper()]
+        ]
+        if stale:
+            computed, approximate = compute_fn(stale)
+            version = epoch()  # Computing may have loaded newer rates
+            with self._lock:
+                for position in stale:
+                    symbol = position.symbol.upper()
+                    if symbol not in computed:
+                        continue
+                    entry = ((lot_key(position), version), computed[symbol])
+                    cached[(symbol, base_currency)] = entry
+                    if symbol in approximate:
+                        estimated.add(symbol)
+                    else:
+                        self._cost_basis[(symbol, base_currency)] = entry
+        
+        result = {}
+        for position in positions:
+            entry = cached.get((position.symbol.upper(), base_currency))
+            if entry is not None:
+                result[position.symbol.upper()] = entry[1]
+        return result, estimated
+    
+    def invalidate(self) -> None:
+        """Forget all cached valuations."""
+        with self._lock:
+            self._positions = {}
+            self._cost_basis = {}
+            self._result_key = None
+            self._result = None
+            self._result_context = None
+
+
+# Engines per portfolio (owners have separate portfolios)
+_engines: dict[str, ValuationEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_valuation_engine(portfolio_key: str) -> ValuationEngine:
+    """
+    Get the valuation engine of a portfolio.
+    
+    Args:
+        portfolio_key: Identifies the portfolio (e.g. its file path)
+    """
+    with _engines_lock:
+        engine = _engines.get(portfolio_key)
+        if engine is None:
+            engine = _engines[portfolio_key] = ValuationEngine()
+        return engine
+
+
+def invalidate_valuations(portfolio_key: Optional[str] = None) -> None:
+    """
+    Drop the cached valuation of a portfolio, or of every portfolio.
+    
+    Args:
+        portfolio_key: Portfolio whose valuation changed (None for all)
+    """
+    with _engines_lock:
+        engines = [_engines.get(portfolio_key)] if portfolio_key else list(_engines.values())
+    for engine in engines:
+        if engine is not None:
+            engine.invalidate_result()
+
+
+def reset_valuation_engines() -> None:
+    """Reset all valuation engines (for testing)."""
+    with _engines_lock:
+        _engines.clear()
@@ -0,0 +1,132 @@
+"""
+Valuation Kernel - Vectorized portfolio arithmetic over aligned arrays.
+
+Positions are laid out as parallel arrays (shares, price, cost, FX rate,
+...) and every figure of a valuation is computed by whole-array operations:
+market values, gains, weights, the concentration maximum and each group-by
+allocation (sector, asset type, currency) via np.bincount. Callers turn the
+arrays into dictionaries only at the edge, so revaluing a book is cheap
+enough to repeat for household views or what-if scenarios.
+"""
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class BookValuation:
+    """Per-position arrays and totals of one valuation."""
+    
+    value: np.ndarray            # Market value in the position's currency
+    value_base: np.ndarray       # Market value in base currency
+    cost_base: np.ndarray        # Cost basis in base currency
+    gain_loss: np.ndarray        # Gain/loss in the position's currency
+    gain_loss_base: np.ndarray   # Gain/loss in base currency
+    gain_loss_pct: np.ndarray    # Gain/loss in percent of cost (0 without cost)
+    weights: np.ndarray          # Percent of total base value
+    total_value_base: float
+    total_cost_base: float
+    max_weight: float
+    allocations: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+def group_sum(labels: Sequence[str], values: np.ndarray, mask: Optional[np.ndarray] = None) -> dict[str, float]:
+    """
+    Sum values per label in one pass.
+    
+    Args:
+        labels: Group label of each element
+        values: Values to sum
+        mask: Only include elements where mask is True
+    
+    Returns:
+        Dictionary of label -> sum, in first-seen label order.
+    
+    Example:
+        >>> group_sum(["Tech", "Energy", "Tech"], np.array([1.0, 2.0, 3.0]))
+        {'Tech': 4.0, 'Energy': 2.0}
+    """
+    labels = np.asarray(labels, dtype=object)
+    if mask is not None:
+        labels = labels[mask]
+        values = values[mask]
+    if not len(labels):
+        return {}
+    
+    unique, first, inverse = np.unique(labels.astype(str), return_index=True, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=len(unique))
+    order = np.argsort(first)
+    return {str(unique[i]): float(sums[i]) for i in order}
+
+
+def value_book(
+    shares: np.ndarray,
+    price: np.ndarray,
+    cost: np.ndarray,
+    fx_rate: np.ndarray,
+    cost_base: Optional[np.ndarray] = None,
+    groups: Optional[dict[str, Sequence[str]]] = None,
+    group_masks: Optional[dict[str, np.ndarray]] = None,
+) -> BookValuation:
+    """
+    Value a book of positions.
+    
+    Positions without a price (NaN) are carried at their cost basis, taken
+    as already being in base currency.
+    
+    Args:
+        shares: Shares held per position
+        price: Current price per share in the position's currency (NaN if unknown)
+        cost: Cost basis in the position's currency
+        fx_rate: Rate from the position's currency to base currency
+        cost_base: Cost basis in base currency (default: cost * fx_rate)
+        groups: Grouping name -> label per position (e.g. {"sector": [...]})
+        group_masks: Grouping name -> positions to include in that grouping
+    
+    Returns:
+        BookValuation with per-position arrays, totals and allocations.
+    
+    Example:
+        >>> book = value_book(np.array([10.0]), np.array([190.0]), np.array([1500.0]), np.array([0.92]))
+        >>> book.total_value_base
+    """
+    shares = np.asarray(shares, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    cost = np.asarray(cost, dtype=np.float64)
+    fx_rate = np.asarray(fx_rate, dtype=np.float64)
+    priced = ~np.isnan(price)
+    
+    value = np.where(priced, shares * np.where(priced, price, 0.0), cost)
+    value_base = np.where(priced, value * fx_rate, cost)
+    if cost_base is None:
+        cost_base = cost * fx_rate
+    cost_base = np.where(priced, np.asarray(cost_base, dtype=np.float64), cost)
+    
+    gain_loss = np.where(priced, value - cost, 0.0)
+    gain_loss_base = np.where(priced, value_base - cost_base, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gain_loss_pct = np.where(cost > 0, gain_loss / cost * 100, 0.0)
+    
+    total_value = float(value_base.sum())
+    weights = value_base / total_value * 100 if total_value > 0 else np.zeros_like(value_base)
+    
+    group_masks = group_masks or {}
+    allocations = {
+        name: group_sum(labels, value_base, group_masks.get(name))
+        for name, labels in (groups or {}).items()
+    }
+    
+    return BookValuation(
+        value=value,
+        value_base=value_base,
+        cost_base=cost_base,
+        gain_loss=gain_loss,
+        gain_loss_base=gain_loss_base,
+        gain_loss_pct=gain_loss_pct,
+        weights=weights,
+        total_value_base=total_value,
+        total_cost_base=float(cost_base.sum()),
+        max_weight=float(weights.max()) if len(weights) else 0.0,
+        allocations=allocations,
+    )
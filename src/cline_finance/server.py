@@ -4,6 +4,7 @@ ClineFinance MCP Server - Main entry point.
 A FastMCP server that transforms Cline into a personal financial advisor.
 """
 import logging
+from typing import Optional
 
 from fastmcp import FastMCP
 
@@ -23,13 +24,17 @@ from cline_finance.tools.settings import (
 from cline_finance.tools.fx import get_fx_rate, convert_currency, get_major_fx_rates
 from cline_finance.tools.portfolio import (
     get_portfolio_valuation,
+    get_portfolio_symbols,
     add_position,
     update_position,
-    remove_position,
+    sell_position,
     get_portfolio_table,
     get_portfolio_history,
+    get_trade_history,
+    get_pnl_report,
     generate_portfolio_report,
 )
+from cline_finance.tools.importer import import_trades as import_trades_impl
 from cline_finance.tools.market import (
     get_market_overview,
     get_market_movers,
@@ -222,7 +227,7 @@ def convert_amount(amount: float, from_currency: str, to_currency: str) -> dict:
 # =============================================================================
 
 @mcp.tool()
-def get_quote(symbol: str) -> dict:
+def get_quote(symbol: str, mode: str = "full") -> dict:
     """
     Get real-time stock/ETF quote with price, change, and company info.
     
@@ -235,15 +240,23 @@ def get_quote(symbol: str) -> dict:
     
     Args:
         symbol: Stock ticker with optional exchange suffix
+        mode: "full" (default) for fundamentals and company info, or "price"
+              for a faster price/change/currency-only quote
     
     Returns:
         Quote data including price, change percent, volume, P/E ratio
     """
-    return get_stock_quote(symbol)
+    return get_stock_quote(symbol, mode=mode)
 
 
 @mcp.tool()
-def get_price_history(symbol: str, period: str = "1mo", interval: str = "1d") -> dict:
+def get_price_history(
+    symbol: str,
+    period: str = "1mo",
+    interval: str = "1d",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> dict:
     """
     Get historical price data for charting and analysis.
     
@@ -251,11 +264,13 @@ def get_price_history(symbol: str, period: str = "1mo", interval: str = "1d") ->
         symbol: Stock ticker symbol
         period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, ytd, max)
         interval: Data interval (1d, 1wk, 1mo)
+        start_date: Optional start date (YYYY-MM-DD), overrides period
+        end_date: Optional end date (YYYY-MM-DD)
     
     Returns:
         Historical prices, volumes, and summary statistics
     """
-    return get_historical_data(symbol, period, interval)
+    return get_historical_data(symbol, period, interval, start=start_date, end=end_date)
 
 
 # =============================================================================
@@ -263,17 +278,22 @@ def get_price_history(symbol: str, period: str = "1mo", interval: str = "1d") ->
 # =============================================================================
 
 @mcp.tool()
-def portfolio_valuation() -> dict:
+def portfolio_valuation(fresh: bool = False) -> dict:
     """
     Get complete portfolio valuation with real-time prices.
     
     Calculates current value, gain/loss, and allocation for all positions.
     Values are shown in original currency AND converted to base currency.
+    A valuation from the last minute is reused (portfolio_table and
+    generate_report share it); trades and owner switches invalidate it.
+    
+    Args:
+        fresh: Refetch live quotes (use at the start of a workflow)
     
     Returns:
         Portfolio summary with positions, total value, P&L, sector/currency allocation
     """
-    return get_portfolio_valuation()
+    return get_portfolio_valuation(fresh=fresh)
 
 
 @mcp.tool()
@@ -323,18 +343,33 @@ def buy_stock(
 
 
 @mcp.tool()
-def sell_stock(symbol: str, reason: str = None) -> dict:
+def sell_stock(
+    symbol: str,
+    shares: Optional[float] = None,
+    price: Optional[float] = None,
+    method: str = "fifo",
+    lot_indices: Optional[list[int]] = None,
+    reason: str = None,
+) -> dict:
     """
-    Remove a position from portfolio (sell all shares).
+    Sell all or part of a position and record the realized gain or loss.
     
     Args:
-        symbol: Stock ticker to remove
+        symbol: Stock ticker to sell
+        shares: Number of shares to sell (omit to sell the whole position)
+        price: Sale price per share (omit to use the current market price)
+        method: Which lots to sell: "fifo" (oldest first), "lifo" (newest
+                first), "hifo" (highest cost first) or "specific"
+        lot_indices: Lot numbers for method="specific" (see pnl_report(symbol))
         reason: Optional reason for selling
     
     Returns:
-        Removal confirmation with position details
+        Sale details with matched lots and realized P&L
+    
+    Example:
+        sell_stock("AAPL", shares=5, price=190.0, method="hifo")
     """
-    return remove_position(symbol, reason)
+    return sell_position(symbol, shares, price, method, lot_indices, reason)
 
 
 @mcp.tool()
@@ -360,17 +395,89 @@ def modify_position(
 
 
 @mcp.tool()
-def portfolio_history(days: int = 30) -> dict:
+def portfolio_history(days: int = 30, currency: Optional[str] = None) -> dict:
     """
     Get portfolio value history for performance tracking.
     
     Args:
         days: Number of days of history
+        currency: Optional currency to re-denominate values into (at each
+                  snapshot date's FX rate). Defaults to base currency.
     
     Returns:
         Historical values and performance metrics
     """
-    return get_portfolio_history(days)
+    return get_portfolio_history(days, currency)
+
+
+@mcp.tool()
+def trade_history(symbol: Optional[str] = None, limit: int = 50) -> dict:
+    """
+    Get the recorded trade history of the portfolio (newest first).
+    
+    Every buy, correction, sale and cash update is kept in an append-only
+    ledger, so this covers positions that have since been sold.
+    
+    Args:
+        symbol: Optional ticker to filter by
+        limit: Maximum number of events to return
+    
+    Returns:
+        Ledger events with timestamps, operation and details
+    """
+    return get_trade_history(symbol, limit)
+
+
+@mcp.tool()
+def pnl_report(symbol: Optional[str] = None) -> dict:
+    """
+    Get realized and unrealized profit and loss per symbol.
+    
+    Realized P&L comes from recorded sales matched against their purchase
+    lots; unrealized P&L values the open lots at current prices.
+    
+    Args:
+        symbol: Optional ticker; also lists its open lots with lot numbers
+                for specific-lot sales
+    
+    Returns:
+        Per-symbol and total realized/unrealized P&L in base currency
+    """
+    return get_pnl_report(symbol)
+
+
+@mcp.tool()
+def import_trades(
+    file_path: str,
+    dayfirst: bool = False,
+    default_currency: Optional[str] = None,
+    asset_type: str = "stock",
+    method: str = "fifo",
+    dry_run: bool = False,
+) -> dict:
+    """
+    Import historical trades from a broker CSV or XLSX export.
+    
+    Use this instead of many buy_stock calls when the user has a transaction
+    export. Columns (symbol/ticker, date, quantity, price, currency,
+    side/action) are detected automatically; all buys and sells are applied
+    at once, in date order, with realized P&L recorded for sells.
+    
+    Args:
+        file_path: Path to the export file
+        dayfirst: True if dates are written day first (e.g. 31/01/2024)
+        default_currency: Currency for new positions in rows without a currency column
+        asset_type: 'stock' or 'etf' for newly created positions
+        method: Lot matching for sells: "fifo", "lifo" or "hifo"
+        dry_run: Only parse and report what would be imported
+    
+    Returns:
+        Import summary with counts, per-symbol totals and skipped rows
+    
+    Example:
+        import_trades("~/Downloads/transactions.csv", dayfirst=True, dry_run=True)
+    """
+    return import_trades_impl(file_path, dayfirst, default_currency, asset_type, method, dry_run)
 
 
 @mcp.tool()
@@ -465,9 +572,7 @@ def news_for_portfolio(limit: int = 10) -> dict:
     Returns:
         Portfolio-relevant news sorted by relevance
     """
-    # Get portfolio symbols
-    valuation = get_portfolio_valuation()
-    symbols = [p["symbol"] for p in valuation.get("positions", [])]
+    symbols = get_portfolio_symbols()
     
     if not symbols:
         return {"error": "No positions in portfolio", "articles": []}
@@ -541,6 +646,7 @@ def recall_insights(
     symbol: str = None,
     tags: list = None,
     limit: int = 10,
+    query: str = None,
 ) -> dict:
     """
     Retrieve stored insights from memory.
@@ -550,11 +656,12 @@ def recall_insights(
         symbol: Filter by stock symbol
         tags: Filter by tags
         limit: Maximum insights to return
+        query: Free-text question or keywords; returns the most relevant insights first
     
     Returns:
-        Matching insights sorted by date
+        Matching insights sorted by date (or by relevance score with query)
     """
-    return get_insights(category, symbol, tags, limit)
+    return get_insights(category, symbol, tags, limit, query)
 
 
 @mcp.tool()
@@ -609,7 +716,7 @@ def decision_outcome(decision_id: str, outcome: str, close: bool = False) -> dic
 
 
 @mcp.tool()
-def decision_history(symbol: str = None, action: str = None, limit: int = 20) -> dict:
+def decision_history(symbol: str = None, action: str = None, limit: int = 20, query: str = None) -> dict:
     """
     Get tracked investment decisions.
     
@@ -617,11 +724,12 @@ def decision_history(symbol: str = None, action: str = None, limit: int = 20) ->
         symbol: Filter by stock symbol
         action: Filter by action type
         limit: Maximum to return
+        query: Free text searched in rationales and outcomes (most relevant first)
     
     Returns:
         Matching decisions
     """
-    return get_decisions(symbol, action, limit=limit)
+    return get_decisions(symbol, action, limit=limit, query=query)
 
 
 # =============================================================================
@@ -742,7 +850,8 @@ def main():
         "get_quote", "get_price_history",
         # Portfolio
         "portfolio_valuation", "portfolio_table", "buy_stock", "sell_stock",
-        "modify_position", "portfolio_history", "generate_report",
+        "modify_position", "portfolio_history", "trade_history", "pnl_report",
+        "import_trades", "generate_report",
         # Market
         "market_overview", "market_movers", "sector_performance",
         # News
@@ -5,9 +5,13 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-import yfinance as yf
 import pandas as pd
 
+from cline_finance.core.executor import fan_out
+from cline_finance.core.market_cache import get_market_cache
+from cline_finance.core.providers import get_provider
+from cline_finance.core.ticker_info import get_ticker_info
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,103 +38,10 @@ def get_analyst_ratings(symbol: str) -> dict:
     symbol = symbol.upper()
     
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        
-        # Get recommendations history
-        recommendations = ticker.recommendations
-        upgrades_downgrades = ticker.upgrades_downgrades
-        
-        # Build result
-        result = {
-            "symbol": symbol,
-            "company_name": info.get("longName") or info.get("shortName") or symbol,
-            "current_price": info.get("regularMarketPrice"),
-            "currency": info.get("currency", "USD"),
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-        }
-        
-        # Price targets
-        target_mean = info.get("targetMeanPrice")
-        target_high = info.get("targetHighPrice")
-        target_low = info.get("targetLowPrice")
-        current_price = result["current_price"]
-        
-        if target_mean and current_price:
-            upside = ((target_mean - current_price) / current_price * 100)
-        else:
-            upside = None
-        
-        result["price_targets"] = {
-            "mean": target_mean,
-            "high": target_high,
-            "low": target_low,
-            "upside_percent": round(upside, 2) if upside else None,
-        }
-        
-        # Consensus recommendation
-        recommendation_key = info.get("recommendationKey")
-        recommendation_map = {
-            "strongBuy": "STRONG BUY",
-            "buy": "BUY",
-            "hold": "HOLD",
-            "sell": "SELL",
-            "strongSell": "STRONG SELL",
-        }
-        
-        result["recommendation"] = {
-            "consensus": recommendation_map.get(recommendation_key, recommendation_key),
-            "number_of_analysts": info.get("numberOfAnalystOpinions"),
-        }
-        
-        # Add sentiment interpretation
-        if recommendation_key in ["strongBuy", "buy"]:
-            result["recommendation"]["sentiment"] = "BULLISH"
-        elif recommendation_key == "hold":
-            result["recommendation"]["sentiment"] = "NEUTRAL"
-        elif recommendation_key in ["sell", "strongSell"]:
-            result["recommendation"]["sentiment"] = "BEARISH"
-        else:
-            result["recommendation"]["sentiment"] = "UNKNOWN"
-        
-        # Recent recommendations
-        recent_recs = []
-        if recommendations is not None and not recommendations.empty:
-            for idx, rec in recommendations.tail(5).iterrows():
-                rec_dict = {
-                    "firm": rec.get("Firm", "Unknown"),
-                    "to_grade": rec.get("To Grade", ""),
-                    "from_grade": rec.get("From Grade", ""),
-                    "action": rec.get("Action", ""),
-                }
-                # Handle date - could be in index or column
-                if isinstance(idx, pd.Timestamp):
-                    rec_dict["date"] = idx.strftime("%Y-%m-%d")
-                recent_recs.append(rec_dict)
-        
-        result["recent_recommendations"] = recent_recs[::-1]  # Newest first
-        
-        # Recent upgrades/downgrades
-        recent_changes = []
-        if upgrades_downgrades is not None and not upgrades_downgrades.empty:
-            for idx, change in upgrades_downgrades.tail(5).iterrows():
-                change_dict = {
-                    "firm": change.get("Firm", "Unknown"),
-                    "to_grade": change.get("ToGrade", ""),
-                    "from_grade": change.get("FromGrade", ""),
-                    "action": change.get("Action", ""),
-                }
-                if isinstance(idx, pd.Timestamp):
-                    change_dict["date"] = idx.strftime("%Y-%m-%d")
-                recent_changes.append(change_dict)
-        
-        result["recent_changes"] = recent_changes[::-1]  # Newest first
-        
-        # Summary assessment
-        result["summary"] = _generate_summary(result)
-        
-        logger.info(f"Fetched analyst data for {symbol}")
-        return result
+        result = get_market_cache().get_or_fetch(
+            "analyst", symbol, lambda: _fetch_analyst_ratings(symbol)
+        )
+        return dict(result)
         
     except Exception as e:
         logger.error(f"Error fetching analyst data for {symbol}: {e}")
@@ -141,6 +52,112 @@ def get_analyst_ratings(symbol: str) -> dict:
         }
 
 
+def _fetch_analyst_ratings(symbol: str) -> dict:
+    """Fetch analyst data from the market data provider (uncached, raises on failure)."""
+    provider = get_provider()
+    info = get_ticker_info(symbol, fields=[
+        "longName", "shortName", "regularMarketPrice", "currency",
+        "targetMeanPrice", "targetHighPrice", "targetLowPrice",
+        "recommendationKey", "numberOfAnalystOpinions",
+    ])
+    
+    # Get recommendations history
+    recommendations = provider.recommendations(symbol)
+    upgrades_downgrades = provider.upgrades_downgrades(symbol)
+    
+    # Build result
+    result = {
+        "symbol": symbol,
+        "company_name": info.get("longName") or info.get("shortName") or symbol,
+        "current_price": info.get("regularMarketPrice"),
+        "currency": info.get("currency", "USD"),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+    
+    # Price targets
+    target_mean = info.get("targetMeanPrice")
+    target_high = info.get("targetHighPrice")
+    target_low = info.get("targetLowPrice")
+    current_price = result["current_price"]
+    
+    if target_mean and current_price:
+        upside = ((target_mean - current_price) / current_price * 100)
+    else:
+        upside = None
+    
+    result["price_targets"] = {
+        "mean": target_mean,
+        "high": target_high,
+        "low": target_low,
+        "upside_percent": round(upside, 2) if upside else None,
+    }
+    
+    # Consensus recommendation
+    recommendation_key = info.get("recommendationKey")
+    recommendation_map = {
+        "strongBuy": "STRONG BUY",
+        "buy": "BUY",
+        "hold": "HOLD",
+        "sell": "SELL",
+        "strongSell": "STRONG SELL",
+    }
+    
+    result["recommendation"] = {
+        "consensus": recommendation_map.get(recommendation_key, recommendation_key),
+        "number_of_analysts": info.get("numberOfAnalystOpinions"),
+    }
+    
+    # Add sentiment interpretation
+    if recommendation_key in ["strongBuy", "buy"]:
+        result["recommendation"]["sentiment"] = "BULLISH"
+    elif recommendation_key == "hold":
+        result["recommendation"]["sentiment"] = "NEUTRAL"
+    elif recommendation_key in ["sell", "strongSell"]:
+        result["recommendation"]["sentiment"] = "BEARISH"
+    else:
+        result["recommendation"]["sentiment"] = "UNKNOWN"
+    
+    # Recent recommendations
+    recent_recs = []
+    if recommendations is not None and not recommendations.empty:
+        for idx, rec in recommendations.tail(5).iterrows():
+            rec_dict = {
+                "firm": rec.get("Firm", "Unknown"),
+                "to_grade": rec.get("To Grade", ""),
+                "from_grade": rec.get("From Grade", ""),
+                "action": rec.get("Action", ""),
+            }
+            # Handle date - could be in index or column
+            if isinstance(idx, pd.Timestamp):
+                rec_dict["date"] = idx.strftime("%Y-%m-%d")
+            recent_recs.append(rec_dict)
+    
+    result["recent_recommendations"] = recent_recs[::-1]  # Newest first
+    
+    # Recent upgrades/downgrades
+    recent_changes = []
+    if upgrades_downgrades is not None and not upgrades_downgrades.empty:
+        for idx, change in upgrades_downgrades.tail(5).iterrows():
+            change_dict = {
+                "firm": change.get("Firm", "Unknown"),
+                "to_grade": change.get("ToGrade", ""),
+                "from_grade": change.get("FromGrade", ""),
+                "action": change.get("Action", ""),
+            }
+            if isinstance(idx, pd.Timestamp):
+                change_dict["date"] = idx.strftime("%Y-%m-%d")
+            recent_changes.append(change_dict)
+    
+    result["recent_changes"] = recent_changes[::-1]  # Newest first
+    
+    # Summary assessment
+    result["summary"] = _generate_summary(result)
+    
+    logger.info(f"Fetched analyst data for {symbol}")
+    return result
+
+
+
 def _generate_summary(data: dict) -> str:
     """Generate a text summary of analyst data."""
     parts = []
@@ -191,8 +208,17 @@ def get_multiple_analyst_ratings(symbols: list[str]) -> dict:
     """
     results = {}
     
-    for symbol in symbols:
-        results[symbol.upper()] = get_analyst_ratings(symbol)
+    # get_analyst_ratings reports failures as error dicts, so every result has a value
+    for result in fan_out(get_analyst_ratings, symbols):
+        symbol = result.item.upper()
+        if result.ok:
+            results[symbol] = result.value
+        else:
+            results[symbol] = {
+                "symbol": symbol,
+                "error": str(result.error),
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+            }
     
     # Sort by upside potential
     ranked = sorted(
@@ -222,44 +248,10 @@ def get_earnings_calendar(symbol: str) -> dict:
     symbol = symbol.upper()
     
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        calendar = ticker.calendar
-        
-        result = {
-            "symbol": symbol,
-            "company_name": info.get("longName", symbol),
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-        }
-        
-        # Calendar data
-        if calendar is not None and not calendar.empty:
-            if isinstance(calendar, pd.DataFrame):
-                cal_dict = calendar.to_dict()
-                result["earnings"] = {
-                    "earnings_date": str(cal_dict.get("Earnings Date", [None])[0]) if cal_dict.get("Earnings Date") else None,
-                    "earnings_high": cal_dict.get("Earnings High", [None])[0] if cal_dict.get("Earnings High") else None,
-                    "earnings_low": cal_dict.get("Earnings Low", [None])[0] if cal_dict.get("Earnings Low") else None,
-                    "earnings_average": cal_dict.get("Earnings Average", [None])[0] if cal_dict.get("Earnings Average") else None,
-                    "revenue_average": cal_dict.get("Revenue Average", [None])[0] if cal_dict.get("Revenue Average") else None,
-                }
-        else:
-            result["earnings"] = {"note": "No upcoming earnings data available"}
-        
-        # Historical earnings
-        earnings_history = ticker.earnings_history
-        if earnings_history is not None and not earnings_history.empty:
-            history = []
-            for idx, row in earnings_history.tail(4).iterrows():
-                history.append({
-                    "date": str(idx) if not pd.isna(idx) else None,
-                    "eps_estimate": row.get("epsEstimate"),
-                    "eps_actual": row.get("epsActual"),
-                    "surprise_percent": row.get("surprisePercent"),
-                })
-            result["earnings_history"] = history[::-1]
-        
-        return result
+        result = get_market_cache().get_or_fetch(
+            "calendar", symbol, lambda: _fetch_earnings_calendar(symbol)
+        )
+        return dict(result)
         
     except Exception as e:
         logger.error(f"Error fetching earnings for {symbol}: {e}")
@@ -267,3 +259,45 @@ def get_earnings_calendar(symbol: str) -> dict:
             "symbol": symbol,
             "error": str(e),
         }
+
+
+def _fetch_earnings_calendar(symbol: str) -> dict:
+    """Fetch earnings calendar data from the market data provider (uncached, raises on failure)."""
+    provider = get_provider()
+    info = get_ticker_info(symbol, fields=["longName"])
+    calendar = provider.calendar(symbol)
+    
+    result = {
+        "symbol": symbol,
+        "company_name": info.get("longName") or symbol,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+    
+    # Calendar data
+    if calendar is not None and not calendar.empty:
+        if isinstance(calendar, pd.DataFrame):
+            cal_dict = calendar.to_dict()
+            result["earnings"] = {
+                "earnings_date": str(cal_dict.get("Earnings Date", [None])[0]) if cal_dict.get("Earnings Date") else None,
+                "earnings_high": cal_dict.get("Earnings High", [None])[0] if cal_dict.get("Earnings High") else None,
+                "earnings_low": cal_dict.get("Earnings Low", [None])[0] if cal_dict.get("Earnings Low") else None,
+                "earnings_average": cal_dict.get("Earnings Average", [None])[0] if cal_dict.get("Earnings Average") else None,
+                "revenue_average": cal_dict.get("Revenue Average", [None])[0] if cal_dict.get("Revenue Average") else None,
+            }
+    else:
+        result["earnings"] = {"note": "No upcoming earnings data available"}
+    
+    # Historical earnings
+    earnings_history = provider.earnings_history(symbol)
+    if earnings_history is not None and not earnings_history.empty:
+        history = []
+        for idx, row in earnings_history.tail(4).iterrows():
+            history.append({
+                "date": str(idx) if not pd.isna(idx) else None,
+                "eps_estimate": row.get("epsEstimate"),
+                "eps_actual": row.get("epsActual"),
+                "surprise_percent": row.get("surprisePercent"),
+            })
+        result["earnings_history"] = history[::-1]
+    
+    return result
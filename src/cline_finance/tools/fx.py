@@ -5,13 +5,16 @@ import logging
 from typing import Optional
 from datetime import datetime
 
-import yfinance as yf
+from cline_finance.core.fx_matrix import get_fx_matrix
+from cline_finance.core.market_cache import get_market_cache
+from cline_finance.core.providers import get_provider
+from cline_finance.core.single_flight import SingleFlight
+from cline_finance.core.ticker_info import get_ticker_info
 
 logger = logging.getLogger(__name__)
 
-# Cache for FX rates (simple in-memory cache)
-_fx_cache: dict[str, tuple[float, datetime]] = {}
-_CACHE_TTL_SECONDS = 300  # 5 minutes
+# Coalesces concurrent fetches of the same currency pair
+_fx_flights = SingleFlight()
 
 
 def _get_fx_pair_symbol(from_currency: str, to_currency: str) -> str:
@@ -21,25 +24,21 @@ def _get_fx_pair_symbol(from_currency: str, to_currency: str) -> str:
 
 def _get_cached_rate(cache_key: str) -> Optional[float]:
     """Get a cached rate if still valid."""
-    if cache_key in _fx_cache:
-        rate, timestamp = _fx_cache[cache_key]
-        age = (datetime.utcnow() - timestamp).total_seconds()
-        if age < _CACHE_TTL_SECONDS:
-            return rate
-    return None
+    return get_market_cache().get("fx", cache_key)
 
 
 def _cache_rate(cache_key: str, rate: float) -> None:
-    """Cache a rate."""
-    _fx_cache[cache_key] = (rate, datetime.utcnow())
+    """Cache a rate (TTL from MARKET_CACHE_TTLS["fx"])."""
+    get_market_cache().set("fx", cache_key, rate)
 
 
 def get_fx_rate(from_currency: str, to_currency: str) -> dict:
     """
     Get the current exchange rate between two currencies.
     
-    Uses Yahoo Finance for live FX rates. Rates are cached for 5 minutes
-    to avoid excessive API calls.
+    Uses Yahoo Finance for live FX rates. Rates are kept in the shared market
+    cache for 5 minutes to avoid excessive API calls, and concurrent requests
+    for the same pair share one fetch.
     
     Args:
         from_currency: Source currency code (e.g., "USD")
@@ -85,22 +84,26 @@ def get_fx_rate(from_currency: str, to_currency: str) -> dict:
             "cached": True,
         }
     
-    # Fetch from yfinance
+    return _fx_flights.do(cache_key, lambda: _fetch_fx_rate(from_currency, to_currency, cache_key))
+
+
+def _fetch_fx_rate(from_currency: str, to_currency: str, cache_key: str) -> dict:
+    """Fetch a rate from the market data provider (uncached) and cache it."""
     try:
         symbol = _get_fx_pair_symbol(from_currency, to_currency)
-        ticker = yf.Ticker(symbol)
+        provider = get_provider()
         
         # Try to get current price
-        info = ticker.info
+        info = get_ticker_info(symbol, fields=["regularMarketPrice", "previousClose"])
         rate = info.get("regularMarketPrice") or info.get("previousClose")
         
         if rate is None:
             # Fallback: try fast_info
-            rate = ticker.fast_info.get("lastPrice")
+            rate = provider.fast_info(symbol).get("lastPrice")
         
         if rate is None:
             # Another fallback: try history
-            hist = ticker.history(period="1d")
+            hist = provider.history(symbol, period="1d")
             if not hist.empty:
                 rate = hist["Close"].iloc[-1]
         
@@ -126,8 +129,7 @@ def get_fx_rate(from_currency: str, to_currency: str) -> dict:
         # Try inverse pair
         try:
             inverse_symbol = _get_fx_pair_symbol(to_currency, from_currency)
-            ticker = yf.Ticker(inverse_symbol)
-            hist = ticker.history(period="1d")
+            hist = get_provider().history(inverse_symbol, period="1d")
             
             if not hist.empty:
                 inverse_rate = hist["Close"].iloc[-1]
@@ -209,6 +211,9 @@ def get_major_fx_rates(base_currency: str = "USD") -> dict:
     """
     Get exchange rates for major currencies against a base currency.
     
+    All currencies are fetched in one batch against the FX pivot and the
+    rates against the base are triangulated from it.
+    
     Args:
         base_currency: The base currency to get rates for (default: USD)
     
@@ -228,15 +233,12 @@ def get_major_fx_rates(base_currency: str = "USD") -> dict:
     # Remove base from list
     currencies_to_fetch = [c for c in major_currencies if c != base]
     
-    rates = {}
-    errors = []
-    
-    for currency in currencies_to_fetch:
-        result = get_fx_rate(base, currency)
-        if result.get("rate") is not None:
-            rates[currency] = result["rate"]
-        else:
-            errors.append(currency)
+    fx = get_fx_matrix(major_currencies + [base])
+    rates = {
+        currency: round(rate, 6)
+        for currency, rate in fx.rates_against(base, currencies_to_fetch).items()
+    }
+    errors = [c for c in currencies_to_fetch if c not in rates]
     
     return {
         "base_currency": base,
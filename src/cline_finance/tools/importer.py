@@ -0,0 +1,390 @@
+"""
+Importer Tools - Bulk import of broker trade exports (CSV / XLSX).
+
+A whole export is parsed in one pass, metadata is fetched once per new
+symbol, and all lots are applied as a single ledger batch, so thousands of
+historical trades import in one tool call instead of one call per trade.
+"""
+import csv
+import logging
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+from dateutil import parser as date_parser
+
+from cline_finance.core.executor import fan_out
+from cline_finance.core.memory_manager import get_memory_manager
+from cline_finance.core.portfolio_manager import get_portfolio_manager
+from cline_finance.tools.quotes import get_stock_quote
+
+logger = logging.getLogger(__name__)
+
+# Header names recognized for each field (compared lowercase, "_"/"-" as spaces)
+COLUMN_ALIASES = {
+    "symbol": ("symbol", "ticker", "ticker symbol", "instrument", "security", "stock"),
+    "date": ("date", "trade date", "execution date", "transaction date", "settlement date", "datetime"),
+    "shares": ("shares", "quantity", "qty", "units", "no. of shares", "number of shares"),
+    "price": ("price", "trade price", "unit price", "price per share", "execution price", "avg price"),
+    "currency": ("currency", "ccy", "price currency", "trade currency"),
+    "side": ("side", "action", "buy/sell", "transaction type", "direction"),
+    "isin": ("isin",),
+    "exchange": ("exchange", "market", "venue"),
+    "notes": ("notes", "description", "comment"),
+}
+
+BUY_SIDES = {"buy", "b", "bought", "purchase", "buy to open", "market buy", "limit buy"}
+SELL_SIDES = {"sell", "s", "sold", "sale", "sell to close", "market sell", "limit sell"}
+
+# Maximum skipped rows listed in the summary (all are counted)
+MAX_REPORTED_SKIPS = 50
+
+
+def _normalize_header(name: str) -> str:
+    return " ".join(str(name).strip().lower().replace("_", " ").replace("-", " ").split())
+
+
+def _map_columns(headers: list[str]) -> dict[str, str]:
+    """Map field names to the file's column headers."""
+    normalized = {_normalize_header(h): h for h in headers if h is not None}
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized[alias]
+                break
+    return columns
+
+
+def _sniff_dialect(path: Path):
+    """Detect the CSV dialect from the start of a file (None for Excel files)."""
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        return None
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(8192)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        return csv.excel
+
+
+def _read_rows(path: Path, dialect=None) -> Iterator[dict]:
+    """Stream rows of a CSV file, or read all rows of an Excel sheet."""
+    if path.suffix.lower() in (".xlsx", ".xls"):
+        import pandas as pd
+        try:
+            frame = pd.read_excel(path, dtype=str)
+        except ImportError as e:
+            raise ValueError(f"Reading Excel files needs an Excel engine ({e}). Install openpyxl or export as CSV.")
+        yield from frame.where(frame.notna(), None).to_dict("records")
+        return
+    
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f, dialect=dialect or _sniff_dialect(path))
+
+
+def _parse_number(text, decimal: Optional[str] = None) -> Optional[float]:
+    """
+    Parse a broker number such as "1,234.50", "1.234,50", "$ 99" or "(12)".
+    
+    Args:
+        text: Cell value
+        decimal: Decimal separator of the file ("." or ","); guessed per
+                 value when None
+    
+    Returns:
+        The number, or None if text is empty or not numeric.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return float(text)
+    
+    s = str(text).strip()
+    negative = s.startswith("(") and s.endswith(")")
+    s = "".join(c for c in s if c.isdigit() or c in ",.-")
+    if not s or s in ("-", ".", ","):
+        return None
+    
+    if decimal == ",":
+        s = s.replace(".", "").replace(",", ".")
+    elif decimal == ".":
+        s = s.replace(",", "")
+    # The right-most separator is the decimal point when both are present
+    elif "," in s and "." in s:
+        if s.rfind(",") > s.rfind("."):
+            s = s.replace(".", "").replace(",", ".")
+        else:
+            s = s.replace(",", "")
+    elif "," in s:
+        head, _, tail = s.rpartition(",")
+        # "1,234" groups thousands; "12,5" and "0,125" use a decimal comma
+        grouped = head.lstrip("-") not in ("", "0") and len(tail) == 3
+        s = s.replace(",", "") if grouped else s.replace(",", ".")
+    
+    try:
+        value = float(s)
+    except ValueError:
+        return None
+    return -abs(value) if negative else value
+
+
+def _cell(row: dict, columns: dict[str, str], field: str):
+    """Get a field of a row (stripped), or None if the column is absent or empty."""
+    value = row.get(columns[field]) if field in columns else None
+    if isinstance(value, str):
+        value = value.strip()
+    return value or None
+
+
+def _parse_side(text) -> Optional[str]:
+    """Classify a side/action cell as "buy", "sell" or None (unknown)."""
+    if text is None:
+        return None
+    side = " ".join(str(text).strip().lower().split())
+    if side in BUY_SIDES:
+        return "buy"
+    if side in SELL_SIDES:
+        return "sell"
+    return None
+
+
+def import_trades(
+    file_path: str,
+    dayfirst: bool = False,
+    default_currency: Optional[str] = None,
+    asset_type: str = "stock",
+    method: str = "fifo",
+    dry_run: bool = False,
+) -> dict:
+    """
+    Import historical trades from a broker CSV or XLSX export.
+    
+    Columns are detected from common header names (symbol/ticker, date,
+    quantity/shares, price, currency, side/action, isin, exchange). Trades
+    are applied in date order to the current owner's portfolio in one atomic
+    batch: buys add purchase lots, sells consume lots by the matching method
+    and record realized P&L. Metadata (sector, currency, name) is fetched once
+    per new symbol and one summary decision per symbol and side is recorded
+    in memory. Without a side column, negative quantities are sells.
+    
+    Sells that exceed the shares held at that point are listed in the
+    skipped rows (dry runs do not check this), as are rows in a currency
+    other than that of their position.
+    
+    Args:
+        file_path: Path to the export (.csv, .txt, .xlsx)
+        dayfirst: Parse ambiguous dates as day/month (e.g. 03/04 = 3 April)
+        default_currency: Currency for rows without one that open a new
+                          position (an existing position keeps its currency;
+                          otherwise the quote's currency)
+        asset_type: 'stock' or 'etf' for new positions
+        method: Lot matching method for sells ("fifo", "lifo", "hifo")
+        dry_run: Parse and validate only, without changing the portfolio
+    
+    Returns:
+        Dictionary with import counts, per-symbol totals and skipped rows.
+    
+    Example:
+        >>> import_trades("~/Downloads/transactions.csv", dayfirst=True)
+        >>> import_trades("trades.xlsx", dry_run=True)
+    """
+    started = time.perf_counter()
+    path = Path(file_path).expanduser()
+    if not path.is_file():
+        return {"status": "error", "error": f"File not found: {path}"}
+    if method not in ("fifo", "lifo", "hifo"):
+        return {"status": "error", "error": f"Unsupported lot matching method for imports: {method}"}
+    
+    trades = []
+    skipped = []
+    skipped_count = 0
+    dates: dict[str, Optional[str]] = {}  # Exports repeat the same dates; parse each once
+    columns = None
+    row_count = 0
+    
+    def skip(row_number: int, reason: str) -> None:
+        nonlocal skipped_count
+        skipped_count += 1
+        if len(skipped) < MAX_REPORTED_SKIPS:
+            skipped.append({"row": row_number, "reason": reason})
+    
+    try:
+        dialect = _sniff_dialect(path)
+        # Semicolon-separated exports come from locales with a decimal comma
+        decimal = "," if dialect is not None and dialect.delimiter == ";" else None
+        for row_number, row in enumerate(_read_rows(path, dialect), start=2):  # Row 1 is the header
+            row_count += 1
+            if columns is None:
+                columns = _map_columns(list(row.keys()))
+                missing = [f for f in ("symbol", "shares", "price") if f not in columns]
+                if missing:
+                    return {
+                        "status": "error",
+                        "error": f"Missing required column(s): {', '.join(missing)}",
+                        "columns_found": list(row.keys()),
+                    }
+            
+            symbol = _cell(row, columns, "symbol")
+            if not symbol:
+                skip(row_number, "missing symbol")
+                continue
+            shares = _parse_number(_cell(row, columns, "shares"), decimal)
+            price = _parse_number(_cell(row, columns, "price"), decimal)
+            if not shares:
+                skip(row_number, "missing or zero quantity")
+                continue
+            if price is None or price < 0:
+                skip(row_number, "missing or invalid price")
+                continue
+            
+            side = _parse_side(_cell(row, columns, "side"))
+            if "side" in columns and side is None:
+                skip(row_number, f"unrecognized side '{_cell(row, columns, 'side')}'")
+                continue
+            if side is None:
+                side = "sell" if shares < 0 else "buy"
+            
+            date_text = _cell(row, columns, "date")
+            trade_date = None
+            if date_text:
+                date_text = str(date_text)
+                if date_text not in dates:
+                    try:
+                        dates[date_text] = date_parser.parse(date_text, dayfirst=dayfirst).strftime("%Y-%m-%d")
+                    except (ValueError, OverflowError):
+                        dates[date_text] = None
+                trade_date = dates[date_text]
+                if trade_date is None:
+                    skip(row_number, f"unreadable date '{date_text}'")
+                    continue
+            
+            trades.append({
+                "row": row_number,
+                "side": side,
+                "symbol": str(symbol).upper(),
+                "shares": abs(shares),
+                "price": price,
+                "currency": (_cell(row, columns, "currency") or "").upper() or None,
+                "isin": _cell(row, columns, "isin"),
+                "exchange": _cell(row, columns, "exchange"),
+                "notes": _cell(row, columns, "notes"),
+                "date": trade_date,
+                "method": method,
+            })
+    except (OSError, UnicodeDecodeError, csv.Error, ValueError) as e:
+        return {"status": "error", "error": f"Could not read {path.name}: {e}"}
+    
+    # Exports are often newest first; sells must follow the buys they close.
+    # A newest-first file is reversed first so trades on the same day keep
+    # their chronological order through the (stable) sort.
+    dated = [t["date"] for t in trades if t["date"]]
+    if dated and dated[0] > dated[-1]:
+        trades.reverse()
+    trades.sort(key=lambda t: t["date"] or "9999-12-31")
+    
+    pm = get_portfolio_manager()
+    portfolio = pm.get_portfolio()
+    symbols = list(dict.fromkeys(t["symbol"] for t in trades))
+    new_symbols = [s for s in dict.fromkeys(t["symbol"] for t in trades if t["side"] == "buy") if portfolio.get_position(s) is None]
+    
+    # Resolve metadata once per new symbol, concurrently
+    metadata = {}
+    if not dry_run:
+        for result in fan_out(get_stock_quote, new_symbols):
+            if result.ok:
+                metadata[result.item] = result.value
+            else:
+                logger.warning(f"No metadata for {result.item}: {result.error}")
+    
+    # A position holds lots in one currency: rows in another one are skipped
+    currencies = {}
+    priced = []
+    for trade in trades:
+        symbol = trade["symbol"]
+        position = portfolio.get_position(symbol)
+        quote = metadata.get(symbol, {})
+        held = (position.currency if position else None) or currencies.get(symbol)
+        if trade["currency"] and held and trade["currency"] != held.upper():
+            skip(trade["row"], f"currency {trade['currency']} differs from the {held} of the {symbol} position")
+            continue
+        trade["currency"] = trade["currency"] or held or default_currency or quote.get("currency") or "USD"
+        currencies.setdefault(symbol, trade["currency"])
+        priced.append(trade)
+        if position is None and trade["side"] == "buy":
+            trade["sector"] = quote.get("sector")
+            trade["company_name"] = quote.get("company_name")
+            trade["exchange"] = trade["exchange"] or quote.get("exchange")
+            trade["asset_type"] = asset_type
+    trades = priced
+    
+    recorded = trades
+    if trades and not dry_run:
+        events, rejected = pm.record_trades(trades, strict=False)
+        rejected_indices = set()
+        for index, reason in rejected:
+            rejected_indices.add(index)
+            skip(trades[index]["row"], reason)
+        recorded = [t for i, t in enumerate(trades) if i not in rejected_indices]
+        realized = {}
+        for event in events:
+            if event["op"] == "sell":
+                realized[event["symbol"]] = realized.get(event["symbol"], 0.0) + event["realized_pnl"]
+    
+    totals: dict[tuple[str, str], dict] = {}
+    for trade in recorded:
+        summary = totals.setdefault((trade["symbol"], trade["side"]), {
+            "trades": 0, "shares": 0.0, "value": 0.0, "currency": trade["currency"], "last_date": None,
+        })
+        summary["trades"] += 1
+        summary["shares"] += trade["shares"]
+        summary["value"] += trade["shares"] * trade["price"]
+        if trade["date"] and (summary["last_date"] is None or trade["date"] > summary["last_date"]):
+            summary["last_date"] = trade["date"]
+    
+    if recorded and not dry_run:
+        # One summary decision per symbol and side, written in a single memory update
+        try:
+            get_memory_manager().track_decisions([
+                {
+                    "action": side,
+                    "symbol": symbol,
+                    "shares": s["shares"],
+                    "price": round(s["value"] / s["shares"], 4),
+                    "date": s["last_date"],
+                    "rationale": f"Imported {s['trades']} {side} trade(s) of {symbol} from {path.name}",
+                }
+                for (symbol, side), s in totals.items()
+            ])
+        except Exception as e:
+            logger.warning(f"Failed to track import decisions: {e}")
+    
+    by_symbol: dict[str, dict] = {}
+    for (symbol, side), s in totals.items():
+        entry = by_symbol.setdefault(symbol, {"currency": s["currency"]})
+        entry[f"{side}s"] = s["trades"]
+        entry[f"shares_{'bought' if side == 'buy' else 'sold'}"] = round(s["shares"], 6)
+        entry[f"avg_{side}_price"] = round(s["value"] / s["shares"], 4)
+        if side == "sell" and not dry_run:
+            entry["realized_pnl"] = round(realized.get(symbol, 0.0), 2)
+    
+    elapsed = time.perf_counter() - started
+    logger.info(f"Imported {len(recorded)} trades from {path} in {elapsed:.2f}s ({skipped_count} skipped)")
+    
+    return {
+        "status": "success" if recorded else "nothing_imported",
+        "dry_run": dry_run,
+        "file": str(path),
+        "owner": portfolio.owner,
+        "rows": row_count,
+        "imported": len(recorded),
+        "buys": sum(1 for t in recorded if t["side"] == "buy"),
+        "sells": sum(1 for t in recorded if t["side"] == "sell"),
+        "skipped": skipped_count,
+        "positions": len(symbols),
+        "new_positions": new_symbols,
+        "columns": columns or {},
+        "by_symbol": by_symbol,
+        "skipped_rows": skipped,
+        "elapsed_seconds": round(elapsed, 3),
+    }
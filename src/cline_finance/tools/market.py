@@ -5,9 +5,18 @@ import logging
 from datetime import datetime
 from typing import Optional
 
-import yfinance as yf
 
-from cline_finance.constants import DEFAULT_INDICES, INDEX_NAMES, VIX_THRESHOLDS
+from cline_finance.constants import (
+    DEFAULT_INDICES,
+    FETCH_TIMEOUT_SECONDS,
+    INDEX_NAMES,
+    VIX_THRESHOLDS,
+)
+from cline_finance.core.executor import fan_out, submit
+from cline_finance.core.market_cache import get_market_cache
+from cline_finance.core.providers import get_provider
+from cline_finance.core.ticker_info import peek_ticker_info
+from cline_finance.tools.quotes import get_batch_quotes, get_stock_quote
 
 logger = logging.getLogger(__name__)
 
@@ -32,48 +41,42 @@ def get_market_overview(indices: Optional[list[str]] = None) -> dict:
     if indices is None:
         indices = DEFAULT_INDICES
     
+    # VIX is fetched alongside the indices
+    vix_future = submit(_get_vix_data)
+    
     market_data = []
     advancing = 0
     declining = 0
     
-    for index_symbol in indices:
-        try:
-            ticker = yf.Ticker(index_symbol)
-            hist = ticker.history(period="2d")
-            
-            if hist.empty:
-                continue
-            
-            current_price = float(hist['Close'].iloc[-1])
-            prev_close = float(hist['Close'].iloc[-2]) if len(hist) >= 2 else current_price
-            change = current_price - prev_close
-            change_percent = (change / prev_close * 100) if prev_close > 0 else 0
-            
-            # Track advancing/declining
-            if change > 0:
-                advancing += 1
-            elif change < 0:
-                declining += 1
-            
-            market_data.append({
-                "symbol": index_symbol,
-                "name": INDEX_NAMES.get(index_symbol, index_symbol),
-                "price": round(current_price, 2),
-                "change": round(change, 2),
-                "change_percent": round(change_percent, 2),
-                "status": "up" if change > 0 else "down" if change < 0 else "flat",
-            })
-            
-        except Exception as e:
-            logger.warning(f"Error fetching {index_symbol}: {e}")
+    for result in fan_out(_fetch_index, indices):
+        index_symbol = result.item
+        
+        if not result.ok:
+            logger.warning(f"Error fetching {index_symbol}: {result.error}")
             market_data.append({
                 "symbol": index_symbol,
                 "name": INDEX_NAMES.get(index_symbol, index_symbol),
-                "error": str(e),
+                "error": str(result.error),
             })
+            continue
+        
+        index_data = result.value
+        if index_data is None:
+            continue
+        
+        # Track advancing/declining
+        if index_data["change"] > 0:
+            advancing += 1
+        elif index_data["change"] < 0:
+            declining += 1
+        
+        market_data.append(index_data)
     
-    # Get VIX for sentiment
-    vix_data = _get_vix_data()
+    try:
+        vix_data = vix_future.result(timeout=FETCH_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.error(f"Error fetching VIX: {e}")
+        vix_data = {"error": str(e)}
     
     # Determine market sentiment
     sentiment = _calculate_sentiment(vix_data.get("value"), advancing, declining)
@@ -103,11 +106,41 @@ def get_market_overview(indices: Optional[list[str]] = None) -> dict:
     }
 
 
+def _fetch_index(index_symbol: str) -> Optional[dict]:
+    """Fetch the latest move of a single index (None if no data)."""
+    return get_market_cache().get_or_fetch(
+        "quote", (index_symbol, "index"), lambda: _load_index(index_symbol)
+    )
+
+
+def _load_index(index_symbol: str) -> Optional[dict]:
+    """Load the latest move of a single index from yfinance."""
+    hist = get_provider().history(index_symbol, period="2d")
+    
+    if hist.empty:
+        return None
+    
+    current_price = float(hist['Close'].iloc[-1])
+    prev_close = float(hist['Close'].iloc[-2]) if len(hist) >= 2 else current_price
+    change = current_price - prev_close
+    change_percent = (change / prev_close * 100) if prev_close > 0 else 0
+    
+    return {
+        "symbol": index_symbol,
+        "name": INDEX_NAMES.get(index_symbol, index_symbol),
+        "price": round(current_price, 2),
+        "change": round(change, 2),
+        "change_percent": round(change_percent, 2),
+        "status": "up" if change > 0 else "down" if change < 0 else "flat",
+    }
+
+
 def _get_vix_data() -> dict:
     """Get VIX (Volatility Index) data."""
     try:
-        vix = yf.Ticker("^VIX")
-        hist = vix.history(period="5d")
+        hist = get_market_cache().get_or_fetch(
+            "quote", ("^VIX", "vix"), lambda: get_provider().history("^VIX", period="5d")
+        )
         
         if hist.empty:
             return {"error": "VIX data unavailable"}
@@ -217,6 +250,18 @@ def _calculate_sentiment(vix_value: Optional[float], advancing: int, declining:
     }
 
 
+def _to_mover(symbol: str, quote: dict) -> dict:
+    """Build a mover entry from a price-only quote."""
+    # Names come from cache only; movers never pay for a full ticker.info fetch
+    name = peek_ticker_info(symbol, ["shortName"])["shortName"] or quote.get("company_name")
+    return {
+        "symbol": symbol,
+        "name": name or symbol,
+        "price": quote["price"],
+        "change_percent": quote["change_percent"],
+    }
+
+
 def get_market_movers(count: int = 5) -> dict:
     """
     Get top market movers (gainers and losers).
@@ -236,26 +281,14 @@ def get_market_movers(count: int = 5) -> dict:
         "XOM", "CVX", "PFE", "ABBV", "KO", "PEP", "MRK", "CSCO",
     ]
     
-    movers = []
-    
-    for symbol in popular_stocks:
-        try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            
-            current = info.get("regularMarketPrice")
-            prev = info.get("regularMarketPreviousClose")
-            
-            if current and prev:
-                change_pct = ((current - prev) / prev * 100)
-                movers.append({
-                    "symbol": symbol,
-                    "name": info.get("shortName", symbol),
-                    "price": round(current, 2),
-                    "change_percent": round(change_pct, 2),
-                })
-        except Exception:
-            continue
+    # Price-only quotes: one bulk download, then fast_info for anything it missed
+    quotes = get_batch_quotes(popular_stocks)
+    missing = [s for s in popular_stocks if s not in quotes]
+    for result in fan_out(lambda s: get_stock_quote(s, mode="price"), missing):
+        if result.ok:
+            quotes[result.item] = result.value
+    
+    movers = [_to_mover(symbol, quotes[symbol]) for symbol in popular_stocks if symbol in quotes]
     
     # Sort by change percent
     movers.sort(key=lambda x: x["change_percent"], reverse=True)
@@ -267,6 +300,35 @@ def get_market_movers(count: int = 5) -> dict:
     }
 
 
+def _fetch_sector_etf(symbol: str) -> Optional[dict]:
+    """Fetch day and week performance of a sector ETF (None if no data)."""
+    return get_market_cache().get_or_fetch(
+        "quote", (symbol, "sector"), lambda: _load_sector_etf(symbol)
+    )
+
+
+def _load_sector_etf(symbol: str) -> Optional[dict]:
+    """Load day and week performance of a sector ETF from yfinance."""
+    hist = get_provider().history(symbol, period="5d")
+    
+    if hist.empty:
+        return None
+    
+    current = float(hist['Close'].iloc[-1])
+    prev_day = float(hist['Close'].iloc[-2]) if len(hist) >= 2 else current
+    week_ago = float(hist['Close'].iloc[0])
+    
+    day_change = ((current - prev_day) / prev_day * 100) if prev_day > 0 else 0
+    week_change = ((current - week_ago) / week_ago * 100) if week_ago > 0 else 0
+    
+    return {
+        "etf": symbol,
+        "price": round(current, 2),
+        "day_change": round(day_change, 2),
+        "week_change": round(week_change, 2),
+    }
+
+
 def get_sector_performance() -> dict:
     """
     Get performance of major market sectors.
@@ -293,31 +355,13 @@ def get_sector_performance() -> dict:
     
     sectors = []
     
-    for symbol, name in sector_etfs.items():
-        try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="5d")
-            
-            if hist.empty:
-                continue
-            
-            current = float(hist['Close'].iloc[-1])
-            prev_day = float(hist['Close'].iloc[-2]) if len(hist) >= 2 else current
-            week_ago = float(hist['Close'].iloc[0])
-            
-            day_change = ((current - prev_day) / prev_day * 100) if prev_day > 0 else 0
-            week_change = ((current - week_ago) / week_ago * 100) if week_ago > 0 else 0
-            
-            sectors.append({
-                "sector": name,
-                "etf": symbol,
-                "price": round(current, 2),
-                "day_change": round(day_change, 2),
-                "week_change": round(week_change, 2),
-            })
-            
-        except Exception as e:
-            logger.warning(f"Error fetching {symbol}: {e}")
+    for result in fan_out(_fetch_sector_etf, list(sector_etfs)):
+        if not result.ok:
+            logger.warning(f"Error fetching {result.item}: {result.error}")
+            continue
+        if result.value is None:
+            continue
+        sectors.append({"sector": sector_etfs[result.item], **result.value})
     
     # Sort by day change
     sectors.sort(key=lambda x: x["day_change"], reverse=True)
@@ -73,12 +73,14 @@ def get_insights(
     symbol: Optional[str] = None,
     tags: Optional[list[str]] = None,
     limit: int = 20,
+    query: Optional[str] = None,
 ) -> dict:
     """
     Retrieve stored insights from memory.
     
     Returns insights matching the specified criteria, sorted by date
-    (newest first). Expired insights are automatically excluded.
+    (newest first), or by relevance to query when one is given.
+    Expired insights are automatically excluded.
     Only returns insights for the current owner.
     
     Args:
@@ -86,6 +88,7 @@ def get_insights(
         symbol: Filter by stock symbol
         tags: Filter by any matching tag
         limit: Maximum number of insights to return
+        query: Free text to rank insights by (BM25 full-text search)
     
     Returns:
         Dictionary with matching insights.
@@ -93,22 +96,22 @@ def get_insights(
     Example:
         >>> get_insights(category="stock", symbol="AMZN")
         >>> get_insights(tags=["bullish"])
+        >>> get_insights(query="fed rate cuts and bank margins", limit=5)
     """
     mm = get_memory_manager()
     
-    insights = mm.get_insights(
-        category=category,
-        symbol=symbol,
-        tags=tags,
-        limit=limit,
-    )
+    if query:
+        ranked = mm.search_insights(query, category=category, symbol=symbol, tags=tags, limit=limit)
+    else:
+        ranked = [(i, None) for i in mm.get_insights(category=category, symbol=symbol, tags=tags, limit=limit)]
     
     return {
-        "count": len(insights),
+        "count": len(ranked),
         "filters": {
             "category": category,
             "symbol": symbol,
             "tags": tags,
+            "query": query,
         },
         "insights": [
             {
@@ -118,8 +121,9 @@ def get_insights(
                 "content": i.content,
                 "symbol": i.symbol,
                 "tags": i.tags,
+                **({"score": round(score, 3)} if score is not None else {}),
             }
-            for i in insights
+            for i, score in ranked
         ],
     }
 
@@ -273,36 +277,38 @@ def get_decisions(
     action: Optional[str] = None,
     status: Optional[str] = None,
     limit: int = 20,
+    query: Optional[str] = None,
 ) -> dict:
     """
     Get tracked investment decisions.
     
-    Only returns decisions for the current owner.
+    Decisions are sorted by date (newest first), or by relevance to query
+    when one is given. Only returns decisions for the current owner.
     
     Args:
         symbol: Filter by stock symbol
         action: Filter by action type (buy, sell, hold, rebalance)
         status: Filter by status (pending, reviewed, closed)
         limit: Maximum number to return
+        query: Free text to rank decisions by (BM25 over rationale and outcome)
     
     Returns:
         Dictionary with matching decisions.
     """
     mm = get_memory_manager()
     
-    decisions = mm.get_decisions(
-        symbol=symbol,
-        action=action,
-        status=status,
-        limit=limit,
-    )
+    if query:
+        ranked = mm.search_decisions(query, symbol=symbol, action=action, status=status, limit=limit)
+    else:
+        ranked = [(d, None) for d in mm.get_decisions(symbol=symbol, action=action, status=status, limit=limit)]
     
     return {
-        "count": len(decisions),
+        "count": len(ranked),
         "filters": {
             "symbol": symbol,
             "action": action,
             "status": status,
+            "query": query,
         },
         "decisions": [
             {
@@ -315,8 +321,9 @@ def get_decisions(
                 "rationale": d.rationale,
                 "outcome": d.outcome,
                 "status": d.status,
+                **({"score": round(score, 3)} if score is not None else {}),
             }
-            for d in decisions
+            for d, score in ranked
         ],
     }
 
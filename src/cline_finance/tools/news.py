@@ -8,6 +8,9 @@ from typing import Optional
 import requests
 
 from cline_finance.constants import NEWS_API_KEY
+from cline_finance.core.executor import fan_out
+from cline_finance.core.market_cache import get_market_cache
+from cline_finance.core.providers import get_provider
 
 logger = logging.getLogger(__name__)
 
@@ -49,24 +52,33 @@ def get_financial_news(
     return _get_market_news_fallback(limit)
 
 
+def _fetch_newsapi(query: str, limit: int) -> dict:
+    """Fetch a raw NewsAPI response (uncached, raises on failure)."""
+    url = "https://newsapi.org/v2/everything"
+    params = {
+        "q": query,
+        "language": "en",
+        "sortBy": "publishedAt",
+        "pageSize": limit,
+        "apiKey": NEWS_API_KEY,
+    }
+    
+    response = requests.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    
+    if data.get("status") != "ok":
+        raise Exception(data.get("message", "NewsAPI error"))
+    
+    return data
+
+
 def _get_newsapi_news(query: str, limit: int) -> dict:
     """Fetch news from NewsAPI."""
     try:
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            "q": query,
-            "language": "en",
-            "sortBy": "publishedAt",
-            "pageSize": limit,
-            "apiKey": NEWS_API_KEY,
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get("status") != "ok":
-            raise Exception(data.get("message", "NewsAPI error"))
+        data = get_market_cache().get_or_fetch(
+            "news", ("newsapi", query, limit), lambda: _fetch_newsapi(query, limit)
+        )
         
         articles = []
         for article in data.get("articles", []):
@@ -97,35 +109,42 @@ def _get_newsapi_news(query: str, limit: int) -> dict:
         }
 
 
+def _fetch_ticker_news(symbol: str) -> list[dict]:
+    """Fetch the raw yfinance news items for one symbol (cached)."""
+    return get_market_cache().get_or_fetch("news", symbol, lambda: get_provider().news(symbol) or [])
+
+
+def _format_news_item(item: dict) -> dict:
+    """Convert a raw yfinance news item to the article format."""
+    return {
+        "title": item.get("title", ""),
+        "description": item.get("summary"),
+        "url": item.get("link"),
+        "source": item.get("publisher"),
+        "published_at": datetime.fromtimestamp(
+            item.get("providerPublishTime", 0)
+        ).isoformat() if item.get("providerPublishTime") else None,
+    }
+
+
 def _get_symbol_news(symbols: list[str], limit: int) -> dict:
     """Get news for specific symbols using yfinance."""
-    import yfinance as yf
-    
     all_news = []
     seen_titles = set()
     
-    for symbol in symbols:
-        try:
-            ticker = yf.Ticker(symbol.upper())
-            news = ticker.news
-            
-            if news:
-                for item in news[:5]:  # Limit per symbol
-                    title = item.get("title", "")
-                    if title and title not in seen_titles:
-                        seen_titles.add(title)
-                        all_news.append({
-                            "title": title,
-                            "description": item.get("summary"),
-                            "url": item.get("link"),
-                            "source": item.get("publisher"),
-                            "published_at": datetime.fromtimestamp(
-                                item.get("providerPublishTime", 0)
-                            ).isoformat() if item.get("providerPublishTime") else None,
-                            "related_symbol": symbol.upper(),
-                        })
-        except Exception as e:
-            logger.warning(f"Error fetching news for {symbol}: {e}")
+    # Fetch all symbols concurrently, then merge in input order
+    for result in fan_out(_fetch_ticker_news, [s.upper() for s in symbols]):
+        if not result.ok:
+            logger.warning(f"Error fetching news for {result.item}: {result.error}")
+            continue
+        
+        for item in result.value[:5]:  # Limit per symbol
+            title = item.get("title", "")
+            if title and title not in seen_titles:
+                seen_titles.add(title)
+                article = _format_news_item(item)
+                article["related_symbol"] = result.item
+                all_news.append(article)
     
     # Sort by published date (newest first)
     all_news.sort(
@@ -144,34 +163,20 @@ def _get_symbol_news(symbols: list[str], limit: int) -> dict:
 
 def _get_market_news_fallback(limit: int) -> dict:
     """Fallback to general market news via major indices/ETFs."""
-    import yfinance as yf
-    
     # Get news from major market ETFs
     market_symbols = ["SPY", "QQQ", "DIA"]
     all_news = []
     seen_titles = set()
     
-    for symbol in market_symbols:
-        try:
-            ticker = yf.Ticker(symbol)
-            news = ticker.news
-            
-            if news:
-                for item in news[:5]:
-                    title = item.get("title", "")
-                    if title and title not in seen_titles:
-                        seen_titles.add(title)
-                        all_news.append({
-                            "title": title,
-                            "description": item.get("summary"),
-                            "url": item.get("link"),
-                            "source": item.get("publisher"),
-                            "published_at": datetime.fromtimestamp(
-                                item.get("providerPublishTime", 0)
-                            ).isoformat() if item.get("providerPublishTime") else None,
-                        })
-        except Exception:
+    for result in fan_out(_fetch_ticker_news, market_symbols):
+        if not result.ok:
             continue
+        
+        for item in result.value[:5]:
+            title = item.get("title", "")
+            if title and title not in seen_titles:
+                seen_titles.add(title)
+                all_news.append(_format_news_item(item))
     
     # Sort by date
     all_news.sort(
@@ -7,11 +7,22 @@ import logging
 from datetime import datetime
 from typing import Optional
 
+import numpy as np
+
 from cline_finance.core.portfolio_manager import get_portfolio_manager
 from cline_finance.core.memory_manager import get_memory_manager
 from cline_finance.core.chart_generator import ChartGenerator
+from cline_finance.constants import COST_BASIS_FX, VALUATION_CACHE_TTL_SECONDS
+from cline_finance.core.executor import fan_out
+from cline_finance.core.market_cache import get_market_cache
+from cline_finance.core.fx_history import convert_asof, fx_history_epoch, get_fx_rates_asof
+from cline_finance.core.fx_matrix import FXMatrix, get_fx_matrix
+from cline_finance.core.lot_array import concat_lot_arrays
 from cline_finance.core.settings_manager import get_settings_manager, CURRENCY_SYMBOLS
-from cline_finance.tools.quotes import get_stock_quote
+from cline_finance.core.snapshot_writer import get_snapshot_writer
+from cline_finance.core.valuation_engine import get_valuation_engine, position_key
+from cline_finance.core.valuation_kernel import BookValuation, value_book
+from cline_finance.tools.quotes import get_stock_quote, get_batch_quotes
 from cline_finance.tools.fx import get_fx_rate
 
 logger = logging.getLogger(__name__)
@@ -33,22 +44,141 @@ def _get_currency_symbol(currency: str) -> str:
     return CURRENCY_SYMBOLS.get(currency.upper(), currency)
 
 
-def _convert_to_base(amount: float, from_currency: str, base_currency: str) -> tuple[float, float]:
+def _convert_to_base(
+    amount: float,
+    from_currency: str,
+    base_currency: str,
+    fx: Optional[FXMatrix] = None,
+) -> tuple[float, float]:
     """
     Convert an amount to base currency.
     
+    Args:
+        amount: Amount in from_currency
+        from_currency: Currency of the amount
+        base_currency: Target currency
+        fx: Pre-fetched FX matrix; a single-pair lookup is used if it lacks the rate
+    
     Returns:
         Tuple of (converted_amount, fx_rate)
     """
     if from_currency.upper() == base_currency.upper():
         return amount, 1.0
     
+    if fx is not None:
+        rate = fx.rate(from_currency, base_currency)
+        if rate is not None:
+            return amount * rate, rate
+    
     fx_result = get_fx_rate(from_currency, base_currency)
     rate = fx_result.get("rate", 1.0) or 1.0
     return amount * rate, rate
 
 
-def get_portfolio_valuation() -> dict:
+def _lot_cost_basis_base(positions: list, base_currency: str, fx: FXMatrix) -> tuple[dict[str, float], set[str]]:
+    """
+    Cost basis per symbol in base currency, converting each lot at its trade-date FX rate.
+    
+    All lots are converted in one vectorized pass over the positions' lot
+    arrays (one FX history lookup per currency). Lots without a usable date
+    or historical rate use today's rate.
+    
+    Returns:
+        Tuple of ({symbol: cost basis}, symbols with a lot at today's rate).
+    """
+    cost, currencies, dates, group = concat_lot_arrays(p.lot_array for p in positions)
+    converted = convert_asof(cost, currencies, dates, base_currency)
+    
+    missing = np.isnan(converted)
+    for currency in np.unique(currencies[missing]):
+        mask = missing & (currencies == currency)
+        _, rate = _convert_to_base(1.0, currency, base_currency, fx)
+        converted[mask] = cost[mask] * rate
+    
+    totals = np.bincount(group, weights=converted, minlength=len(positions))
+    approximate = np.bincount(group, weights=missing.astype(np.float64), minlength=len(positions)) > 0
+    cost_basis = {}
+    fallback = set()
+    for position, value, estimated in zip(positions, totals, approximate):
+        symbol = position.symbol.upper()
+        cost_basis[symbol] = cost_basis.get(symbol, 0.0) + float(value)
+        if estimated:
+            fallback.add(symbol)
+    return cost_basis, fallback
+
+
+def _position_row(
+    position,
+    quote: Optional[dict],
+    currency: str,
+    fx_rate: float,
+    book: BookValuation,
+    i: int,
+    error: Optional[str],
+    base_currency: str,
+) -> dict:
+    """
+    Build the valuation dictionary of position i from the book arrays.
+    
+    Positions with an error have no price; their cost basis stands in for
+    their value (assumed to be in base currency).
+    """
+    if error is not None:
+        logger.error(f"Error valuing {position.symbol}: {error}")
+        cost_basis = position.cost_basis
+        return {
+            "symbol": position.symbol,
+            "shares": position.shares,
+            "avg_cost": round(position.avg_cost, 2),
+            "currency": position.currency or "USD",
+            "currency_symbol": _get_currency_symbol(position.currency or "USD"),
+            "cost_basis": round(cost_basis, 2),
+            "current_value": round(cost_basis, 2),
+            "current_value_base": round(cost_basis, 2),
+            "cost_basis_base": round(cost_basis, 2),
+            "gain_loss_base": 0,
+            "error": error,
+            "sector": position.sector,
+            "asset_type": position.asset_type,
+            "weight": 0,
+        }
+    
+    return {
+        "symbol": position.symbol,
+        "company_name": quote.get("company_name") or position.company_name or position.symbol,
+        "shares": position.shares,
+        # Original currency values
+        "avg_cost": round(position.avg_cost, 2),
+        "current_price": quote["price"],
+        "currency": currency,
+        "currency_symbol": _get_currency_symbol(currency),
+        "cost_basis": round(position.cost_basis, 2),
+        "current_value": round(float(book.value[i]), 2),
+        "gain_loss": round(float(book.gain_loss[i]), 2),
+        # Base currency values
+        "current_value_base": round(float(book.value_base[i]), 2),
+        "cost_basis_base": round(float(book.cost_base[i]), 2),
+        "gain_loss_base": round(float(book.gain_loss_base[i]), 2),
+        "fx_rate": round(fx_rate, 6) if currency != base_currency else None,
+        # Common
+        "gain_loss_pct": round(float(book.gain_loss_pct[i]), 2),
+        "sector": position.sector or quote.get("sector"),
+        "asset_type": position.asset_type,
+        "weight": 0,  # Set from the book weights
+    }
+
+
+def get_portfolio_symbols() -> list[str]:
+    """
+    Get the symbols held in the current owner's portfolio.
+    
+    Reads the cached portfolio only (no quotes or FX), for callers that need
+    the holdings but not their value.
+    """
+    return [p.symbol for p in get_portfolio_manager().get_portfolio().positions]
+
+
+def get_portfolio_valuation(fresh: bool = False) -> dict:
     """
     Get current portfolio valuation with real-time prices.
     
@@ -61,6 +191,14 @@ def get_portfolio_valuation() -> dict:
     Values are displayed in both original currency and converted to base currency.
     Uses the current owner's portfolio.
     
+    Only positions whose lots, quote or FX rate changed since the last call
+    are recomputed; if nothing changed the previous valuation is returned.
+    A valuation younger than VALUATION_CACHE_TTL_SECONDS is returned without
+    fetching quotes at all, so the steps of a workflow share one valuation.
+    
+    Args:
+        fresh: Refetch live quotes instead of reusing cached prices or a recent valuation
+    
     Returns:
         Dictionary with complete portfolio valuation.
     """
@@ -78,119 +216,146 @@ def get_portfolio_valuation() -> dict:
         owner_name = None
     
     base_symbol = _get_currency_symbol(base_currency)
+    engine = get_valuation_engine(str(pm.portfolio_path))
+    context = (pm.version, base_currency, owner_name, COST_BASIS_FX)
     
-    positions_data = []
-    total_value_base = 0.0
-    total_cost_basis_base = 0.0
-    errors = []
-    currency_exposure = {}  # Track exposure per currency
+    if fresh:
+        engine.invalidate()
+        cache = get_market_cache()
+        for position in portfolio.positions:
+            cache.invalidate("price", position.symbol.upper())
+            cache.invalidate("quote", (position.symbol.upper(), "price"))
+    else:
+        recent = engine.recent_result(context, VALUATION_CACHE_TTL_SECONDS)
+        if recent is not None:
+            return recent
+    
+    # Fetch all prices up front in bulk (one round-trip per batch)
+    batch_quotes = get_batch_quotes([p.symbol for p in portfolio.positions])
+    
+    # Symbols the batch missed fall back to price-only quotes, fetched concurrently
+    missing = [p.symbol.upper() for p in portfolio.positions if p.symbol.upper() not in batch_quotes]
+    fallback_quotes = {r.item: r for r in fan_out(lambda s: get_stock_quote(s, mode="price"), missing)}
+    
+    # Price every currency in play once against the pivot; conversions are then in memory
+    resolved = {**batch_quotes, **{s: r.value for s, r in fallback_quotes.items() if r.ok}}
+    fx = get_fx_matrix({base_currency} | {
+        resolved.get(p.symbol.upper(), {}).get("currency") or p.currency or "USD"
+        for p in portfolio.positions
+    } | {c for p in portfolio.positions for c in set(p.lot_array.currencies) if c})
+    
+    # Nothing changed since the last valuation: reuse it as a whole
+    result_key = context + (
+        tuple(sorted((s, q.get("price"), q.get("currency")) for s, q in resolved.items())),
+        fx.epoch,
+        fx_history_epoch(),
+    )
+    cached = engine.cached_result(result_key)
+    if cached is not None:
+        cached["valuation_date"] = datetime.utcnow().isoformat() + "Z"
+        return cached
     
-    for position in portfolio.positions:
+    # Cost basis at the FX rate of each purchase date (only changed positions are converted)
+    lot_cost_basis = {}
+    current_fx_symbols = set()
+    if COST_BASIS_FX == "trade_date":
         try:
-            # Get current quote
-            quote = get_stock_quote(position.symbol)
-            current_price = quote["price"]
-            position_currency = quote.get("currency", position.currency or "USD")
-            
-            # Calculate position value in original currency
-            current_value_orig = position.shares * current_price
-            cost_basis_orig = position.shares * position.avg_cost
-            gain_loss_orig = current_value_orig - cost_basis_orig
-            gain_loss_pct = (gain_loss_orig / cost_basis_orig * 100) if cost_basis_orig > 0 else 0
-            
-            # Convert to base currency
-            current_value_base, fx_rate = _convert_to_base(current_value_orig, position_currency, base_currency)
-            cost_basis_base, _ = _convert_to_base(cost_basis_orig, position_currency, base_currency)
-            gain_loss_base = current_value_base - cost_basis_base
-            
-            # Track currency exposure
-            currency_exposure[position_currency] = currency_exposure.get(position_currency, 0) + current_value_base
-            
-            position_data = {
-                "symbol": position.symbol,
-                "company_name": quote.get("company_name", position.company_name or position.symbol),
-                "shares": position.shares,
-                # Original currency values
-                "avg_cost": round(position.avg_cost, 2),
-                "current_price": current_price,
-                "currency": position_currency,
-                "currency_symbol": _get_currency_symbol(position_currency),
-                "cost_basis": round(cost_basis_orig, 2),
-                "current_value": round(current_value_orig, 2),
-                "gain_loss": round(gain_loss_orig, 2),
-                # Base currency values
-                "current_value_base": round(current_value_base, 2),
-                "cost_basis_base": round(cost_basis_base, 2),
-                "gain_loss_base": round(gain_loss_base, 2),
-                "fx_rate": round(fx_rate, 6) if position_currency != base_currency else None,
-                # Common
-                "gain_loss_pct": round(gain_loss_pct, 2),
-                "sector": position.sector or quote.get("sector"),
-                "asset_type": position.asset_type,
-                "weight": 0,  # Calculated after total
-            }
-            
-            positions_data.append(position_data)
-            total_value_base += current_value_base
-            total_cost_basis_base += cost_basis_base
-            
+            lot_cost_basis, current_fx_symbols = engine.cost_basis(
+                portfolio.positions,
+                base_currency,
+                lambda positions: _lot_cost_basis_base(positions, base_currency, fx),
+                epoch=fx_history_epoch,
+            )
         except Exception as e:
-            logger.error(f"Error valuing {position.symbol}: {e}")
-            errors.append({"symbol": position.symbol, "error": str(e)})
-            
-            # Use cost basis as fallback (assume same currency as base for simplicity)
-            cost_basis = position.shares * position.avg_cost
-            positions_data.append({
-                "symbol": position.symbol,
-                "shares": position.shares,
-                "avg_cost": round(position.avg_cost, 2),
-                "currency": position.currency or "USD",
-                "currency_symbol": _get_currency_symbol(position.currency or "USD"),
-                "cost_basis": round(cost_basis, 2),
-                "current_value": round(cost_basis, 2),
-                "current_value_base": round(cost_basis, 2),
-                "cost_basis_base": round(cost_basis, 2),
-                "gain_loss_base": 0,
-                "error": str(e),
-                "sector": position.sector,
-                "asset_type": position.asset_type,
-                "weight": 0,
-            })
-            total_value_base += cost_basis
-            total_cost_basis_base += cost_basis
-    
-    # Calculate weights (based on base currency values)
-    for pos in positions_data:
-        if total_value_base > 0:
-            pos["weight"] = round(pos["current_value_base"] / total_value_base * 100, 2)
+            logger.warning(f"Trade-date FX conversion failed, using current rates: {e}")
+    
+    positions = portfolio.positions
+    symbols = [p.symbol.upper() for p in positions]
+    quotes = [resolved.get(symbol) for symbol in symbols]
+    currencies = [(q or {}).get("currency") or p.currency or "USD" for p, q in zip(positions, quotes)]
+    
+    # One rate per currency (single-pair lookup if the matrix lacks it)
+    rates = {}
+    rate_errors = {}
+    for currency in {c for c, q in zip(currencies, quotes) if q is not None}:
+        try:
+            rates[currency] = _convert_to_base(1.0, currency, base_currency, fx)[1]
+        except Exception as e:
+            rate_errors[currency] = f"No FX rate {currency}/{base_currency}: {e}"
+    
+    position_errors = []
+    for symbol, quote, currency in zip(symbols, quotes, currencies):
+        if quote is None:
+            position_errors.append(str(fallback_quotes[symbol].error))
+        else:
+            position_errors.append(rate_errors.get(currency))
+    priced = np.array([error is None for error in position_errors], dtype=bool)
+    
+    # All figures in one vectorized pass over aligned arrays
+    cost = np.array([p.cost_basis for p in positions], dtype=np.float64)
+    fx_rate = np.array([rates.get(c, np.nan) for c in currencies], dtype=np.float64)
+    cost_base = np.array([lot_cost_basis.get(s, np.nan) for s in symbols], dtype=np.float64)
+    book = value_book(
+        shares=np.array([p.shares for p in positions], dtype=np.float64),
+        price=np.array([q["price"] if ok else np.nan for q, ok in zip(quotes, priced)], dtype=np.float64),
+        cost=cost,
+        fx_rate=fx_rate,
+        cost_base=np.where(np.isnan(cost_base), cost * fx_rate, cost_base),
+        groups={
+            "sector": [p.sector or (q or {}).get("sector") or "Other" for p, q in zip(positions, quotes)],
+            "asset_type": [p.asset_type or "stock" for p in positions],
+            "currency": currencies,
+        },
+        group_masks={"currency": priced},
+    )
+    
+    # Materialize position dictionaries, reusing those whose inputs did not change
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    
+    def valuation_inputs(position) -> tuple:
+        i = index[position.symbol.upper()]
+        quote = quotes[i] or {}
+        return (
+            position_key(position),
+            quote.get("price"),
+            currencies[i],
+            quote.get("company_name"),
+            quote.get("sector"),
+            float(fx_rate[i]) if priced[i] else None,
+            float(book.cost_base[i]),
+            position_errors[i],
+        )
+    
+    def position_row(position) -> dict:
+        i = index[position.symbol.upper()]
+        return _position_row(position, quotes[i], currencies[i], float(fx_rate[i]), book, i, position_errors[i], base_currency)
+    
+    positions_data = []
+    errors = []
+    for i, row in enumerate(engine.value_positions(positions, valuation_inputs, position_row)):
+        row = dict(row)
+        row["weight"] = round(float(book.weights[i]), 2)
+        positions_data.append(row)
+        if "error" in row:
+            errors.append({"symbol": row["symbol"], "error": row["error"]})
     
     # Calculate portfolio totals
+    total_value_base = book.total_value_base
+    total_cost_basis_base = book.total_cost_base
     total_gain_loss_base = total_value_base - total_cost_basis_base
     total_gain_loss_pct = (total_gain_loss_base / total_cost_basis_base * 100) if total_cost_basis_base > 0 else 0
     
-    # Sector allocation (in base currency)
-    sector_allocation = {}
-    for pos in positions_data:
-        sector = pos.get("sector") or "Other"
-        sector_allocation[sector] = sector_allocation.get(sector, 0) + pos["current_value_base"]
-    
-    # Asset type allocation (in base currency)
-    asset_allocation = {}
-    for pos in positions_data:
-        asset_type = pos.get("asset_type", "stock")
-        asset_allocation[asset_type] = asset_allocation.get(asset_type, 0) + pos["current_value_base"]
-    
     # Currency allocation
-    currency_allocation = {}
-    for curr, value in currency_exposure.items():
-        pct = (value / total_value_base * 100) if total_value_base > 0 else 0
-        currency_allocation[curr] = {
+    currency_allocation = {
+        curr: {
             "value": round(value, 2),
-            "percentage": round(pct, 2),
+            "percentage": round((value / total_value_base * 100) if total_value_base > 0 else 0, 2),
         }
+        for curr, value in book.allocations["currency"].items()
+    }
     
     # Calculate concentration risk
-    max_weight = max((p["weight"] for p in positions_data), default=0)
+    max_weight = book.max_weight
     if max_weight > 40:
         concentration_risk = "HIGH"
     elif max_weight > 25:
@@ -205,26 +370,31 @@ def get_portfolio_valuation() -> dict:
         "base_currency_symbol": base_symbol,
         "total_value": round(total_value_base, 2),
         "total_cost_basis": round(total_cost_basis_base, 2),
+        "cost_basis_fx": ("mixed" if current_fx_symbols else "trade_date") if lot_cost_basis else "current",
         "total_gain_loss": round(total_gain_loss_base, 2),
         "total_gain_loss_pct": round(total_gain_loss_pct, 2),
         "cash": portfolio.cash,
         "total_with_cash": round(total_value_base + portfolio.cash, 2),
         "positions": positions_data,
         "position_count": len(positions_data),
-        "sector_allocation": {k: round(v, 2) for k, v in sector_allocation.items()},
-        "asset_allocation": {k: round(v, 2) for k, v in asset_allocation.items()},
+        "sector_allocation": {k: round(v, 2) for k, v in book.allocations["sector"].items()},
+        "asset_allocation": {k: round(v, 2) for k, v in book.allocations["asset_type"].items()},
         "currency_allocation": currency_allocation,
         "concentration_risk": concentration_risk,
         "max_position_weight": round(max_weight, 2),
     }
     
+    if current_fx_symbols:
+        # Lots with no trade-date FX rate were converted at today's rate
+        result["cost_basis_current_fx"] = sorted(current_fx_symbols)
     if errors:
         result["errors"] = errors
+    engine.store_result(result_key, result, context)
     
-    # Save snapshot to memory
+    # Record the day's snapshot in the background (coalesced with other valuations)
     try:
-        mm = get_memory_manager()
-        mm.save_portfolio_snapshot(
+        get_snapshot_writer().submit(
+            get_memory_manager(),
             total_value_eur=total_value_base,  # Note: field name is legacy, stores base currency value
             total_cost_basis=total_cost_basis_base,
             cash=portfolio.cash,
@@ -314,7 +484,7 @@ def add_position(
     )
     
     # Calculate value in base currency
-    cost_basis = position.shares * position.avg_cost
+    cost_basis = position.cost_basis
     cost_basis_base, fx_rate = _convert_to_base(cost_basis, position_currency, base_currency)
     
     # Track as decision
@@ -391,7 +561,7 @@ def update_position(
                 "avg_cost": round(position.avg_cost, 2),
                 "currency": position.currency,
                 "currency_symbol": _get_currency_symbol(position.currency),
-                "cost_basis": round(position.shares * position.avg_cost, 2),
+                "cost_basis": round(position.cost_basis, 2),
                 "notes": position.notes,
             },
         }
@@ -425,7 +595,7 @@ def remove_position(symbol: str, reason: Optional[str] = None) -> dict:
             "error": f"Position {symbol} not found",
         }
     
-    removed = pm.remove_position(symbol)
+    removed = pm.remove_position(symbol, reason=reason)
     
     if removed:
         # Track as decision
@@ -458,6 +628,114 @@ def remove_position(symbol: str, reason: Optional[str] = None) -> dict:
         }
 
 
+def sell_position(
+    symbol: str,
+    shares: Optional[float] = None,
+    price: Optional[float] = None,
+    method: str = "fifo",
+    lot_indices: Optional[list[int]] = None,
+    reason: Optional[str] = None,
+) -> dict:
+    """
+    Sell all or part of a position and record the realized gain or loss.
+    
+    Lots are consumed by the chosen method; remaining lots keep their dates
+    and prices. The sale is kept in the trade ledger for P&L reporting.
+    
+    Args:
+        symbol: Stock ticker to sell
+        shares: Number of shares to sell (default: the whole position)
+        price: Sale price per share in the position's currency
+               (default: current market price)
+        method: Lot matching method: "fifo", "lifo", "hifo" or "specific"
+        lot_indices: Lot numbers to sell from when method="specific"
+                     (0-based, in the order shown by the position's lots)
+        reason: Optional reason for selling
+    
+    Returns:
+        Dictionary with the sale, matched lots and realized P&L.
+    
+    Example:
+        >>> sell_position("AAPL", 5, 190.0)
+        >>> sell_position("MSFT", 10, method="hifo")
+        >>> sell_position("ASML", 2, 900.0, method="specific", lot_indices=[3])
+    """
+    pm = get_portfolio_manager()
+    sm = get_settings_manager()
+    
+    position = pm.get_portfolio().get_position(symbol)
+    if not position:
+        return {
+            "status": "error",
+            "error": f"Position {symbol} not found",
+        }
+    
+    if price is None:
+        try:
+            price = get_stock_quote(position.symbol, mode="price")["price"]
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": f"No sale price given and no current price for {position.symbol}: {e}",
+            }
+    
+    try:
+        event = pm.sell_position(
+            position.symbol,
+            shares=shares if shares is not None else position.shares,
+            price=price,
+            method=method,
+            lot_indices=lot_indices,
+            reason=reason,
+        )
+    except ValueError as e:
+        return {
+            "status": "error",
+            "error": str(e),
+        }
+    
+    currency = event["currency"]
+    current_owner = sm.get_current_owner()
+    base_currency = current_owner.base_currency if current_owner else "USD"
+    realized_base, fx_rate = _convert_to_base(event["realized_pnl"], currency, base_currency)
+    
+    remaining = pm.get_portfolio().get_position(position.symbol)
+    
+    # Track as decision
+    try:
+        mm = get_memory_manager()
+        mm.track_decision(
+            action="sell",
+            symbol=position.symbol,
+            shares=event["shares"],
+            price=price,
+            rationale=reason or f"Sold {event['shares']} shares of {position.symbol} at {_get_currency_symbol(currency)}{price:.2f} ({event['method'].upper()})",
+        )
+    except Exception as e:
+        logger.warning(f"Failed to track decision: {e}")
+    
+    return {
+        "status": "success",
+        "message": f"Sold {event['shares']} shares of {position.symbol}",
+        "sale": {
+            "symbol": position.symbol,
+            "shares": event["shares"],
+            "price": price,
+            "currency": currency,
+            "method": event["method"],
+            "proceeds": round(event["proceeds"], 2),
+            "cost_basis": round(event["cost_basis"], 2),
+            "realized_pnl": round(event["realized_pnl"], 2),
+            "realized_pnl_base": round(realized_base, 2),
+            "base_currency": base_currency,
+            "fx_rate": round(fx_rate, 6) if currency != base_currency else None,
+            "lots": event["matches"],
+        },
+        "remaining_shares": remaining.shares if remaining else 0,
+        "position_closed": remaining is None,
+    }
+
+
 def get_portfolio_table() -> str:
     """
     Get portfolio as a formatted ASCII table with dual currency display.
@@ -552,15 +830,18 @@ def get_portfolio_table() -> str:
     return header_line + table
 
 
-def get_portfolio_history(days: int = 30) -> dict:
+def get_portfolio_history(days: int = 30, currency: Optional[str] = None) -> dict:
     """
     Get portfolio value history.
     
     Args:
         days: Number of days of history to retrieve
+        currency: Re-denominate values into this currency at each snapshot's
+                  FX rate (default: base currency, as stored)
     
     Returns:
         Dictionary with portfolio history and performance metrics.
+        Metrics are always in base currency.
     """
     mm = get_memory_manager()
     sm = get_settings_manager()
@@ -574,21 +855,182 @@ def get_portfolio_history(days: int = 30) -> dict:
     history = mm.get_portfolio_history(days=days)
     metrics = mm.get_performance_metrics(days=days)
     
+    # Snapshots are stored in base currency; convert each at its own date's rate
+    target_currency = (currency or base_currency).upper()
+    rates = get_fx_rates_asof(base_currency, target_currency, [s.date for s in history])
+    if target_currency != base_currency and len(rates) and (rates != rates).any():
+        current_rate = get_fx_matrix([base_currency, target_currency]).rate(base_currency, target_currency)
+        rates[rates != rates] = current_rate if current_rate is not None else float("nan")
+    
     return {
         "base_currency": base_currency,
+        "currency": target_currency,
         "history": [
             {
                 "date": s.date,
-                "total_value": s.total_value_eur,  # Legacy field name
-                "cost_basis": s.total_cost_basis,
-                "cash": s.cash,
+                "total_value": round(float(s.total_value_eur * rate), 2),  # Legacy field name
+                "cost_basis": round(float(s.total_cost_basis * rate), 2),
+                "cash": round(float(s.cash * rate), 2),
+                **({"fx_rate": round(float(rate), 6)} if target_currency != base_currency else {}),
             }
-            for s in history
+            for s, rate in zip(history, rates)
         ],
         "metrics": metrics,
     }
 
 
+def get_trade_history(symbol: Optional[str] = None, limit: int = 50) -> dict:
+    """
+    Get the portfolio's recorded trades and adjustments from its ledger.
+    
+    Args:
+        symbol: Only events for this symbol
+        limit: Maximum events to return (newest first)
+    
+    Returns:
+        Dictionary with ledger events (buys, corrections, sales, cash updates).
+    """
+    pm = get_portfolio_manager()
+    events = pm.get_trade_history(symbol=symbol, limit=limit)
+    
+    return {
+        "owner": pm.get_portfolio().owner,
+        "symbol": symbol.upper() if symbol else None,
+        "count": len(events),
+        "events": events,
+    }
+
+
+def _realized_base(sales: list[dict], base_currency: str, fx: FXMatrix) -> np.ndarray:
+    """Realized P&L of each sale in base currency (at the sale date's FX rate if enabled)."""
+    amounts = np.array([e.get("realized_pnl", 0.0) for e in sales], dtype=np.float64)
+    currencies = np.array([e.get("currency") or base_currency for e in sales], dtype=object)
+    if not len(sales):
+        return amounts
+    
+    converted = np.full(len(sales), np.nan)
+    if COST_BASIS_FX == "trade_date":
+        try:
+            converted = convert_asof(amounts, currencies, [e.get("date") or e["ts"][:10] for e in sales], base_currency)
+        except Exception as e:
+            logger.warning(f"Sale-date FX conversion failed, using current rates: {e}")
+    
+    missing = np.isnan(converted)
+    for currency in np.unique(currencies[missing]):
+        mask = missing & (currencies == currency)
+        _, rate = _convert_to_base(1.0, currency, base_currency, fx)
+        converted[mask] = amounts[mask] * rate
+    return converted
+
+
+def get_pnl_report(symbol: Optional[str] = None) -> dict:
+    """
+    Get realized and unrealized profit and loss per symbol.
+    
+    Realized P&L comes from the recorded sales (each matched against its
+    purchase lots); unrealized P&L values the open lots at current prices.
+    Both are computed in one pass and summed in the base currency.
+    
+    Args:
+        symbol: Only report this symbol (also lists its open lots with the
+                index used for specific-lot sales)
+    
+    Returns:
+        Dictionary with per-symbol and total realized/unrealized P&L.
+    """
+    pm = get_portfolio_manager()
+    sm = get_settings_manager()
+    portfolio = pm.get_portfolio()
+    
+    current_owner = sm.get_current_owner()
+    base_currency = current_owner.base_currency if current_owner else "USD"
+    
+    symbol = symbol.upper() if symbol else None
+    positions = [p for p in portfolio.positions if not symbol or p.symbol == symbol]
+    sales = pm.get_trade_history(symbol=symbol, op="sell")
+    
+    quotes = get_batch_quotes([p.symbol for p in positions]) if positions else {}
+    missing = [p.symbol.upper() for p in positions if p.symbol.upper() not in quotes]
+    for result in fan_out(lambda s: get_stock_quote(s, mode="price"), missing):
+        if result.ok:
+            quotes[result.item] = result.value
+    
+    fx = get_fx_matrix(
+        {base_currency}
+        | {e.get("currency") or base_currency for e in sales}
+        | {quotes.get(p.symbol.upper(), {}).get("currency") or p.currency or "USD" for p in positions}
+    )
+    
+    rows: dict[str, dict] = {}
+    
+    def row(sym: str, currency: str) -> dict:
+        return rows.setdefault(sym, {
+            "symbol": sym,
+            "currency": currency,
+            "shares_held": 0.0,
+            "shares_sold": 0.0,
+            "realized_pnl": 0.0,
+            "realized_pnl_base": 0.0,
+            "unrealized_pnl": None,
+            "unrealized_pnl_base": None,
+        })
+    
+    for sale, realized_base in zip(sales, _realized_base(sales, base_currency, fx)):
+        r = row(sale["symbol"], sale.get("currency") or base_currency)
+        r["shares_sold"] += sale["shares"]
+        r["realized_pnl"] += sale.get("realized_pnl", 0.0)
+        r["realized_pnl_base"] += float(realized_base)
+    
+    errors = []
+    for position in positions:
+        quote = quotes.get(position.symbol.upper())
+        currency = (quote or {}).get("currency") or position.currency or "USD"
+        r = row(position.symbol, currency)
+        r["shares_held"] = position.shares
+        if quote is None:
+            errors.append({"symbol": position.symbol, "error": "No current price"})
+            continue
+        unrealized = position.shares * quote["price"] - position.cost_basis
+        unrealized_base, _ = _convert_to_base(unrealized, currency, base_currency, fx)
+        r["unrealized_pnl"] = round(unrealized, 2)
+        r["unrealized_pnl_base"] = round(unrealized_base, 2)
+        if symbol:
+            # Open lots with their index, for selling specific lots
+            lots = position.lot_array
+            lot_pnl = lots.unrealized_pnl(quote["price"])
+            r["open_lots"] = [
+                {
+                    "index": i,
+                    "date": lots.date_str(i),
+                    "shares": float(lots.shares[i]),
+                    "price": float(lots.price[i]),
+                    "unrealized_pnl": round(float(lot_pnl[i]), 2),
+                }
+                for i in range(len(lots))
+            ]
+    
+    total_realized = sum(r["realized_pnl_base"] for r in rows.values())
+    total_unrealized = sum(r["unrealized_pnl_base"] or 0.0 for r in rows.values())
+    for r in rows.values():
+        r["realized_pnl"] = round(r["realized_pnl"], 2)
+        r["realized_pnl_base"] = round(r["realized_pnl_base"], 2)
+        r["total_pnl_base"] = round(r["realized_pnl_base"] + (r["unrealized_pnl_base"] or 0.0), 2)
+    
+    result = {
+        "owner": portfolio.owner,
+        "base_currency": base_currency,
+        "currency_symbol": _get_currency_symbol(base_currency),
+        "total_realized_pnl": round(total_realized, 2),
+        "total_unrealized_pnl": round(total_unrealized, 2),
+        "total_pnl": round(total_realized + total_unrealized, 2),
+        "sales": len(sales),
+        "symbols": sorted(rows.values(), key=lambda r: r["total_pnl_base"], reverse=True),
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
 def generate_portfolio_report() -> dict:
     """
     Generate a comprehensive HTML report with charts.
@@ -5,10 +5,19 @@ import logging
 from dataclasses import dataclass
 from typing import Optional
 
-import yfinance as yf
+from cline_finance.constants import QUOTE_BATCH_SIZE, QUOTE_MODES
+from cline_finance.core.executor import fan_out, submit
+from cline_finance.core.history_store import get_history_store
+from cline_finance.core.market_cache import get_market_cache, FRESH, STALE
+from cline_finance.core.providers import extract_closes, get_provider
+from cline_finance.core.single_flight import SingleFlight
+from cline_finance.core.ticker_info import get_ticker_info, peek_ticker_info
 
 logger = logging.getLogger(__name__)
 
+# Coalesces concurrent bulk downloads of the same symbol set
+_download_flights = SingleFlight()
+
 
 @dataclass
 class StockQuote:
@@ -47,7 +56,7 @@ class StockQuote:
         }
 
 
-def get_stock_quote(symbol: str) -> dict:
+def get_stock_quote(symbol: str, mode: str = "full") -> dict:
     """
     Fetch current stock/ETF quote.
     
@@ -63,28 +72,89 @@ def get_stock_quote(symbol: str) -> dict:
     
     Args:
         symbol: Stock ticker symbol with optional exchange suffix
+        mode: "full" for price plus fundamentals and company info (ticker.info),
+              "price" for price, previous close and currency only (fast_info,
+              much lighter)
     
     Returns:
         Dictionary with quote data including price, change, and company info.
     
     Raises:
-        ValueError: If symbol not found or data unavailable.
+        ValueError: If symbol not found, data unavailable or mode unknown.
     
     Examples:
         >>> get_stock_quote("AAPL")          # US Apple
         >>> get_stock_quote("AMZN.DE")       # Amazon on Frankfurt
         >>> get_stock_quote("IWDA.AS")       # iShares World ETF Amsterdam
+        >>> get_stock_quote("AAPL", mode="price")
     """
     symbol = symbol.upper()
+    if mode not in QUOTE_MODES:
+        raise ValueError(f"Unknown quote mode '{mode}'. Use one of: {', '.join(QUOTE_MODES)}")
     
+    cache = get_market_cache()
+    if mode == "price":
+        quote = cache.get_or_fetch("quote", (symbol, "price"), lambda: _fetch_price_quote(symbol))
+    else:
+        quote = cache.get_or_fetch("quote", symbol, lambda: _fetch_stock_quote(symbol))
+    return dict(quote)
+
+
+def _fetch_price_quote(symbol: str) -> dict:
+    """Fetch a price-only quote from fast_info (uncached)."""
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        fast_info = get_provider().fast_info(symbol)
+        current_price = fast_info.get("lastPrice")
+        prev_close = fast_info.get("previousClose")
+        
+        if current_price is None:
+            hist = get_provider().history(symbol, period="2d")
+            if hist.empty:
+                raise ValueError(f"No data found for symbol: {symbol}")
+            current_price = float(hist['Close'].iloc[-1])
+            prev_close = float(hist['Close'].iloc[-2]) if len(hist) >= 2 else current_price
+        
+        # Names and currency only if an earlier full quote already cached them
+        static = peek_ticker_info(symbol, ["currency", "longName", "shortName"])
+        
+        change = current_price - prev_close if prev_close else 0
+        change_percent = (change / prev_close * 100) if prev_close and prev_close > 0 else 0
+        
+        return {
+            "symbol": symbol,
+            "price": round(float(current_price), 2),
+            "previous_close": round(float(prev_close), 2) if prev_close else None,
+            "currency": fast_info.get("currency") or static["currency"],
+            "change": round(float(change), 2),
+            "change_percent": round(float(change_percent), 2),
+            "company_name": static["longName"] or static["shortName"],
+            "mode": "price",
+        }
+        
+    except Exception as e:
+        logger.error(f"Error fetching price for {symbol}: {e}")
+        raise ValueError(f"Failed to fetch price for {symbol}: {str(e)}")
+
+
+def _quote_currency(symbol: str) -> Optional[str]:
+    """Trading currency of a symbol from fast_info (cached as long as static ticker info)."""
+    cache = get_market_cache()
+    return cache.get_or_fetch(
+        "currency", symbol,
+        lambda: get_provider().fast_info(symbol).get("currency"),
+        ttl=cache.ttl_for("info_static"),
+    )
+
+
+def _fetch_stock_quote(symbol: str) -> dict:
+    """Fetch a full quote from yfinance (uncached)."""
+    try:
+        info = get_ticker_info(symbol)
         
         # Check if we got valid data
         if not info or info.get("regularMarketPrice") is None:
             # Try to get from history as fallback
-            hist = ticker.history(period="2d")
+            hist = get_provider().history(symbol, period="2d")
             if hist.empty:
                 raise ValueError(f"No data found for symbol: {symbol}")
             
@@ -147,23 +217,45 @@ def get_historical_data(
     symbol: str,
     period: str = "1mo",
     interval: str = "1d",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
 ) -> dict:
     """
     Fetch historical price data for a symbol.
     
+    Daily, weekly and monthly bars are served from the local history store,
+    which only downloads bars newer than the last stored one.
+    
     Args:
         symbol: Stock ticker symbol
         period: Time period - 1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
         interval: Data interval - 1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo
+        start: Optional start date (YYYY-MM-DD). Overrides period.
+        end: Optional end date (YYYY-MM-DD), inclusive
     
     Returns:
         Dictionary with dates, prices, volumes, and summary statistics.
     """
     symbol = symbol.upper()
-    
+    history = get_market_cache().get_or_fetch(
+        "history",
+        (symbol, period, interval, start, end),
+        lambda: _fetch_historical_data(symbol, period, interval, start, end),
+    )
+    return dict(history)
+
+
+def _fetch_historical_data(
+    symbol: str,
+    period: str,
+    interval: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> dict:
+    """Load historical price data through the history store (uncached)."""
     try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period, interval=interval)
+        hist = get_history_store().get_history(symbol, interval, period=period, start=start, end=end)
+        hist = hist.dropna(subset=["Close"])
         
         if hist.empty:
             raise ValueError(f"No historical data for {symbol}")
@@ -171,7 +263,7 @@ def get_historical_data(
         # Convert to lists for JSON serialization
         dates = [d.strftime("%Y-%m-%d") for d in hist.index]
         closes = [round(float(p), 2) for p in hist['Close']]
-        volumes = [int(v) for v in hist['Volume']] if 'Volume' in hist.columns else []
+        volumes = [int(v) for v in hist['Volume'].fillna(0)] if 'Volume' in hist.columns else []
         
         # Calculate summary stats
         start_price = closes[0]
@@ -186,7 +278,9 @@ def get_historical_data(
         
         return {
             "symbol": symbol,
-            "period": period,
+            "period": period if not start else None,
+            "start": dates[0],
+            "end": dates[-1],
             "interval": interval,
             "data_points": len(dates),
             "dates": dates,
@@ -208,23 +302,163 @@ def get_historical_data(
         raise ValueError(f"Failed to fetch historical data: {str(e)}")
 
 
+def get_batch_quotes(symbols: list[str], batch_size: int = QUOTE_BATCH_SIZE) -> dict[str, dict]:
+    """
+    Fetch last price and previous close for many symbols in bulk.
+    
+    Symbols are split into batches and each batch is fetched with a single
+    ``yf.download`` call, so the number of round-trips grows with the number
+    of batches rather than the number of symbols. Prices are cached in the
+    market cache ("price" kind); stale ones are served immediately and
+    refreshed together in the background. Only price fields are returned;
+    use get_stock_quote for company info and fundamentals.
+    
+    Args:
+        symbols: List of stock ticker symbols
+        batch_size: Maximum number of symbols per bulk download
+    
+    Returns:
+        Dictionary keyed by upper-cased symbol with price, previous_close,
+        change and change_percent. Symbols without data are omitted.
+    
+    Example:
+        >>> get_batch_quotes(["AAPL", "MSFT", "IWDA.AS"])
+    """
+    unique_symbols = list(dict.fromkeys(s.upper() for s in symbols))
+    cache = get_market_cache()
+    quotes = {}
+    stale = []
+    missing = []
+    
+    for symbol in unique_symbols:
+        value, state = cache.lookup("price", symbol)
+        if state in (FRESH, STALE):
+            quotes[symbol] = value
+        if state == STALE:
+            stale.append(symbol)
+        elif state != FRESH:
+            missing.append(symbol)
+    
+    # Stale prices are served now and refreshed in one background batch
+    if stale and cache.stale_while_revalidate:
+        submit(_download_quotes_once, stale, batch_size)
+    else:
+        missing.extend(stale)
+    
+    if missing:
+        quotes.update(_download_quotes_once(missing, batch_size))
+    
+    logger.info(f"Resolved {len(quotes)}/{len(unique_symbols)} quotes ({len(missing)} downloaded)")
+    return quotes
+
+
+def _download_quotes_once(symbols: list[str], batch_size: int) -> dict[str, dict]:
+    """Bulk-download quotes, sharing the download with concurrent calls for the same symbols."""
+    key = (tuple(sorted(symbols)), batch_size)
+    return _download_flights.do(key, lambda: _download_quotes(symbols, batch_size))
+
+
+def _download_quotes(symbols: list[str], batch_size: int) -> dict[str, dict]:
+    """Bulk-download price quotes and store them in the market cache."""
+    cache = get_market_cache()
+    batch_size = max(1, batch_size)
+    quotes = {}
+    
+    for start in range(0, len(symbols), batch_size):
+        batch = symbols[start:start + batch_size]
+        
+        try:
+            data = get_provider().download(
+                batch,
+                period="5d",
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=False,
+                progress=False,
+                threads=True,
+            )
+        except Exception as e:
+            logger.warning(f"Bulk quote download failed for {len(batch)} symbols: {e}")
+            continue
+        
+        if data is None or data.empty:
+            continue
+        
+        for symbol in batch:
+            closes = extract_closes(data, symbol, len(batch))
+            if closes is None or closes.empty:
+                continue
+            
+            current_price = float(closes.iloc[-1])
+            prev_close = float(closes.iloc[-2]) if len(closes) >= 2 else current_price
+            change = current_price - prev_close
+            change_percent = (change / prev_close * 100) if prev_close > 0 else 0
+            
+            quotes[symbol] = {
+                "symbol": symbol,
+                "price": round(current_price, 2),
+                "previous_close": round(prev_close, 2),
+                "change": round(change, 2),
+                "change_percent": round(change_percent, 2),
+            }
+            cache.set("price", symbol, quotes[symbol])
+    
+    return quotes
+
+
 def get_multiple_quotes(symbols: list[str]) -> dict:
     """
     Fetch quotes for multiple symbols at once.
     
+    Prices come from the batched quote engine (see get_batch_quotes). Symbols
+    the bulk download could not resolve fall back to price-only
+    get_stock_quote calls, fetched concurrently.
+    
+    Every quote has the keys of a price-mode get_stock_quote: symbol, price,
+    previous_close, currency, change, change_percent, company_name and mode.
+    For bulk-downloaded symbols, currency and company_name come from cached
+    ticker info; a currency not cached yet is read from fast_info (one call
+    per symbol, concurrently), while company_name stays None. Use
+    get_stock_quote for fundamentals.
+    
     Args:
         symbols: List of stock ticker symbols
     
     Returns:
         Dictionary with quotes for each symbol (or error message if failed).
     """
+    batch = get_batch_quotes(symbols)
     results = {}
     
+    missing = [s.upper() for s in symbols if s.upper() not in batch]
+    fallback = {r.item: r for r in fan_out(lambda s: get_stock_quote(s, mode="price"), missing)}
+    
+    statics = {s: peek_ticker_info(s, ["currency", "longName", "shortName"]) for s in batch}
+    currencies = {}
+    for result in fan_out(_quote_currency, [s for s, static in statics.items() if not static["currency"]]):
+        if result.ok:
+            currencies[result.item] = result.value
+        else:
+            logger.warning(f"No currency for {result.item}: {result.error}")
+    
     for symbol in symbols:
-        try:
-            results[symbol.upper()] = get_stock_quote(symbol)
-        except Exception as e:
-            results[symbol.upper()] = {"error": str(e)}
+        symbol = symbol.upper()
+        if symbol in batch:
+            static = statics[symbol]
+            results[symbol] = {
+                "symbol": symbol,
+                "price": batch[symbol]["price"],
+                "previous_close": batch[symbol]["previous_close"],
+                "currency": static["currency"] or currencies.get(symbol),
+                "change": batch[symbol]["change"],
+                "change_percent": batch[symbol]["change_percent"],
+                "company_name": static["longName"] or static["shortName"],
+                "mode": "price",
+            }
+        elif fallback[symbol].ok:
+            results[symbol] = fallback[symbol].value
+        else:
+            results[symbol] = {"error": str(fallback[symbol].error)}
     
     return {
         "quotes": results,